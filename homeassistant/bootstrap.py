@@ -12,7 +12,8 @@ import voluptuous as vol
 
 from homeassistant import core, config as conf_util, config_entries, loader
 from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
-from homeassistant.setup import async_setup_component
+from homeassistant.setup import (
+    DATA_SETUP_TIME, async_import_integrations, async_setup_component)
 from homeassistant.util.logging import AsyncHandler
 from homeassistant.util.package import async_get_user_site, is_virtual_env
 from homeassistant.util.yaml import clear_secret_cache
@@ -35,6 +36,9 @@ STAGE_1_INTEGRATIONS = {
     'mqtt_eventstream',
 }
 
+# Number of slowest integrations in the startup timing report
+SETUP_TIMES_REPORTED = 10
+
 
 async def async_from_config_dict(config: Dict[str, Any],
                                  hass: core.HomeAssistant,
@@ -78,6 +82,9 @@ async def async_from_config_dict(config: Dict[str, Any],
                       "Further initialization aborted")
         return None
 
+    # Resolve integrations from the index of the previous run
+    await loader.async_load_index(hass)
+
     # Make a copy because we are mutating it.
     config = OrderedDict(config)
 
@@ -284,6 +291,20 @@ async def async_mount_local_lib_path(config_dir: str) -> str:
     return deps_dir
 
 
+@core.callback
+def _async_log_setup_times(hass: core.HomeAssistant) -> None:
+    """Log the integrations that took the longest to set up."""
+    setup_times = hass.data.get(DATA_SETUP_TIME, {})
+    slowest = sorted(setup_times.items(),
+                     key=lambda item: sum(item[1].values()), reverse=True)
+
+    for domain, timings in slowest[:SETUP_TIMES_REPORTED]:
+        _LOGGER.info("Startup of %s took %.2fs: %s", domain,
+                     sum(timings.values()), ', '.join(
+                         '{} {:.2f}s'.format(phase, seconds)
+                         for phase, seconds in timings.items()))
+
+
 @core.callback
 def _get_domains(hass: core.HomeAssistant, config: Dict[str, Any]) -> Set[str]:
     """Get domains of components to set up."""
@@ -333,6 +354,10 @@ async def _async_set_up_integrations(
         if isinstance(dep_domains, set):
             domains.update(dep_domains)
 
+    # Import the integrations in the executor while the first ones are set up
+    hass.async_create_task(
+        async_import_integrations(hass, config, set(domains)))
+
     # setup components
     logging_domains = domains & LOGGING_INTEGRATIONS
     stage_1_domains = domains & STAGE_1_INTEGRATIONS
@@ -409,3 +434,5 @@ async def _async_set_up_integrations(
 
     # Wrap up startup
     await hass.async_block_till_done()
+
+    _async_log_setup_times(hass)
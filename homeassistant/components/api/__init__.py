@@ -101,7 +101,11 @@ class APIEventStream(HomeAssistantView):
             if event.event_type == EVENT_HOMEASSISTANT_STOP:
                 data = stop_obj
             else:
-                data = json.dumps(event, cls=JSONEncoder)
+                try:
+                    data = event.as_json()
+                except ValueError:
+                    # The memoized JSON is strict about NaN
+                    data = json.dumps(event, cls=JSONEncoder)
 
             await to_write.put(data)
 
@@ -34,8 +34,10 @@ from homeassistant.components import websocket_api
 import homeassistant.helpers.config_validation as cv
 from homeassistant.setup import async_when_setup
 
-from .const import DOMAIN, DATA_CAMERA_PREFS
+from .const import DOMAIN, DATA_CAMERA_PREFS, DATA_CAMERA_SNAPSHOTS
+from .mjpeg_hub import async_get_hub, async_serve_hub
 from .prefs import CameraPreferences
+from .snapshot import CameraSnapshots
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -122,7 +124,7 @@ async def async_get_image(hass, entity_id, timeout=10):
 
     with suppress(asyncio.CancelledError, asyncio.TimeoutError):
         with async_timeout.timeout(timeout, loop=hass.loop):
-            image = await camera.async_camera_image()
+            image = await _async_snapshot(camera)
 
             if image:
                 return Image(camera.content_type, image)
@@ -138,44 +140,63 @@ async def async_get_mjpeg_stream(hass, request, entity_id):
     return await camera.handle_async_mjpeg_stream(request)
 
 
-async def async_get_still_stream(request, image_cb, content_type, interval):
+async def async_get_still_stream(request, image_cb, content_type, interval,
+                                 key=None):
     """Generate an HTTP MJPEG stream from camera images.
 
+    Viewers of the same key share one loop polling image_cb, the key
+    defaults to image_cb and interval.
+
     This method must be run in the event loop.
     """
-    response = web.StreamResponse()
-    response.content_type = ('multipart/x-mixed-replace; '
-                             'boundary=--frameboundary')
-    await response.prepare(request)
+    async def poll_images(publish):
+        """Publish the images of image_cb that changed."""
+        last_image = None
+
+        while True:
+            img_bytes = await image_cb()
+            if not img_bytes:
+                break
+
+            if img_bytes != last_image:
+                publish(img_bytes)
+                last_image = img_bytes
+
+            await asyncio.sleep(interval)
+
+    if key is None:
+        key = (image_cb, interval)
 
-    async def write_to_mjpeg_stream(img_bytes):
-        """Write image to stream."""
-        await response.write(bytes(
-            '--frameboundary\r\n'
-            'Content-Type: {}\r\n'
-            'Content-Length: {}\r\n\r\n'.format(
-                content_type, len(img_bytes)),
-            'utf-8') + img_bytes + b'\r\n')
+    return await async_get_shared_mjpeg_stream(
+        request, request.app['hass'], key, poll_images, content_type)
 
-    last_image = None
 
-    while True:
-        img_bytes = await image_cb()
-        if not img_bytes:
-            break
+async def async_get_shared_mjpeg_stream(request, hass, key, source,
+                                        content_type=DEFAULT_CONTENT_TYPE):
+    """Serve an HTTP MJPEG stream shared by the viewers of the same key.
+
+    source is a coroutine function taking a callback to publish the bytes
+    of each frame with. It runs while key has viewers, viewers that cannot
+    keep up skip frames.
+
+    This method must be run in the event loop.
+    """
+    return await async_serve_hub(
+        request, async_get_hub(hass, key, source), content_type)
+
 
-        if img_bytes != last_image:
-            await write_to_mjpeg_stream(img_bytes)
+@callback
+def _async_snapshot(camera):
+    """Return a coroutine fetching an image shared with other requests.
 
-            # Chrome seems to always ignore first picture,
-            # print it twice.
-            if last_image is None:
-                await write_to_mjpeg_stream(img_bytes)
-            last_image = img_bytes
+    This method must be run in the event loop.
+    """
+    snapshots = camera.hass.data.get(DATA_CAMERA_SNAPSHOTS)
 
-        await asyncio.sleep(interval)
+    if snapshots is None:
+        return camera.async_camera_image()
 
-    return response
+    return snapshots.async_camera_image(camera)
 
 
 def _get_camera_from_entity_id(hass, entity_id):
@@ -204,6 +225,7 @@ async def async_setup(hass, config):
     prefs = CameraPreferences(hass)
     await prefs.async_initialize()
     hass.data[DATA_CAMERA_PREFS] = prefs
+    hass.data[DATA_CAMERA_SNAPSHOTS] = CameraSnapshots(hass, prefs)
 
     hass.http.register_view(CameraImageView(component))
     hass.http.register_view(CameraMjpegStream(component))
@@ -215,6 +237,8 @@ async def async_setup(hass, config):
     hass.components.websocket_api.async_register_command(websocket_get_prefs)
     hass.components.websocket_api.async_register_command(
         websocket_update_prefs)
+    hass.components.websocket_api.async_register_command(
+        websocket_snapshot_stats)
 
     await component.async_setup(config)
 
@@ -350,8 +374,9 @@ class Camera(Entity):
 
         This method must be run in the event loop.
         """
-        return await async_get_still_stream(request, self.async_camera_image,
-                                            self.content_type, interval)
+        return await async_get_still_stream(
+            request, lambda: _async_snapshot(self), self.content_type,
+            interval, key=(self.entity_id, interval))
 
     async def handle_async_mjpeg_stream(self, request):
         """Serve an HTTP MJPEG stream from the camera.
@@ -482,7 +507,7 @@ class CameraImageView(CameraView):
         """Serve camera image."""
         with suppress(asyncio.CancelledError, asyncio.TimeoutError):
             with async_timeout.timeout(10, loop=request.app['hass'].loop):
-                image = await camera.async_camera_image()
+                image = await _async_snapshot(camera)
 
             if image:
                 return web.Response(body=image,
@@ -579,6 +604,8 @@ async def websocket_get_prefs(hass, connection, msg):
     vol.Required('type'): 'camera/update_prefs',
     vol.Required('entity_id'): cv.entity_id,
     vol.Optional('preload_stream'): bool,
+    vol.Optional('snapshot_max_age'):
+        vol.All(vol.Coerce(float), vol.Range(min=0)),
 })
 async def websocket_update_prefs(hass, connection, msg):
     """Handle request for account info."""
@@ -593,6 +620,18 @@ async def websocket_update_prefs(hass, connection, msg):
     connection.send_result(msg['id'], prefs.get(entity_id).as_dict())
 
 
+@websocket_api.websocket_command({
+    vol.Required('type'): 'camera/snapshot_stats',
+    vol.Required('entity_id'): cv.entity_id,
+})
+@callback
+def websocket_snapshot_stats(hass, connection, msg):
+    """Handle request for the snapshot cache statistics of a camera."""
+    cache = hass.data[DATA_CAMERA_SNAPSHOTS].async_get_cache(
+        msg['entity_id'])
+    connection.send_result(msg['id'], cache.as_dict())
+
+
 async def async_handle_snapshot_service(camera, service):
     """Handle snapshot services calls."""
     hass = camera.hass
@@ -608,7 +647,7 @@ async def async_handle_snapshot_service(camera, service):
             "Can't write %s, no access to path!", snapshot_file)
         return
 
-    image = await camera.async_camera_image()
+    image = await _async_snapshot(camera)
 
     def _write_image(to_file, image_data):
         """Executor helper to write image."""
@@ -2,5 +2,12 @@
 DOMAIN = 'camera'
 
 DATA_CAMERA_PREFS = 'camera_prefs'
+DATA_CAMERA_SNAPSHOTS = 'camera_snapshots'
+DATA_CAMERA_HUBS = 'camera_mjpeg_hubs'
 
 PREF_PRELOAD_STREAM = 'preload_stream'
+PREF_SNAPSHOT_MAX_AGE = 'snapshot_max_age'
+
+# Seconds a snapshot is served from the cache, 0 only shares the snapshots
+# of concurrent requests
+DEFAULT_SNAPSHOT_MAX_AGE = 0
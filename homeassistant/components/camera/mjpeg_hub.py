@@ -0,0 +1,219 @@
+"""Share one MJPEG source of a camera between all of its viewers."""
+import asyncio
+import logging
+
+import aiohttp
+from aiohttp import web
+import async_timeout
+
+from homeassistant.core import callback
+
+from .const import DATA_CAMERA_HUBS
+
+_LOGGER = logging.getLogger(__name__)
+
+# Bytes read from an upstream MJPEG stream at a time
+READ_BUFFER_SIZE = 102400
+# Seconds to wait for data from an upstream MJPEG stream
+READ_TIMEOUT = 10
+
+JPEG_START = b'\xff\xd8'
+JPEG_END = b'\xff\xd9'
+
+
+class _Viewer:
+    """Latest frame waiting to be sent to a viewer."""
+
+    def __init__(self):
+        """Initialize the viewer."""
+        self.frame = None
+        self.closed = False
+        # Frames replaced by a newer one before the viewer took them
+        self.dropped = 0
+        self._ready = asyncio.Event()
+
+    @callback
+    def async_put(self, frame):
+        """Hand a frame to the viewer, dropping the one it did not take."""
+        if self.frame is not None:
+            self.dropped += 1
+        self.frame = frame
+        self._ready.set()
+
+    @callback
+    def async_close(self):
+        """Tell the viewer no more frames will come."""
+        self.closed = True
+        self._ready.set()
+
+    async def async_get(self):
+        """Return the next frame, None once the source has stopped."""
+        if self.frame is None and not self.closed:
+            await self._ready.wait()
+        self._ready.clear()
+        frame, self.frame = self.frame, None
+        return frame
+
+
+class MjpegHub:
+    """Run a frame source while it has viewers and send them its frames.
+
+    The source is a coroutine function taking a publish callback, called
+    with the bytes of every frame. It is started for the first viewer and
+    cancelled when the last one leaves. A viewer that is slower than the
+    source only gets the latest frame, the frames in between are dropped
+    instead of buffered. Viewers joining a running source start with its
+    latest frame, sources may only publish frames that changed.
+    """
+
+    def __init__(self, hass, key, source):
+        """Initialize the hub."""
+        self.hass = hass
+        self.key = key
+        self._source = source
+        self._viewers = set()
+        self._task = None
+        self._latest = None
+
+    @callback
+    def async_subscribe(self):
+        """Add a viewer, starting the source for the first one."""
+        viewer = _Viewer()
+        self._viewers.add(viewer)
+
+        if self._latest is not None:
+            viewer.async_put(self._latest)
+
+        if self._task is None:
+            self._task = self.hass.async_create_task(self._async_run())
+
+        return viewer
+
+    @callback
+    def async_unsubscribe(self, viewer):
+        """Remove a viewer, stopping the source after the last one."""
+        self._viewers.discard(viewer)
+
+        if not self._viewers:
+            self._async_stop()
+
+    @callback
+    def _async_publish(self, frame):
+        """Hand a frame to every viewer."""
+        self._latest = frame
+        for viewer in self._viewers:
+            viewer.async_put(frame)
+
+    async def _async_run(self):
+        """Run the source until it ends or the last viewer leaves."""
+        try:
+            await self._source(self._async_publish)
+        except asyncio.CancelledError:
+            return
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception("Error reading frames for %s", self.key)
+
+        # The source ended while it had viewers
+        self._task = None
+        for viewer in self._viewers:
+            viewer.async_close()
+        self._async_stop()
+
+    @callback
+    def _async_stop(self):
+        """Stop the source and forget the hub."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+        hubs = self.hass.data.get(DATA_CAMERA_HUBS, {})
+        if hubs.get(self.key) is self:
+            del hubs[self.key]
+
+
+@callback
+def async_get_hub(hass, key, source):
+    """Return the hub of key, creating it with source if not running."""
+    hubs = hass.data.setdefault(DATA_CAMERA_HUBS, {})
+    hub = hubs.get(key)
+
+    if hub is None:
+        hub = hubs[key] = MjpegHub(hass, key, source)
+
+    return hub
+
+
+async def async_serve_hub(request, hub, content_type):
+    """Serve the frames of a hub as an HTTP MJPEG stream.
+
+    This method must be run in the event loop.
+    """
+    response = None
+    viewer = hub.async_subscribe()
+
+    async def write_frame(frame):
+        """Write a frame to the stream."""
+        await response.write(bytes(
+            '--frameboundary\r\n'
+            'Content-Type: {}\r\n'
+            'Content-Length: {}\r\n\r\n'.format(content_type, len(frame)),
+            'utf-8') + frame + b'\r\n')
+
+    try:
+        while True:
+            frame = await viewer.async_get()
+            if frame is None:
+                break
+
+            if response is None:
+                response = web.StreamResponse()
+                response.content_type = ('multipart/x-mixed-replace; '
+                                         'boundary=--frameboundary')
+                await response.prepare(request)
+
+                # Chrome seems to always ignore first picture,
+                # print it twice.
+                await write_frame(frame)
+
+            await write_frame(frame)
+    finally:
+        hub.async_unsubscribe(viewer)
+
+    if response is None:
+        # The source stopped before it had a single frame
+        raise web.HTTPBadGateway()
+
+    return response
+
+
+async def async_read_mjpeg_frames(hass, stream, publish):
+    """Publish the JPEG frames of an upstream MJPEG stream until it ends."""
+    data = b''
+
+    while True:
+        try:
+            with async_timeout.timeout(READ_TIMEOUT, loop=hass.loop):
+                chunk = await stream.read(READ_BUFFER_SIZE)
+        except (asyncio.TimeoutError, aiohttp.ClientError):
+            # Something went wrong fetching data, closed connection
+            return
+
+        if not chunk:
+            return
+
+        data += chunk
+
+        while True:
+            start = data.find(JPEG_START)
+            if start == -1:
+                # Keep a trailing byte that may start the next frame
+                data = data[-1:]
+                break
+
+            end = data.find(JPEG_END, start + len(JPEG_START))
+            if end == -1:
+                data = data[start:]
+                break
+
+            publish(data[start:end + len(JPEG_END)])
+            data = data[end + len(JPEG_END):]
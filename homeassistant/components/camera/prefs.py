@@ -1,5 +1,7 @@
 """Preference management for camera component."""
-from .const import DOMAIN, PREF_PRELOAD_STREAM
+from .const import (
+    DOMAIN, PREF_PRELOAD_STREAM, PREF_SNAPSHOT_MAX_AGE,
+    DEFAULT_SNAPSHOT_MAX_AGE)
 
 STORAGE_KEY = DOMAIN
 STORAGE_VERSION = 1
@@ -22,6 +24,12 @@ class CameraEntityPreferences:
         """Return if stream is loaded on hass start."""
         return self._prefs.get(PREF_PRELOAD_STREAM, False)
 
+    @property
+    def snapshot_max_age(self):
+        """Return the seconds a snapshot is served from the cache."""
+        return self._prefs.get(
+            PREF_SNAPSHOT_MAX_AGE, DEFAULT_SNAPSHOT_MAX_AGE)
+
 
 class CameraPreferences:
     """Handle camera preferences."""
@@ -42,13 +50,14 @@ class CameraPreferences:
         self._prefs = prefs
 
     async def async_update(self, entity_id, *, preload_stream=_UNDEF,
-                           stream_options=_UNDEF):
+                           stream_options=_UNDEF, snapshot_max_age=_UNDEF):
         """Update camera preferences."""
         if not self._prefs.get(entity_id):
             self._prefs[entity_id] = {}
 
         for key, value in (
                 (PREF_PRELOAD_STREAM, preload_stream),
+                (PREF_SNAPSHOT_MAX_AGE, snapshot_max_age),
         ):
             if value is not _UNDEF:
                 self._prefs[entity_id][key] = value
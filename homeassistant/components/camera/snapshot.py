@@ -0,0 +1,86 @@
+"""Share camera snapshots between the requests for them."""
+import asyncio
+from time import monotonic
+
+from homeassistant.core import callback
+
+
+class SnapshotCache:
+    """Latest snapshot of a camera and how requests for it were served."""
+
+    def __init__(self):
+        """Initialize the cache."""
+        self.image = None
+        # Monotonic time the image was fetched at
+        self.fetched = None
+        # Task of the fetch requests wait for, None when not fetching
+        self.pending = None
+        # Requests served from the cache
+        self.hits = 0
+        # Requests that joined a fetch started by another request
+        self.coalesced = 0
+        # Requests that fetched an image from the camera
+        self.misses = 0
+
+    def as_dict(self):
+        """Return the statistics of the cache."""
+        return {
+            'hits': self.hits,
+            'coalesced': self.coalesced,
+            'misses': self.misses,
+        }
+
+
+class CameraSnapshots:
+    """Serve camera images through a cache per camera.
+
+    Requests arriving while an image is fetched wait for that fetch instead
+    of asking the camera again. Images younger than the snapshot_max_age
+    preference of the camera are served without asking the camera at all.
+    """
+
+    def __init__(self, hass, prefs):
+        """Initialize the snapshots."""
+        self.hass = hass
+        self._prefs = prefs
+        self._caches = {}
+
+    @callback
+    def async_get_cache(self, entity_id):
+        """Return the cache of a camera."""
+        cache = self._caches.get(entity_id)
+        if cache is None:
+            cache = self._caches[entity_id] = SnapshotCache()
+        return cache
+
+    async def async_camera_image(self, camera):
+        """Return bytes of a camera image, shared with other requests."""
+        cache = self.async_get_cache(camera.entity_id)
+        max_age = self._prefs.get(camera.entity_id).snapshot_max_age
+
+        if cache.image is not None and monotonic() - cache.fetched < max_age:
+            cache.hits += 1
+            return cache.image
+
+        if cache.pending is None:
+            cache.misses += 1
+            cache.pending = self.hass.async_create_task(
+                self._async_fetch(camera, cache))
+        else:
+            cache.coalesced += 1
+
+        # A request giving up does not cancel the fetch of the others
+        return await asyncio.shield(cache.pending)
+
+    async def _async_fetch(self, camera, cache):
+        """Fetch an image from the camera into the cache."""
+        try:
+            image = await camera.async_camera_image()
+        finally:
+            cache.pending = None
+
+        if image:
+            cache.image = image
+            cache.fetched = monotonic()
+
+        return image
@@ -2,7 +2,7 @@
 import logging
 import io
 
-from homeassistant.core import split_entity_id
+from homeassistant.core import callback, split_entity_id
 # pylint: disable=unused-import
 from homeassistant.components.image_processing import PLATFORM_SCHEMA  # noqa
 from homeassistant.components.image_processing import (
@@ -24,6 +24,23 @@ def setup_platform(hass, config, add_entities, discovery_info=None):
     add_entities(entities)
 
 
+def detect_faces(image):
+    """Return the locations of the faces in an image.
+
+    Runs in an image processing worker process.
+    """
+    import face_recognition  # pylint: disable=import-error
+
+    fak_file = io.BytesIO(image)
+    fak_file.name = 'snapshot.jpg'
+    fak_file.seek(0)
+
+    image = face_recognition.load_image_file(fak_file)
+    face_locations = face_recognition.face_locations(image)
+
+    return [{ATTR_LOCATION: location} for location in face_locations]
+
+
 class DlibFaceDetectEntity(ImageProcessingFaceEntity):
     """Dlib Face API entity for identify."""
 
@@ -49,18 +66,18 @@ class DlibFaceDetectEntity(ImageProcessingFaceEntity):
         """Return the name of the entity."""
         return self._name
 
-    def process_image(self, image):
-        """Process image."""
-        import face_recognition  # pylint: disable=import-error
-
-        fak_file = io.BytesIO(image)
-        fak_file.name = 'snapshot.jpg'
-        fak_file.seek(0)
+    @property
+    def process_image_job(self):
+        """Detect the faces in a worker process."""
+        return detect_faces
 
-        image = face_recognition.load_image_file(fak_file)
-        face_locations = face_recognition.face_locations(image)
+    @callback
+    def async_process_job_result(self, result):
+        """Store the detected faces."""
+        self.async_process_faces(result, len(result))
 
-        face_locations = [{ATTR_LOCATION: location}
-                          for location in face_locations]
+    def process_image(self, image):
+        """Process image."""
+        face_locations = detect_faces(image)
 
         self.process_faces(face_locations, len(face_locations))
@@ -204,9 +204,9 @@ class SensorFilter(Entity):
                     [state for state in filter_history[self._entity]])
             if largest_window_time > timedelta(seconds=0):
                 start = dt_util.utcnow() - largest_window_time
-                filter_history = await self.hass.async_add_job(partial(
-                    history.state_changes_during_period, self.hass,
-                    start, entity_id=self._entity))
+                filter_history = \
+                    await history.async_state_changes_during_period(
+                        self.hass, start, entity_id=self._entity)
                 history_list.extend(
                     [state for state in filter_history[self._entity]
                      if state not in history_list])
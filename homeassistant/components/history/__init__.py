@@ -2,7 +2,9 @@
 from collections import defaultdict
 from datetime import timedelta
 from itertools import groupby
+import json
 import logging
+import math
 import time
 
 import voluptuous as vol
@@ -11,10 +13,14 @@ from homeassistant.const import (
     HTTP_BAD_REQUEST, CONF_DOMAINS, CONF_ENTITIES, CONF_EXCLUDE, CONF_INCLUDE)
 import homeassistant.util.dt as dt_util
 from homeassistant.components import recorder, script
-from homeassistant.components.http import HomeAssistantView
+from homeassistant.components.http import (
+    HomeAssistantView, async_stream_json_list)
 from homeassistant.const import ATTR_HIDDEN
 from homeassistant.components.recorder.util import session_scope, execute
+from homeassistant.core import State, callback
 import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.json import JSONEncoder
+from homeassistant.loader import bind_hass
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -30,54 +36,167 @@ CONFIG_SCHEMA = vol.Schema({
 SIGNIFICANT_DOMAINS = ('thermostat', 'climate', 'water_heater')
 IGNORE_DOMAINS = ('zone', 'scene',)
 
+# Rows fetched from the database at a time while streaming
+STREAM_FETCH_SIZE = 1000
+
+DATA_STATE_QUERIES = 'history_state_queries'
+
+# Seconds requests for states wait to be answered by a single query
+QUERY_COALESCE_DELAY = 0.1
+# Seconds the result of a query answers requests for overlapping periods
+QUERY_CACHE_TTL = 30
+
+
+def _significant_states_query(session, start_time, end_time, entity_ids,
+                              filters):
+    """Return the query for significant states, without ordering."""
+    from homeassistant.components.recorder.models import States
+
+    query = session.query(States).filter(
+        (States.domain.in_(SIGNIFICANT_DOMAINS) |
+         (States.last_changed == States.last_updated)) &
+        (States.last_updated > start_time))
+
+    if filters:
+        query = filters.apply(query, entity_ids)
+
+    if end_time is not None:
+        query = query.filter(States.last_updated < end_time)
+
+    return query
+
+
+def _is_wanted(state):
+    """Return if a state belongs in the history."""
+    return (state is not None and _is_significant(state) and
+            not state.attributes.get(ATTR_HIDDEN, False))
+
 
 def get_significant_states(hass, start_time, end_time=None, entity_ids=None,
-                           filters=None, include_start_time_state=True):
+                           filters=None, include_start_time_state=True,
+                           max_points=None):
     """
     Return states changes during UTC period start_time - end_time.
 
     Significant states are all states where there is a state change,
     as well as all states from certain domains (for instance
     thermostat so that we get current temperature in our graphs).
+
+    With max_points, numeric series are downsampled to about that many
+    states per entity.
     """
     timer_start = time.perf_counter()
     from homeassistant.components.recorder.models import States
 
-    with session_scope(hass=hass) as session:
-        query = session.query(States).filter(
-            (States.domain.in_(SIGNIFICANT_DOMAINS) |
-             (States.last_changed == States.last_updated)) &
-            (States.last_updated > start_time))
-
-        if filters:
-            query = filters.apply(query, entity_ids)
-
-        if end_time is not None:
-            query = query.filter(States.last_updated < end_time)
+    with session_scope(hass=hass, read_only=True) as session:
+        query = _significant_states_query(
+            session, start_time, end_time, entity_ids, filters)
 
         query = query.order_by(States.last_updated)
 
-        states = (
-            state for state in execute(query)
-            if (_is_significant(state) and
-                not state.attributes.get(ATTR_HIDDEN, False)))
+        states = (state for state in execute(query) if _is_wanted(state))
 
     if _LOGGER.isEnabledFor(logging.DEBUG):
         elapsed = time.perf_counter() - timer_start
         _LOGGER.debug(
             'get_significant_states took %fs', elapsed)
 
-    return states_to_json(
+    result = states_to_json(
         hass, states, start_time, entity_ids, filters,
         include_start_time_state)
 
+    if max_points is not None:
+        for entity_id, entity_states in result.items():
+            result[entity_id] = downsample_states(entity_states, max_points)
+
+    return result
+
+
+def stream_significant_states(hass, start_time, end_time=None,
+                              entity_ids=None, filters=None,
+                              include_start_time_state=True,
+                              max_points=None):
+    """Yield the significant states of one entity at a time.
+
+    Same data as get_significant_states, but rows are fetched in batches
+    ordered by entity so only the states of a single entity are held in
+    memory. Yields tuples of entity id and list of states.
+    """
+    from homeassistant.components.recorder.models import States
+
+    initial_states = {}
+    if include_start_time_state:
+        for state in get_states(hass, start_time, entity_ids, filters=filters):
+            state.last_changed = start_time
+            state.last_updated = start_time
+            initial_states[state.entity_id] = state
+
+    with session_scope(hass=hass, read_only=True) as session:
+        query = _significant_states_query(
+            session, start_time, end_time, entity_ids, filters)
+
+        query = query.order_by(
+            States.entity_id, States.last_updated).yield_per(
+                STREAM_FETCH_SIZE)
+
+        states = (state for state in (row.to_native() for row in query)
+                  if _is_wanted(state))
+
+        for entity_id, group in groupby(states, lambda state: state.entity_id):
+            entity_states = list(group)
+            initial_state = initial_states.pop(entity_id, None)
+            if initial_state is not None:
+                entity_states.insert(0, initial_state)
+
+            yield entity_id, downsample_states(entity_states, max_points)
+
+    # Entities that did not change during the period
+    for entity_id, initial_state in initial_states.items():
+        yield entity_id, [initial_state]
+
+
+def downsample_states(states, max_points):
+    """Reduce a numeric series of states to about max_points states.
+
+    The series is cut into buckets and the lowest and highest state of each
+    bucket are kept, so peaks survive. The first and last state and states
+    that are not numeric, like unavailable, are always kept.
+    """
+    if max_points is None or len(states) <= max_points:
+        return states
+
+    bucket_size = math.ceil(len(states) / max(max_points // 2, 1))
+    keep = {0, len(states) - 1}
+
+    for bucket_start in range(0, len(states), bucket_size):
+        lowest = highest = None
+
+        for index in range(bucket_start,
+                           min(bucket_start + bucket_size, len(states))):
+            try:
+                value = float(states[index].state)
+            except ValueError:
+                keep.add(index)
+                continue
+
+            if lowest is None or value < lowest[0]:
+                lowest = (value, index)
+            if highest is None or value > highest[0]:
+                highest = (value, index)
+
+        if lowest is not None:
+            keep.add(lowest[1])
+            keep.add(highest[1])
+
+    return [states[index] for index in sorted(keep)]
+
 
 def state_changes_during_period(hass, start_time, end_time=None,
                                 entity_id=None):
     """Return states changes during UTC period start_time - end_time."""
     from homeassistant.components.recorder.models import States
 
-    with session_scope(hass=hass) as session:
+    with session_scope(hass=hass, read_only=True) as session:
         query = session.query(States).filter(
             (States.last_changed == States.last_updated) &
             (States.last_updated > start_time))
@@ -102,7 +221,7 @@ def get_last_state_changes(hass, number_of_states, entity_id):
 
     start_time = dt_util.utcnow()
 
-    with session_scope(hass=hass) as session:
+    with session_scope(hass=hass, read_only=True) as session:
         query = session.query(States).filter(
             (States.last_changed == States.last_updated))
 
@@ -134,7 +253,7 @@ def get_states(hass, utc_point_in_time, entity_ids=None, run=None,
 
     from sqlalchemy import and_, func
 
-    with session_scope(hass=hass) as session:
+    with session_scope(hass=hass, read_only=True) as session:
         if entity_ids and len(entity_ids) == 1:
             # Use an entirely different (and extremely fast) query if we only
             # have a single entity id
@@ -162,8 +281,8 @@ def get_states(hass, utc_point_in_time, entity_ids=None, run=None,
             )
 
             if entity_ids:
-                most_recent_states_by_date.filter(
-                    States.entity_id.in_(entity_ids))
+                most_recent_states_by_date = most_recent_states_by_date \
+                    .filter(States.entity_id.in_(entity_ids))
 
             most_recent_states_by_date = most_recent_states_by_date.group_by(
                 States.entity_id)
@@ -237,6 +356,213 @@ def get_state(hass, utc_point_in_time, entity_id, run=None):
     return states[0] if states else None
 
 
+@bind_hass
+async def async_state_changes_during_period(hass, start_time, end_time=None,
+                                            entity_id=None):
+    """Return the state changes of entity_id during a UTC period.
+
+    Returns the same as state_changes_during_period. Requests made at the
+    same time are answered by a single query.
+    """
+    start_state, states = await _async_state_queries(hass).async_get(
+        entity_id, start_time, end_time, True)
+
+    if start_state is not None:
+        states.insert(0, start_state)
+
+    result = defaultdict(list)
+    if states:
+        result[entity_id] = states
+    return result
+
+
+@bind_hass
+async def async_states_during_period(hass, start_time, end_time=None,
+                                     entity_id=None):
+    """Return all states of entity_id during a UTC period.
+
+    Unlike async_state_changes_during_period this includes the states in
+    which only the attributes changed, but not the state at start_time.
+    """
+    _, states = await _async_state_queries(hass).async_get(
+        entity_id, start_time, end_time, False)
+
+    return states
+
+
+@callback
+def _async_state_queries(hass):
+    """Return the coalescer of state queries."""
+    queries = hass.data.get(DATA_STATE_QUERIES)
+    if queries is None:
+        queries = hass.data[DATA_STATE_QUERIES] = StateQueries(hass)
+    return queries
+
+
+class StateQueries:
+    """Answer requests for the states of single entities together.
+
+    Requests that come in within QUERY_COALESCE_DELAY are answered by one
+    query for all their entities, covering all their periods. The states
+    are kept for QUERY_CACHE_TTL seconds to answer requests for periods
+    they cover, like those of sensors set up at the same time. States of
+    periods without an end only answer the requests they were queried for,
+    as states changed since would be missing for later requests.
+    """
+
+    def __init__(self, hass):
+        """Initialize the coalescer."""
+        self.hass = hass
+        # (entity_id, start_time, end_time, changes_only, future)
+        self._pending = []
+        self._flush_handle = None
+        # (entity_id, changes_only) ->
+        # (start_time, end_time, expires, start_state, states)
+        self._cache = {}
+
+    async def async_get(self, entity_id, start_time, end_time, changes_only):
+        """Return the state at start_time and the states after it.
+
+        The state at start_time is only looked up in the database when
+        changes_only is set, otherwise it can be None.
+        """
+        entity_id = entity_id.lower()
+        key = (entity_id, changes_only)
+        cached = self._async_cached(key, start_time, end_time)
+
+        if cached is None:
+            future = self.hass.loop.create_future()
+            self._pending.append(
+                (entity_id, start_time, end_time, changes_only, future))
+            if self._flush_handle is None:
+                self._flush_handle = self.hass.loop.call_later(
+                    QUERY_COALESCE_DELAY, self._async_flush)
+            cached = await future
+
+        return _states_in_period(cached, start_time, end_time)
+
+    @callback
+    def _async_cached(self, key, start_time, end_time):
+        """Return the cached states covering a period, if any."""
+        cached = self._cache.get(key)
+        if cached is None:
+            return None
+
+        cached_start, cached_end, expires, _, _ = cached
+        if expires < time.monotonic():
+            del self._cache[key]
+            return None
+
+        if cached_start > start_time:
+            return None
+        if end_time is None or end_time > cached_end:
+            return None
+
+        return cached
+
+    @callback
+    def _async_flush(self):
+        """Query the states of the pending requests."""
+        self._flush_handle = None
+        pending, self._pending = self._pending, []
+
+        now = time.monotonic()
+        for key in [key for key, cached in self._cache.items()
+                    if cached[2] < now]:
+            del self._cache[key]
+
+        for changes_only in (True, False):
+            requests = [request for request in pending
+                        if request[3] == changes_only]
+            if requests:
+                self.hass.async_create_task(
+                    self._async_query(requests, changes_only))
+
+    async def _async_query(self, requests, changes_only):
+        """Answer requests with a query covering all of them."""
+        entity_ids = sorted({request[0] for request in requests})
+        start_time = min(request[1] for request in requests)
+        end_time = None
+        if all(request[2] is not None for request in requests):
+            end_time = max(request[2] for request in requests)
+
+        try:
+            states, start_states = await self.hass.async_add_executor_job(
+                _query_states, self.hass, entity_ids, start_time, end_time,
+                changes_only)
+        except Exception as err:  # pylint: disable=broad-except
+            for request in requests:
+                if not request[4].done():
+                    request[4].set_exception(err)
+            return
+
+        expires = time.monotonic() + QUERY_CACHE_TTL
+        results = {
+            entity_id: (start_time, end_time, expires,
+                        start_states.get(entity_id),
+                        states.get(entity_id, []))
+            for entity_id in entity_ids
+        }
+
+        if end_time is not None:
+            for entity_id, result in results.items():
+                self._cache[(entity_id, changes_only)] = result
+
+        for request in requests:
+            if not request[4].done():
+                request[4].set_result(results[request[0]])
+
+
+def _query_states(hass, entity_ids, start_time, end_time, changes_only):
+    """Return the states of entity_ids and their states at start_time."""
+    from homeassistant.components.recorder.models import States
+
+    with session_scope(hass=hass, read_only=True) as session:
+        query = session.query(States).filter(
+            States.entity_id.in_(entity_ids) &
+            (States.last_updated > start_time))
+
+        if changes_only:
+            query = query.filter(States.last_changed == States.last_updated)
+
+        if end_time is not None:
+            query = query.filter(States.last_updated < end_time)
+
+        rows = execute(
+            query.order_by(States.entity_id, States.last_updated))
+
+    states = defaultdict(list)
+    for state in rows:
+        states[state.entity_id].append(state)
+
+    start_states = {}
+    if changes_only:
+        for state in get_states(hass, start_time, entity_ids):
+            start_states[state.entity_id] = state
+
+    return states, start_states
+
+
+def _states_in_period(cached, start_time, end_time):
+    """Return the state at start_time and the cached states after it."""
+    _, _, _, start_state, cached_states = cached
+
+    states = []
+    for state in cached_states:
+        if state.last_updated <= start_time:
+            start_state = state
+        elif end_time is None or state.last_updated < end_time:
+            states.append(state)
+
+    if start_state is not None:
+        # The state at the start of the period is reported as changed then
+        start_state = State(
+            start_state.entity_id, start_state.state, start_state.attributes,
+            start_time, start_time, context=start_state.context)
+
+    return start_state, states
+
+
 async def async_setup(hass, config):
     """Set up the history hooks."""
     filters = Filters()
@@ -304,11 +630,26 @@ class HistoryPeriodView(HomeAssistantView):
             entity_ids = entity_ids.lower().split(',')
         include_start_time_state = 'skip_initial_state' not in request.query
 
+        max_points = request.query.get('max_points')
+        if max_points is not None:
+            try:
+                max_points = int(max_points)
+            except ValueError:
+                max_points = 0
+            if max_points < 2:
+                return self.json_message(
+                    'Invalid max_points', HTTP_BAD_REQUEST)
+
         hass = request.app['hass']
 
+        if 'stream' in request.query:
+            return await self._async_stream(
+                request, hass, start_time, end_time, entity_ids,
+                include_start_time_state, max_points)
+
         result = await hass.async_add_job(
             get_significant_states, hass, start_time, end_time,
-            entity_ids, self.filters, include_start_time_state)
+            entity_ids, self.filters, include_start_time_state, max_points)
         result = list(result.values())
         if _LOGGER.isEnabledFor(logging.DEBUG):
             elapsed = time.perf_counter() - timer_start
@@ -331,6 +672,25 @@ class HistoryPeriodView(HomeAssistantView):
 
         return await hass.async_add_job(self.json, result)
 
+    async def _async_stream(self, request, hass, start_time, end_time,
+                            entity_ids, include_start_time_state,
+                            max_points):
+        """Write the history as a chunked JSON response.
+
+        The states of each entity are encoded in the executor and written
+        as soon as they are ready. Entities are ordered by entity id, the
+        include order is not applied.
+        """
+        def encode_states():
+            """Encode the states of each entity."""
+            for _, states in stream_significant_states(
+                    hass, start_time, end_time, entity_ids, self.filters,
+                    include_start_time_state, max_points):
+                yield json.dumps(
+                    states, sort_keys=True, cls=JSONEncoder, allow_nan=False)
+
+        return await async_stream_json_list(request, hass, encode_states)
+
 
 class Filters:
     """Container for the configured include and exclude filters."""
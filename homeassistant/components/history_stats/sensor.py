@@ -2,6 +2,7 @@
 import datetime
 import logging
 import math
+import threading
 
 import voluptuous as vol
 
@@ -16,6 +17,7 @@ from homeassistant.const import (
 from homeassistant.exceptions import TemplateError
 from homeassistant.helpers.entity import Entity
 from homeassistant.helpers.event import async_track_state_change
+from homeassistant.util.async_ import run_coroutine_threadsafe
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -88,6 +90,7 @@ class HistoryStatsSensor(Entity):
             self, hass, entity_id, entity_state, start, end, duration,
             sensor_type, name):
         """Initialize the HistoryStats sensor."""
+        self.hass = hass
         self._entity_id = entity_id
         self._entity_state = entity_state
         self._duration = duration
@@ -101,20 +104,46 @@ class HistoryStatsSensor(Entity):
         self.value = None
         self.count = None
 
+        # Whether the entity was in the measured state at _history_start,
+        # followed by (timestamp, in measured state) for every change since.
+        # Changes that come in before the history is loaded wait in
+        # _live_changes.
+        self._lock = threading.Lock()
+        self._history_start = None
+        self._history_state = False
+        self._history = []
+        self._live_changes = []
+
         @callback
         def start_refresh(*args):
             """Register state tracking."""
-            @callback
-            def force_refresh(*args):
-                """Force the component to refresh."""
-                self.async_schedule_update_ha_state(True)
-
-            force_refresh()
-            async_track_state_change(self.hass, self._entity_id, force_refresh)
+            self.async_schedule_update_ha_state(True)
+            async_track_state_change(
+                self.hass, self._entity_id, self._async_state_changed)
 
         # Delay first refresh to keep startup fast
         hass.bus.listen_once(EVENT_HOMEASSISTANT_START, start_refresh)
 
+    @callback
+    def _async_state_changed(self, entity_id, old_state, new_state):
+        """Record a change of the tracked entity and refresh."""
+        if new_state is None:
+            timestamp = dt_util.utcnow().timestamp()
+        else:
+            timestamp = new_state.last_changed.timestamp()
+        current_state = new_state is not None and \
+            new_state.state == self._entity_state
+
+        with self._lock:
+            if self._history_start is None:
+                self._live_changes.append((timestamp, current_state))
+            else:
+                _append_change(
+                    self._history, self._history_state, timestamp,
+                    current_state)
+
+        self.async_schedule_update_ha_state(True)
+
     @property
     def name(self):
         """Return the name of the sensor."""
@@ -191,33 +220,34 @@ class HistoryStatsSensor(Entity):
             # Don't compute anything as the value cannot have changed
             return
 
-        # Get history between start and end
-        history_list = history.state_changes_during_period(
-            self.hass, start, end, str(self._entity_id))
+        # Only query the database when the period starts before the
+        # history kept since the last query
+        with self._lock:
+            loaded = self._history_start is not None and \
+                start_timestamp >= self._history_start
 
-        if self._entity_id not in history_list.keys():
+        if not loaded and not self._load_history(start):
             return
 
-        # Get the first state
-        last_state = history.get_state(self.hass, start, self._entity_id)
-        last_state = (last_state is not None and
-                      last_state == self._entity_state)
-        last_time = start_timestamp
-        elapsed = 0
-        count = 0
+        with self._lock:
+            self._forget_history_before(start_timestamp)
+            last_state = self._history_state
+            last_time = start_timestamp
+            elapsed = 0
+            count = 0
 
-        # Make calculations
-        for item in history_list.get(self._entity_id):
-            current_state = item.state == self._entity_state
-            current_time = item.last_changed.timestamp()
+            # Make calculations
+            for current_time, current_state in self._history:
+                if current_time > end_timestamp:
+                    break
 
-            if last_state:
-                elapsed += current_time - last_time
-            if current_state and not last_state:
-                count += 1
+                if last_state:
+                    elapsed += current_time - last_time
+                if current_state and not last_state:
+                    count += 1
 
-            last_state = current_state
-            last_time = current_time
+                last_state = current_state
+                last_time = current_time
 
         # Count time elapsed between last history state and end of measure
         if last_state:
@@ -230,6 +260,63 @@ class HistoryStatsSensor(Entity):
         # Save counter
         self.count = count
 
+    def _load_history(self, start):
+        """Load the changes since start from the database.
+
+        Returns False if the entity did not change since start.
+        """
+        start_timestamp = math.floor(dt_util.as_timestamp(start))
+
+        # Get history from start until now, starting with the state at
+        # start. Later periods ending in the past are covered by it, the
+        # state listener only adds the changes from now on. Sensors
+        # starting together share a single query.
+        history_list = run_coroutine_threadsafe(
+            history.async_state_changes_during_period(
+                self.hass, start, None, str(self._entity_id)),
+            self.hass.loop).result()
+
+        if self._entity_id not in history_list.keys():
+            with self._lock:
+                # Changes the database does not know either
+                self._live_changes.clear()
+            return False
+
+        first_state = False
+        changes = []
+        last_time = start_timestamp
+        for item in history_list.get(self._entity_id):
+            last_time = item.last_changed.timestamp()
+            _append_change(changes, first_state, last_time,
+                           item.state == self._entity_state)
+
+        with self._lock:
+            # Changes seen while loading that are not in the database yet
+            for timestamp, current_state in self._live_changes:
+                if timestamp > last_time:
+                    _append_change(
+                        changes, first_state, timestamp, current_state)
+            self._live_changes.clear()
+
+            self._history_start = start_timestamp
+            self._history_state = first_state
+            self._history = changes
+
+        return True
+
+    def _forget_history_before(self, timestamp):
+        """Drop the changes before timestamp, keeping the state then."""
+        index = 0
+        for index, (change_time, current_state) in enumerate(self._history):
+            if change_time > timestamp:
+                break
+            self._history_state = current_state
+        else:
+            index = len(self._history)
+
+        del self._history[:index]
+        self._history_start = max(self._history_start, timestamp)
+
     def update_period(self):
         """Parse the templates and store a datetime tuple in _period."""
         start = None
@@ -285,6 +372,13 @@ class HistoryStatsSensor(Entity):
         self._period = start, end
 
 
+def _append_change(changes, first_state, timestamp, current_state):
+    """Add a change to changes if it enters or leaves the measured state."""
+    last_state = changes[-1][1] if changes else first_state
+    if current_state != last_state:
+        changes.append((timestamp, current_state))
+
+
 class HistoryStatsHelper:
     """Static methods to make the HistoryStatsSensor code lighter."""
 
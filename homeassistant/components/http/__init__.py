@@ -27,6 +27,7 @@ from .const import (  # noqa
 from .cors import setup_cors
 from .real_ip import setup_real_ip
 from .static import CACHE_HEADERS, CachingStaticResource
+from .stream import async_stream_json_list  # noqa
 from .view import HomeAssistantView  # noqa
 
 DOMAIN = 'http'
@@ -0,0 +1,77 @@
+"""Stream JSON lists encoded in the executor."""
+import asyncio
+import threading
+
+from aiohttp import web
+
+from homeassistant.const import CONTENT_TYPE_JSON
+
+# Encoded chunks waiting to be written before the encoder pauses
+STREAM_QUEUE_SIZE = 4
+
+
+async def async_stream_json_list(request, hass, encode_items, chunk_size=1):
+    """Write the items of a generator as a chunked JSON list.
+
+    encode_items is a generator function yielding each item encoded as
+    JSON. It runs in the executor and its items are written as soon as
+    chunk_size of them are ready, instead of building the whole list first.
+    The generator is closed early when the client goes away.
+    """
+    queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE, loop=hass.loop)
+    cancelled = threading.Event()
+
+    def put(chunk):
+        """Hand a chunk to the event loop, waiting if it is behind."""
+        asyncio.run_coroutine_threadsafe(
+            queue.put(chunk), hass.loop).result()
+
+    def encode():
+        """Join the encoded items into chunks."""
+        items = encode_items()
+        try:
+            separator = ''
+            chunk = []
+            for item in items:
+                chunk.append(item)
+                if len(chunk) < chunk_size:
+                    continue
+                if cancelled.is_set():
+                    return
+                put(separator + ','.join(chunk))
+                separator = ','
+                chunk = []
+
+            if chunk:
+                put(separator + ','.join(chunk))
+        finally:
+            items.close()
+            put(None)
+
+    response = web.StreamResponse()
+    response.content_type = CONTENT_TYPE_JSON
+    await response.prepare(request)
+
+    encode_task = hass.async_add_executor_job(encode)
+    encoded = written = False
+    try:
+        await response.write(b'[')
+        while not encoded:
+            chunk = await queue.get()
+            if chunk is None:
+                encoded = True
+            else:
+                await response.write(chunk.encode('UTF-8'))
+        await response.write(b']')
+        written = True
+    finally:
+        if not written:
+            # Stop the encoder and drain the queue so its thread is
+            # released when the client goes away
+            cancelled.set()
+            while not encoded:
+                encoded = await queue.get() is None
+        await encode_task
+
+    await response.write_eof()
+    return response
@@ -1,12 +1,18 @@
 """Provides functionality to interact with image processing services."""
 import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import timedelta
 import logging
+import multiprocessing
+import os
+import sys
 
 import voluptuous as vol
 
 from homeassistant.const import (
-    ATTR_ENTITY_ID, ATTR_NAME, CONF_ENTITY_ID, CONF_NAME)
+    ATTR_ENTITY_ID, ATTR_NAME, CONF_ENTITY_ID, CONF_NAME,
+    EVENT_HOMEASSISTANT_STOP)
 from homeassistant.core import callback
 from homeassistant.exceptions import HomeAssistantError
 import homeassistant.helpers.config_validation as cv
@@ -43,6 +49,12 @@ CONF_CONFIDENCE = 'confidence'
 DEFAULT_TIMEOUT = 10
 DEFAULT_CONFIDENCE = 80
 
+DATA_WORKER_POOL = 'image_processing_worker_pool'
+DATA_WORKER_SEMAPHORES = 'image_processing_worker_semaphores'
+
+# Processes running the image processing jobs of all platforms
+WORKER_PROCESSES = max(1, (os.cpu_count() or 2) // 2)
+
 SOURCE_SCHEMA = vol.Schema({
     vol.Required(CONF_ENTITY_ID): cv.entity_domain('camera'),
     vol.Optional(CONF_NAME): cv.string,
@@ -86,11 +98,51 @@ async def async_setup(hass, config):
     return True
 
 
+@callback
+def _async_get_worker_pool(hass):
+    """Return the process pool for image processing jobs."""
+    pool = hass.data.get(DATA_WORKER_POOL)
+
+    if pool is None:
+        kwargs = {}
+        if sys.version_info >= (3, 7):
+            # Forking a process running threads can copy locks held by
+            # them, start workers from a fresh interpreter instead
+            kwargs['mp_context'] = multiprocessing.get_context('spawn')
+        pool = hass.data[DATA_WORKER_POOL] = ProcessPoolExecutor(
+            WORKER_PROCESSES, **kwargs)
+
+        @callback
+        def async_shutdown(event):
+            """Stop the worker processes."""
+            hass.async_add_executor_job(pool.shutdown)
+
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, async_shutdown)
+
+    return pool
+
+
+@callback
+def _async_get_worker_semaphore(hass, platform_name, max_jobs):
+    """Return the semaphore limiting the jobs of a platform."""
+    semaphores = hass.data.setdefault(DATA_WORKER_SEMAPHORES, {})
+    semaphore = semaphores.get(platform_name)
+
+    if semaphore is None:
+        semaphore = semaphores[platform_name] = asyncio.Semaphore(max_jobs)
+
+    return semaphore
+
+
 class ImageProcessingEntity(Entity):
     """Base entity class for image processing."""
 
     timeout = DEFAULT_TIMEOUT
 
+    # Images the entities of a platform process in worker processes at the
+    # same time, frames arriving while all are busy are skipped
+    max_worker_jobs = 1
+
     @property
     def camera_entity(self):
         """Return camera entity id from process pictures."""
@@ -112,11 +164,35 @@ class ImageProcessingEntity(Entity):
         """
         return self.hass.async_add_job(self.process_image, image)
 
+    @property
+    def process_image_job(self):
+        """Return a function processing images in a worker process.
+
+        The function gets the image bytes and returns a result that is
+        passed to async_process_job_result. It has to be defined at module
+        level so the worker process can import it, and should keep what it
+        loads, like models, in its module to reuse it for later images.
+        None processes the images with process_image in a thread.
+        """
+        return None
+
+    @callback
+    def async_process_job_result(self, result):
+        """Store the result of process_image_job.
+
+        This method must be run in the event loop.
+        """
+        raise NotImplementedError()
+
     async def async_update(self):
         """Update image and process it.
 
         This method is a coroutine.
         """
+        if self.process_image_job is not None:
+            await self._async_update_in_worker()
+            return
+
         camera = self.hass.components.camera
         image = None
 
@@ -131,6 +207,41 @@ class ImageProcessingEntity(Entity):
         # process image data
         await self.async_process_image(image.content)
 
+    async def _async_update_in_worker(self):
+        """Update image and process it in a worker process."""
+        semaphore = _async_get_worker_semaphore(
+            self.hass, self.platform.platform_name if self.platform else None,
+            self.max_worker_jobs)
+
+        if semaphore.locked():
+            _LOGGER.debug("Skipping image for %s, still processing the "
+                          "previous ones", self.entity_id)
+            return
+
+        async with semaphore:
+            try:
+                image = await self.hass.components.camera.async_get_image(
+                    self.camera_entity, timeout=self.timeout)
+
+            except HomeAssistantError as err:
+                _LOGGER.error("Error on receive image from entity: %s", err)
+                return
+
+            pool = _async_get_worker_pool(self.hass)
+            try:
+                result = await self.hass.loop.run_in_executor(
+                    pool, self.process_image_job, image.content)
+
+            except BrokenProcessPool:
+                _LOGGER.error("Image processing worker of %s died",
+                              self.entity_id)
+                # Start new workers for the next image
+                if self.hass.data.get(DATA_WORKER_POOL) is pool:
+                    del self.hass.data[DATA_WORKER_POOL]
+                return
+
+        self.async_process_job_result(result)
+
 
 class ImageProcessingFaceEntity(ImageProcessingEntity):
     """Base entity class for face image processing."""
@@ -1,13 +1,15 @@
 """Event parser and human readable log generator."""
-from datetime import timedelta
+from datetime import datetime as dt, timedelta
 from itertools import groupby
+import json
 import logging
 
 import voluptuous as vol
 
 from homeassistant.loader import bind_hass
-from homeassistant.components import sun
-from homeassistant.components.http import HomeAssistantView
+from homeassistant.components import sun, websocket_api
+from homeassistant.components.http import (
+    HomeAssistantView, async_stream_json_list)
 from homeassistant.const import (
     ATTR_DOMAIN, ATTR_ENTITY_ID, ATTR_HIDDEN, ATTR_NAME, ATTR_SERVICE,
     CONF_EXCLUDE, CONF_INCLUDE, EVENT_HOMEASSISTANT_START,
@@ -21,6 +23,7 @@ from homeassistant.components.homekit.const import (
     ATTR_DISPLAY_NAME, ATTR_VALUE, DOMAIN as DOMAIN_HOMEKIT,
     EVENT_HOMEKIT_CHANGED)
 import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.json import JSONEncoder
 import homeassistant.util.dt as dt_util
 
 _LOGGER = logging.getLogger(__name__)
@@ -35,6 +38,22 @@ DOMAIN = 'logbook'
 
 GROUP_BY_MINUTES = 15
 
+# Schema version of the recorder that added the logbook_entries table
+INDEX_SCHEMA_VERSION = 9
+
+DATA_INDEX_START = 'logbook_index_start'
+
+# Entries per page when paging through the logbook
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Entries encoded per chunk of a streamed response
+STREAM_CHUNK_SIZE = 100
+
+EPOCH = dt(1970, 1, 1, tzinfo=dt_util.UTC)
+
+WS_TYPE_GET_ENTRIES = 'logbook/get_entries'
+
 CONFIG_SCHEMA = vol.Schema({
     DOMAIN: vol.Schema({
         CONF_EXCLUDE: vol.Schema({
@@ -100,7 +119,11 @@ async def async_setup(hass, config):
         message = message.async_render()
         async_log_entry(hass, name, message, domain, entity_id)
 
+    hass.data[DOMAIN] = config.get(DOMAIN, {})
+    hass.components.recorder.async_register_logbook(
+        ALL_EVENT_TYPES, _keep_recorded_event)
     hass.http.register_view(LogbookView(config.get(DOMAIN, {})))
+    websocket_api.async_register_command(hass, websocket_get_entries)
 
     await hass.components.frontend.async_register_built_in_panel(
         'logbook', 'logbook', 'hass:format-list-bulleted-type')
@@ -122,7 +145,12 @@ class LogbookView(HomeAssistantView):
         self.config = config
 
     async def get(self, request, datetime=None):
-        """Retrieve logbook entries."""
+        """Retrieve logbook entries.
+
+        Without limit and cursor all entries of the period are streamed as
+        a list. Otherwise a page of at most limit entries is returned with
+        the cursor to pass for the next page, which is None on the last.
+        """
         if datetime:
             datetime = dt_util.parse_datetime(datetime)
 
@@ -137,17 +165,113 @@ class LogbookView(HomeAssistantView):
         else:
             period = int(period)
 
+        limit = request.query.get('limit')
+        if limit is not None:
+            try:
+                limit = int(limit)
+            except ValueError:
+                limit = 0
+            if not 0 < limit <= MAX_PAGE_SIZE:
+                return self.json_message('Invalid limit', HTTP_BAD_REQUEST)
+
+        cursor = request.query.get('cursor')
+        if cursor is not None:
+            try:
+                _decode_cursor(cursor)
+            except ValueError:
+                return self.json_message('Invalid cursor', HTTP_BAD_REQUEST)
+
         entity_id = request.query.get('entity')
         start_day = dt_util.as_utc(datetime) - timedelta(days=period - 1)
         end_day = start_day + timedelta(days=period)
         hass = request.app['hass']
 
-        def json_events():
-            """Fetch events and generate JSON."""
-            return self.json(
-                _get_events(hass, self.config, start_day, end_day, entity_id))
+        query = LogbookQuery(
+            hass, self.config, start_day, end_day, entity_id)
+
+        if limit is None and cursor is None:
+            return await self._async_stream(request, hass, query)
+
+        def json_page():
+            """Fetch a page of entries and generate JSON."""
+            entries = query.all(limit or DEFAULT_PAGE_SIZE, cursor)
+            return self.json({
+                'entries': entries,
+                'cursor': query.next_cursor,
+            })
+
+        return await hass.async_add_job(json_page)
+
+    async def _async_stream(self, request, hass, query):
+        """Write the entries as a chunked JSON list.
+
+        Entries are encoded in the executor and written as soon as they
+        are ready, instead of building the whole list first.
+        """
+        def encode_entries():
+            """Encode the entries."""
+            from homeassistant.components.recorder.util import session_scope
+
+            with session_scope(hass=hass, read_only=True) as session:
+                for entry in query.iter_entries(session):
+                    yield json.dumps(
+                        entry, sort_keys=True, cls=JSONEncoder,
+                        allow_nan=False)
+
+        return await async_stream_json_list(
+            request, hass, encode_entries, STREAM_CHUNK_SIZE)
+
+
+@websocket_api.websocket_command({
+    vol.Required('type'): WS_TYPE_GET_ENTRIES,
+    vol.Required('start_time'): cv.string,
+    vol.Optional('end_time'): cv.string,
+    vol.Optional('entity_id'): cv.entity_id,
+    vol.Optional('limit', default=DEFAULT_PAGE_SIZE):
+        vol.All(vol.Coerce(int), vol.Range(min=1, max=MAX_PAGE_SIZE)),
+    vol.Optional('cursor'): cv.string,
+})
+@websocket_api.async_response
+async def websocket_get_entries(hass, connection, msg):
+    """Return a page of logbook entries and the cursor of the next page."""
+    start_time = dt_util.parse_datetime(msg['start_time'])
+    if start_time is None:
+        connection.send_error(
+            msg['id'], websocket_api.const.ERR_INVALID_FORMAT,
+            'Invalid start_time')
+        return
+    start_time = dt_util.as_utc(start_time)
+
+    if 'end_time' in msg:
+        end_time = dt_util.parse_datetime(msg['end_time'])
+        if end_time is None:
+            connection.send_error(
+                msg['id'], websocket_api.const.ERR_INVALID_FORMAT,
+                'Invalid end_time')
+            return
+        end_time = dt_util.as_utc(end_time)
+    else:
+        end_time = start_time + timedelta(days=1)
+
+    cursor = msg.get('cursor')
+    if cursor is not None:
+        try:
+            _decode_cursor(cursor)
+        except ValueError:
+            connection.send_error(
+                msg['id'], websocket_api.const.ERR_INVALID_FORMAT,
+                'Invalid cursor')
+            return
 
-        return await hass.async_add_job(json_events)
+    query = LogbookQuery(
+        hass, hass.data[DOMAIN], start_time, end_time, msg.get('entity_id'))
+    entries = await hass.async_add_executor_job(
+        query.all, msg['limit'], cursor)
+
+    connection.send_result(msg['id'], {
+        'entries': entries,
+        'cursor': query.next_cursor,
+    })
 
 
 def humanify(hass, events):
@@ -334,39 +458,6 @@ def humanify(hass, events):
                 }
 
 
-def _get_related_entity_ids(session, entity_filter):
-    from homeassistant.components.recorder.models import States
-    from homeassistant.components.recorder.util import \
-        RETRIES, QUERY_RETRY_WAIT
-    from sqlalchemy.exc import SQLAlchemyError
-    import time
-
-    timer_start = time.perf_counter()
-
-    query = session.query(States).with_entities(States.entity_id).distinct()
-
-    for tryno in range(0, RETRIES):
-        try:
-            result = [
-                row.entity_id for row in query
-                if entity_filter(row.entity_id)]
-
-            if _LOGGER.isEnabledFor(logging.DEBUG):
-                elapsed = time.perf_counter() - timer_start
-                _LOGGER.debug(
-                    'fetching %d distinct domain/entity_id pairs took %fs',
-                    len(result),
-                    elapsed)
-
-            return result
-        except SQLAlchemyError as err:
-            _LOGGER.error("Error executing query: %s", err)
-
-            if tryno == RETRIES - 1:
-                raise
-            time.sleep(QUERY_RETRY_WAIT)
-
-
 def _generate_filter_from_config(config):
     from homeassistant.helpers.entityfilter import generate_filter
 
@@ -388,36 +479,199 @@ def _generate_filter_from_config(config):
                            excluded_domains, excluded_entities)
 
 
-def _get_events(hass, config, start_day, end_day, entity_id=None):
-    """Get events for a period of time."""
-    from homeassistant.components.recorder.models import Events, States
-    from homeassistant.components.recorder.util import session_scope
+def _encode_cursor(when, entry_id):
+    """Return the cursor of the entries after entry_id fired at when."""
+    return '{}-{}'.format(
+        (dt_util.as_utc(when) - EPOCH) // timedelta(microseconds=1),
+        entry_id)
+
+
+def _decode_cursor(cursor):
+    """Return the time and entry id of a cursor.
+
+    Raises ValueError if the cursor is invalid.
+    """
+    micros, entry_id = cursor.split('-')
+    return EPOCH + timedelta(microseconds=int(micros)), int(entry_id)
+
+
+def _group_end(when):
+    """Return the end of the block of GROUP_BY_MINUTES that when is in."""
+    return when.replace(
+        minute=when.minute - when.minute % GROUP_BY_MINUTES, second=0,
+        microsecond=0) + timedelta(minutes=GROUP_BY_MINUTES)
+
+
+def _get_index_start(hass, session):
+    """Return since when the recorder writes logbook entries, or None."""
+    from homeassistant.components.recorder.models import SchemaChanges
+
+    if DATA_INDEX_START not in hass.data:
+        row = session.query(SchemaChanges.changed) \
+            .filter(SchemaChanges.schema_version >= INDEX_SCHEMA_VERSION) \
+            .order_by(SchemaChanges.change_id).first()
+        index_start = None
+        if row is not None:
+            index_start = row[0]
+            if index_start.tzinfo is None:
+                index_start = dt_util.UTC.localize(index_start)
+            index_start = dt_util.as_utc(index_start)
+        hass.data[DATA_INDEX_START] = index_start
+
+    return hass.data[DATA_INDEX_START]
 
-    entities_filter = _generate_filter_from_config(config)
 
-    def yield_events(query):
-        """Yield Events that are not filtered away."""
+class LogbookQuery:
+    """Logbook entries of a period, read a page at a time.
+
+    Entries are read from the logbook_entries table the recorder fills, so
+    state change events do not have to be decoded. Events recorded before
+    that table existed are read from the events table, with the pages of
+    those ending where the table starts.
+    """
+
+    def __init__(self, hass, config, start_day, end_day, entity_id=None):
+        """Initialize the query."""
+        self.hass = hass
+        self.entities_filter = _generate_filter_from_config(config)
+        self.start_day = start_day
+        self.end_day = end_day
+        self.entity_id = entity_id.lower() if entity_id else None
+        # Cursor of the page after the entries last iterated
+        self.next_cursor = None
+
+    def all(self, limit=None, cursor=None):
+        """Return a page of entries, or all of them without a limit."""
+        from homeassistant.components.recorder.util import session_scope
+
+        with session_scope(hass=self.hass, read_only=True) as session:
+            return list(self.iter_entries(session, limit, cursor))
+
+    def iter_entries(self, session, limit=None, cursor=None):
+        """Yield the entries of a page.
+
+        A page ends after limit events, or where the entries of its last
+        block of GROUP_BY_MINUTES end, so humanify sees every block whole.
+        next_cursor is set once the page has been iterated.
+        """
+        self.next_cursor = None
+        index_start = _get_index_start(self.hass, session)
+        after = _decode_cursor(cursor) if cursor is not None else None
+
+        # Cursors before the index start point into the old events
+        if index_start is None or (
+                self.start_day < index_start and
+                (after is None or after[0] < index_start)):
+            end_day = self.end_day
+            if index_start is not None:
+                end_day = min(end_day, index_start)
+
+            count = 0
+            for entry in humanify(self.hass, self._yield_events(
+                    session, end_day, after, limit)):
+                count += 1
+                yield entry
+            if self.next_cursor is not None or end_day == self.end_day:
+                return
+
+            # The page ends with the last old events
+            if limit is not None and count:
+                self.next_cursor = _encode_cursor(index_start, 0)
+                return
+            after = (index_start, 0)
+
+        yield from humanify(self.hass, self._yield_indexed_events(
+            session, after, limit))
+
+    def _yield_events(self, session, end_day, after=None, limit=None):
+        """Yield the events recorded before the logbook entries table."""
+        from homeassistant.components.recorder.models import Events, States
+
+        query = session.query(Events) \
+            .order_by(Events.time_fired, Events.event_id) \
+            .outerjoin(States, (Events.event_id == States.event_id)) \
+            .filter(Events.event_type.in_(ALL_EVENT_TYPES)) \
+            .filter((Events.time_fired > self.start_day)
+                    & (Events.time_fired < end_day))
+
+        if after is not None:
+            after_time, after_id = after
+            query = query.filter(
+                (Events.time_fired > after_time)
+                | ((Events.time_fired == after_time)
+                   & (Events.event_id > after_id)))
+
+        # Entities excluded in the configuration are filtered while the
+        # events are read
+        if self.entity_id is not None:
+            query = query.filter(
+                ((States.last_updated == States.last_changed) &
+                 (States.entity_id == self.entity_id))
+                | (States.state_id.is_(None)))
+        else:
+            query = query.filter(
+                (States.last_updated == States.last_changed)
+                | (States.state_id.is_(None)))
+
+        count = 0
+        last = block_end = None
         for row in query.yield_per(500):
             event = row.to_native()
-            if _keep_event(event, entities_filter):
+
+            if limit is not None and count >= limit and \
+                    event.time_fired >= block_end:
+                self.next_cursor = _encode_cursor(*last)
+                return
+
+            last = (event.time_fired, row.event_id)
+            if _keep_event(event, self.entities_filter):
+                count += 1
+                block_end = _group_end(event.time_fired)
                 yield event
 
-    with session_scope(hass=hass) as session:
-        if entity_id is not None:
-            entity_ids = [entity_id.lower()]
-        else:
-            entity_ids = _get_related_entity_ids(session, entities_filter)
+    def _yield_indexed_events(self, session, after, limit):
+        """Yield the events of the logbook entries after the cursor."""
+        from homeassistant.components.recorder.models import LogbookEntries
+
+        query = session.query(LogbookEntries) \
+            .order_by(LogbookEntries.time_fired, LogbookEntries.entry_id) \
+            .filter((LogbookEntries.time_fired > self.start_day)
+                    & (LogbookEntries.time_fired < self.end_day))
+
+        if after is not None:
+            after_time, after_id = after
+            query = query.filter(
+                (LogbookEntries.time_fired > after_time)
+                | ((LogbookEntries.time_fired == after_time)
+                   & (LogbookEntries.entry_id > after_id)))
+
+        if self.entity_id is not None:
+            query = query.filter(
+                (LogbookEntries.entity_id == self.entity_id)
+                | (LogbookEntries.event_type != EVENT_STATE_CHANGED))
+
+        count = 0
+        last = block_end = None
+        for row in query.yield_per(500):
+            event = row.to_native()
+            if event is None:
+                continue
+
+            if limit is not None and count >= limit and \
+                    event.time_fired >= block_end:
+                self.next_cursor = _encode_cursor(*last)
+                return
+
+            last = (event.time_fired, row.entry_id)
+            if _keep_entry(event, self.entities_filter):
+                count += 1
+                block_end = _group_end(event.time_fired)
+                yield event
 
-        query = session.query(Events).order_by(Events.time_fired) \
-            .outerjoin(States, (Events.event_id == States.event_id)) \
-            .filter(Events.event_type.in_(ALL_EVENT_TYPES)) \
-            .filter((Events.time_fired > start_day)
-                    & (Events.time_fired < end_day)) \
-            .filter(((States.last_updated == States.last_changed) &
-                     States.entity_id.in_(entity_ids))
-                    | (States.state_id.is_(None)))
 
-        return list(humanify(hass, yield_events(query)))
+def _get_events(hass, config, start_day, end_day, entity_id=None):
+    """Get events for a period of time."""
+    return LogbookQuery(hass, config, start_day, end_day, entity_id).all()
 
 
 def _keep_event(event, entities_filter):
@@ -483,6 +737,45 @@ def _keep_event(event, entities_filter):
     return not entity_id or entities_filter(entity_id)
 
 
+def _keep_recorded_event(event):
+    """Return if the recorder writes an entry for a native event.
+
+    Called in the recorder thread. State changes the logbook never shows
+    are left out, the configured filters are applied when reading.
+    """
+    if event.event_type != EVENT_STATE_CHANGED:
+        return True
+
+    old_state = event.data.get('old_state')
+    new_state = event.data.get('new_state')
+
+    # New entities, removed entities and attribute changes
+    if old_state is None or new_state is None or \
+            new_state.last_changed != new_state.last_updated:
+        return False
+
+    attributes = new_state.attributes
+
+    # Hidden entities, automatically created groups and the changing
+    # values of sensors
+    return not (
+        attributes.get(ATTR_HIDDEN) or
+        (new_state.domain == 'group' and attributes.get('auto')) or
+        (new_state.domain in CONTINUOUS_DOMAINS and
+         attributes.get('unit_of_measurement')))
+
+
+def _keep_entry(event, entities_filter):
+    """Return if the event of a logbook entry passes the filter.
+
+    The recorder only writes entries for the state changes to show.
+    """
+    if event.event_type == EVENT_STATE_CHANGED:
+        return entities_filter(event.data['entity_id'])
+
+    return _keep_event(event, entities_filter)
+
+
 def _entry_message_from_state(domain, state):
     """Convert a state to a message for the logbook."""
     # We pass domain in so we don't have to split entity_id again
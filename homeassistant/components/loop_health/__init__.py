@@ -0,0 +1,265 @@
+"""Monitor how well the event loop keeps up."""
+import asyncio
+import functools
+import logging
+from time import monotonic
+import types
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import callback
+from homeassistant.helpers.discovery import async_load_platform
+
+_LOGGER = logging.getLogger(__name__)
+
+DOMAIN = 'loop_health'
+
+CONF_SLOW_JOB_THRESHOLD = 'slow_job_threshold'
+
+DEFAULT_SLOW_JOB_THRESHOLD = 0.01
+
+# How often the loop lag is sampled, in seconds
+PROBE_INTERVAL = 0.5
+
+# Upper bounds of the lag histogram buckets, in seconds
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, float('inf'))
+
+# Number of slow jobs reported
+TOP_SLOW_JOBS = 10
+
+WS_TYPE_INFO = 'loop_health/info'
+
+CONFIG_SCHEMA = vol.Schema({
+    DOMAIN: vol.Schema({
+        vol.Optional(CONF_SLOW_JOB_THRESHOLD,
+                     default=DEFAULT_SLOW_JOB_THRESHOLD): vol.All(
+                         vol.Coerce(float), vol.Range(min=0)),
+    }),
+}, extra=vol.ALLOW_EXTRA)
+
+
+async def async_setup(hass, config):
+    """Set up the loop health monitor."""
+    conf = config.get(DOMAIN, {})
+    monitor = hass.data[DOMAIN] = LoopHealthMonitor(
+        hass, conf.get(CONF_SLOW_JOB_THRESHOLD, DEFAULT_SLOW_JOB_THRESHOLD))
+    monitor.async_start()
+
+    @callback
+    def async_stop(event):
+        """Stop monitoring."""
+        monitor.async_stop()
+
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, async_stop)
+
+    websocket_api.async_register_command(hass, websocket_info)
+
+    hass.async_create_task(async_load_platform(
+        hass, 'sensor', DOMAIN, {}, config))
+
+    return True
+
+
+@websocket_api.websocket_command({
+    vol.Required('type'): WS_TYPE_INFO,
+})
+@callback
+def websocket_info(hass, connection, msg):
+    """Return the loop lag histogram, slowest jobs and executor queue."""
+    connection.send_result(msg['id'], hass.data[DOMAIN].as_dict())
+
+
+def _job_module_name(target):
+    """Return the module and name of a job."""
+    while isinstance(target, functools.partial):
+        target = target.func
+
+    if asyncio.iscoroutine(target):
+        frame = getattr(target, 'cr_frame', None) or \
+            getattr(target, 'gi_frame', None)
+        module = frame.f_globals.get('__name__') if frame else None
+    else:
+        module = getattr(target, '__module__', None)
+
+    return module or '', getattr(target, '__qualname__', None) or repr(target)
+
+
+def _job_origin(module, name):
+    """Return the integration and name of a job."""
+    parts = module.split('.')
+
+    if len(parts) > 2 and parts[:2] == ['homeassistant', 'components']:
+        integration = parts[2]
+    elif parts[0] == 'homeassistant':
+        integration = 'core'
+    else:
+        integration = parts[0] or 'unknown'
+
+    return integration, '{}.{}'.format(module, name) if module else name
+
+
+@types.coroutine
+def _timed_steps(coro, record):
+    """Drive coro, reporting every step that blocks the loop too long."""
+    value = error = None
+
+    while True:
+        start = monotonic()
+        try:
+            if error is None:
+                future = coro.send(value)
+            else:
+                future = coro.throw(error)
+        except StopIteration as stop:
+            record(monotonic() - start)
+            return stop.value
+        except BaseException:
+            record(monotonic() - start)
+            raise
+
+        record(monotonic() - start)
+
+        try:
+            value, error = (yield future), None
+        except BaseException as err:  # pylint: disable=broad-except
+            value, error = None, err
+
+
+class LoopHealthMonitor:
+    """Collect event loop lag and the jobs that block the loop."""
+
+    def __init__(self, hass, slow_job_threshold):
+        """Initialize the monitor."""
+        self.hass = hass
+        self.slow_job_threshold = slow_job_threshold
+        self.lag_counts = [0] * len(LAG_BUCKETS)
+        self.max_lag = 0.0
+        # Highest lag since the last call of async_reset_max_lag
+        self.recent_max_lag = 0.0
+        # (integration, job) -> [count, total duration, max duration]
+        self.slow_jobs = {}
+        self._probe = None
+
+    @callback
+    def async_start(self):
+        """Start sampling the lag and timing jobs."""
+        self.hass.job_monitor = self
+        self._async_schedule_probe()
+
+    @callback
+    def async_stop(self):
+        """Stop sampling the lag and timing jobs."""
+        if self.hass.job_monitor is self:
+            self.hass.job_monitor = None
+        if self._probe is not None:
+            self._probe.cancel()
+            self._probe = None
+
+    @callback
+    def _async_schedule_probe(self):
+        """Schedule the next lag sample."""
+        expected = self.hass.loop.time() + PROBE_INTERVAL
+        self._probe = self.hass.loop.call_at(
+            expected, self._async_probe, expected)
+
+    @callback
+    def _async_probe(self, expected):
+        """Record how late the loop ran the probe."""
+        self.async_record_lag(self.hass.loop.time() - expected)
+        self._async_schedule_probe()
+
+    @callback
+    def async_record_lag(self, lag):
+        """Add a lag sample to the histogram."""
+        for index, bound in enumerate(LAG_BUCKETS):
+            if lag <= bound:
+                self.lag_counts[index] += 1
+                break
+
+        self.max_lag = max(self.max_lag, lag)
+        self.recent_max_lag = max(self.recent_max_lag, lag)
+
+    @callback
+    def async_reset_max_lag(self):
+        """Return the highest lag since the previous call and reset it."""
+        lag, self.recent_max_lag = self.recent_max_lag, 0.0
+        return lag
+
+    def record_job(self, target, duration):
+        """Count a job that blocked the loop for duration seconds.
+
+        target is the job or a tuple of its module and name.
+        """
+        if duration < self.slow_job_threshold:
+            return
+
+        if not isinstance(target, tuple):
+            target = _job_module_name(target)
+        key = _job_origin(*target)
+        stats = self.slow_jobs.get(key)
+        if stats is None:
+            stats = self.slow_jobs[key] = [0, 0.0, 0.0]
+
+        stats[0] += 1
+        stats[1] += duration
+        stats[2] = max(stats[2], duration)
+
+    def wrap_callback(self, target):
+        """Return target timing how long each call takes."""
+        @callback
+        def timed_callback(*args):
+            """Run the callback and record its duration."""
+            start = monotonic()
+            try:
+                return target(*args)
+            finally:
+                self.record_job(target, monotonic() - start)
+
+        return timed_callback
+
+    def wrap_coroutine(self, coro, target=None):
+        """Return coro timing how long each of its steps takes."""
+        # A finished coroutine no longer knows its module
+        origin = _job_module_name(coro) if target is None else target
+
+        async def timed_coroutine():
+            """Run the coroutine and record its slow steps."""
+            return await _timed_steps(
+                coro, lambda duration: self.record_job(origin, duration))
+
+        return timed_coroutine()
+
+    @property
+    def executor_queue_depth(self):
+        """Return the number of jobs waiting for an executor thread."""
+        # pylint: disable=protected-access
+        work_queue = getattr(self.hass.executor, '_work_queue', None)
+        return work_queue.qsize() if work_queue is not None else None
+
+    def top_slow_jobs(self, count=TOP_SLOW_JOBS):
+        """Return the slow jobs, slowest first."""
+        jobs = sorted(self.slow_jobs.items(),
+                      key=lambda item: item[1][2], reverse=True)
+
+        return [{
+            'integration': integration,
+            'job': job,
+            'count': stats[0],
+            'total': stats[1],
+            'max': stats[2],
+        } for (integration, job), stats in jobs[:count]]
+
+    def as_dict(self):
+        """Return the collected statistics."""
+        return {
+            'lag_histogram': [
+                {'le': bound if bound != float('inf') else None,
+                 'count': count}
+                for bound, count in zip(LAG_BUCKETS, self.lag_counts)
+            ],
+            'max_lag': self.max_lag,
+            'slow_jobs': self.top_slow_jobs(),
+            'executor_queue_depth': self.executor_queue_depth,
+        }
@@ -0,0 +1,67 @@
+"""Sensor reporting the event loop lag."""
+from homeassistant.helpers.entity import Entity
+
+from . import DOMAIN
+
+ICON = 'mdi:timer-sand'
+
+ATTR_EXECUTOR_QUEUE_DEPTH = 'executor_queue_depth'
+ATTR_SLOWEST_JOBS = 'slowest_jobs'
+
+# Slow jobs listed in the attributes
+SLOWEST_JOBS_SHOWN = 5
+
+
+async def async_setup_platform(
+        hass, config, async_add_entities, discovery_info=None):
+    """Set up the loop lag sensor."""
+    if discovery_info is None:
+        return
+
+    async_add_entities([LoopLagSensor(hass.data[DOMAIN])], True)
+
+
+class LoopLagSensor(Entity):
+    """Highest event loop lag since the previous update."""
+
+    def __init__(self, monitor):
+        """Initialize the sensor."""
+        self._monitor = monitor
+        self._state = None
+        self._attributes = {}
+
+    @property
+    def name(self):
+        """Return the name of the sensor."""
+        return 'Event loop lag'
+
+    @property
+    def icon(self):
+        """Icon to display in the front end."""
+        return ICON
+
+    @property
+    def unit_of_measurement(self):
+        """Return the unit of measurement."""
+        return 'ms'
+
+    @property
+    def state(self):
+        """Return the state of the sensor."""
+        return self._state
+
+    @property
+    def device_state_attributes(self):
+        """Return the executor queue depth and slowest jobs."""
+        return self._attributes
+
+    async def async_update(self):
+        """Read the lag from the monitor."""
+        self._state = round(self._monitor.async_reset_max_lag() * 1000, 1)
+        self._attributes = {
+            ATTR_EXECUTOR_QUEUE_DEPTH: self._monitor.executor_queue_depth,
+            ATTR_SLOWEST_JOBS: [
+                '{} ({:.0f} ms)'.format(job['job'], job['max'] * 1000)
+                for job in self._monitor.top_slow_jobs(SLOWEST_JOBS_SHOWN)
+            ],
+        }
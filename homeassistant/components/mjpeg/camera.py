@@ -12,9 +12,10 @@ import voluptuous as vol
 from homeassistant.const import (
     CONF_NAME, CONF_USERNAME, CONF_PASSWORD, CONF_AUTHENTICATION,
     HTTP_BASIC_AUTHENTICATION, HTTP_DIGEST_AUTHENTICATION, CONF_VERIFY_SSL)
-from homeassistant.components.camera import (PLATFORM_SCHEMA, Camera)
-from homeassistant.helpers.aiohttp_client import (
-    async_get_clientsession, async_aiohttp_proxy_web)
+from homeassistant.components.camera import (
+    PLATFORM_SCHEMA, Camera, async_get_shared_mjpeg_stream)
+from homeassistant.components.camera.mjpeg_hub import async_read_mjpeg_frames
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers import config_validation as cv
 
 _LOGGER = logging.getLogger(__name__)
@@ -153,14 +154,34 @@ class MjpegCamera(Camera):
         if self._authentication == HTTP_DIGEST_AUTHENTICATION:
             return await super().handle_async_mjpeg_stream(request)
 
-        # connect to stream
+        # Viewers share a single connection to the stream
+        return await async_get_shared_mjpeg_stream(
+            request, self.hass, (self.entity_id, self._mjpeg_url),
+            self._async_read_stream)
+
+    async def _async_read_stream(self, publish):
+        """Publish the frames of the camera stream."""
         websession = async_get_clientsession(
             self.hass,
             verify_ssl=self._verify_ssl
         )
-        stream_coro = websession.get(self._mjpeg_url, auth=self._auth)
+        try:
+            with async_timeout.timeout(10, loop=self.hass.loop):
+                response = await websession.get(
+                    self._mjpeg_url, auth=self._auth)
 
-        return await async_aiohttp_proxy_web(self.hass, request, stream_coro)
+        except asyncio.TimeoutError:
+            _LOGGER.error("Timeout connecting to camera stream")
+            return
+
+        except aiohttp.ClientError as err:
+            _LOGGER.error("Error connecting to camera stream: %s", err)
+            return
+
+        try:
+            await async_read_mjpeg_frames(self.hass, response.content, publish)
+        finally:
+            response.close()
 
     @property
     def name(self):
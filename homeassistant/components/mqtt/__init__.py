@@ -9,6 +9,7 @@ from operator import attrgetter
 import os
 import socket
 import ssl
+import threading
 import time
 from typing import Any, Callable, List, Optional, Union, cast  # noqa: F401
 
@@ -39,6 +40,7 @@ from . import config_flow, discovery, server  # noqa pylint: disable=unused-impo
 from .const import (
     CONF_BROKER, CONF_DISCOVERY, DEFAULT_DISCOVERY, CONF_STATE_TOPIC,
     ATTR_DISCOVERY_HASH)
+from .matcher import TopicMatcher
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -101,6 +103,8 @@ ATTR_QOS = CONF_QOS
 ATTR_RETAIN = CONF_RETAIN
 
 MAX_RECONNECT_WAIT = 300  # seconds
+# Messages dispatched per loop iteration, so bursts don't starve the loop
+MAX_MESSAGE_BATCH = 100
 
 CONNECTION_SUCCESS = 'connection_success'
 CONNECTION_FAILED = 'connection_failed'
@@ -648,6 +652,11 @@ class MQTT:
         self.port = port
         self.keepalive = keepalive
         self.subscriptions = []  # type: List[Subscription]
+        self._matcher = TopicMatcher()
+        # Messages received by the paho thread, waiting for the event loop
+        self._pending_messages = []  # type: List[Any]
+        self._pending_lock = threading.Lock()
+        self._flush_scheduled = False
         self.birth_message = birth_message
         self.connected = False
         self._mqttc = None  # type: mqtt.Client
@@ -738,6 +747,7 @@ class MQTT:
 
         subscription = Subscription(topic, msg_callback, qos, encoding)
         self.subscriptions.append(subscription)
+        self._matcher.add(subscription)
 
         await self._async_perform_subscription(topic, qos)
 
@@ -747,6 +757,7 @@ class MQTT:
             if subscription not in self.subscriptions:
                 raise HomeAssistantError("Can't remove subscription twice")
             self.subscriptions.remove(subscription)
+            self._matcher.remove(subscription)
 
             if any(other.topic == topic for other in self.subscriptions):
                 # Other subscriptions on topic remaining - don't unsubscribe.
@@ -809,18 +820,46 @@ class MQTT:
                 self.async_publish(*attr.astuple(self.birth_message)))
 
     def _mqtt_on_message(self, _mqttc, _userdata, msg) -> None:
-        """Message received callback."""
-        self.hass.add_job(self._mqtt_handle_message, msg)
+        """Message received callback.
+
+        Messages are buffered and the loop is only woken up for the first
+        message of a batch. Messages arriving before the loop gets to the
+        batch are dispatched together with it.
+        """
+        with self._pending_lock:
+            self._pending_messages.append(msg)
+            if self._flush_scheduled:
+                return
+            self._flush_scheduled = True
+
+        self.hass.loop.call_soon_threadsafe(self._mqtt_handle_messages)
+
+    @callback
+    def _mqtt_handle_messages(self) -> None:
+        """Dispatch a batch of messages received by the paho thread."""
+        with self._pending_lock:
+            messages = self._pending_messages[:MAX_MESSAGE_BATCH]
+            del self._pending_messages[:MAX_MESSAGE_BATCH]
+
+            if self._pending_messages:
+                # Continue with the rest after other loop work
+                self.hass.loop.call_soon(self._mqtt_handle_messages)
+            else:
+                self._flush_scheduled = False
+
+        for msg in messages:
+            try:
+                self._mqtt_handle_message(msg)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Error handling message on %s", msg.topic)
 
     @callback
     def _mqtt_handle_message(self, msg) -> None:
         _LOGGER.debug("Received message on %s%s: %s", msg.topic,
                       " (retained)" if msg.retain else "", msg.payload)
 
-        for subscription in self.subscriptions:
-            if not _match_topic(subscription.topic, msg.topic):
-                continue
-
+        # Callbacks may unsubscribe while we dispatch
+        for subscription in list(self._matcher.iter_match(msg.topic)):
             payload = msg.payload  # type: SubscribePayloadType
             if subscription.encoding is not None:
                 try:
@@ -872,18 +911,6 @@ def _raise_on_error(result_code: int) -> None:
             'Error talking to MQTT: {}'.format(mqtt.error_string(result_code)))
 
 
-def _match_topic(subscription: str, topic: str) -> bool:
-    """Test if topic matches subscription."""
-    from paho.mqtt.matcher import MQTTMatcher
-    matcher = MQTTMatcher()
-    matcher[subscription] = True
-    try:
-        next(matcher.iter_match(topic))
-        return True
-    except StopIteration:
-        return False
-
-
 class MqttAttributes(Entity):
     """Mixin used for platforms that support JSON attributes."""
 
@@ -0,0 +1,83 @@
+"""Match MQTT topics against subscriptions."""
+from typing import Any, Dict, Iterator, List  # noqa: F401
+
+
+class _Node:
+    """A level in the subscription tree."""
+
+    __slots__ = ('children', 'subscriptions')
+
+    def __init__(self) -> None:
+        """Initialize the node."""
+        self.children = {}  # type: Dict[str, _Node]
+        self.subscriptions = []  # type: List[Any]
+
+
+class TopicMatcher:
+    """Tree of subscriptions keyed by topic level.
+
+    Subscriptions are added and removed as they come and go, so matching a
+    topic only walks the levels of that topic, including the '+' and '#'
+    wildcards, instead of every subscription.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the matcher."""
+        self._root = _Node()
+
+    def add(self, subscription: Any) -> None:
+        """Add a subscription, which needs a topic attribute."""
+        node = self._root
+        for level in subscription.topic.split('/'):
+            child = node.children.get(level)
+            if child is None:
+                child = node.children[level] = _Node()
+            node = child
+        node.subscriptions.append(subscription)
+
+    def remove(self, subscription: Any) -> None:
+        """Remove a subscription.
+
+        Raises ValueError if the subscription was not added.
+        """
+        path = [self._root]
+        levels = subscription.topic.split('/')
+        for level in levels:
+            node = path[-1].children.get(level)
+            if node is None:
+                raise ValueError('Subscription not found')
+            path.append(node)
+
+        path[-1].subscriptions.remove(subscription)
+
+        # Prune the levels that no longer lead to any subscription
+        for level, parent, node in zip(
+                reversed(levels), reversed(path[:-1]), reversed(path)):
+            if node.subscriptions or node.children:
+                break
+            del parent.children[level]
+
+    def iter_match(self, topic: str) -> Iterator[Any]:
+        """Yield the subscriptions matching topic."""
+        levels = topic.split('/')
+        # Wildcards do not match the first level of topics like $SYS
+        normal = not topic.startswith('$')
+
+        def match(node: _Node, index: int) -> Iterator[Any]:
+            """Match the levels from index on against node."""
+            if index == len(levels):
+                yield from node.subscriptions
+            else:
+                child = node.children.get(levels[index])
+                if child is not None:
+                    yield from match(child, index + 1)
+
+                child = node.children.get('+')
+                if child is not None and (normal or index > 0):
+                    yield from match(child, index + 1)
+
+            child = node.children.get('#')
+            if child is not None and (normal or index > 0):
+                yield from child.subscriptions
+
+        return match(self._root, 0)
@@ -278,7 +278,7 @@ class Plant(Entity):
 
         _LOGGER.debug("Initializing values for %s from the database",
                       self._name)
-        with session_scope(hass=self.hass) as session:
+        with session_scope(hass=self.hass, read_only=True) as session:
             query = session.query(States).filter(
                 (States.entity_id == entity_id.lower()) and
                 (States.last_updated > start_date)
@@ -1,16 +1,17 @@
 """Support for recording details."""
 import asyncio
-from collections import namedtuple
+from collections import OrderedDict, namedtuple
 import concurrent.futures
 from datetime import datetime, timedelta
 import logging
 import queue
 import threading
 import time
-from typing import Any, Dict, Optional  # noqa: F401
+from typing import Any, Dict, Optional, Tuple  # noqa: F401
 
 import voluptuous as vol
 
+from homeassistant.components import websocket_api
 from homeassistant.const import (
     ATTR_ENTITY_ID, CONF_DOMAINS, CONF_ENTITIES, CONF_EXCLUDE, CONF_INCLUDE,
     EVENT_HOMEASSISTANT_START, EVENT_HOMEASSISTANT_STOP, EVENT_STATE_CHANGED,
@@ -19,10 +20,12 @@ from homeassistant.core import CoreState, HomeAssistant, callback
 import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers.entityfilter import generate_filter
 from homeassistant.helpers.typing import ConfigType
+from homeassistant.loader import bind_hass
 import homeassistant.util.dt as dt_util
 
-from . import migration, purge
+from . import migration, pool, purge
 from .const import DATA_INSTANCE
+from .stats import RecorderStats
 from .util import session_scope
 
 _LOGGER = logging.getLogger(__name__)
@@ -31,6 +34,8 @@ DOMAIN = 'recorder'
 
 SERVICE_PURGE = 'purge'
 
+WS_TYPE_STATS = 'recorder/stats'
+
 ATTR_KEEP_DAYS = 'keep_days'
 ATTR_REPACK = 'repack'
 
@@ -46,9 +51,19 @@ CONF_DB_URL = 'db_url'
 CONF_PURGE_KEEP_DAYS = 'purge_keep_days'
 CONF_PURGE_INTERVAL = 'purge_interval'
 CONF_EVENT_TYPES = 'event_types'
+CONF_COMMIT_INTERVAL = 'commit_interval'
+CONF_COMMIT_BATCH_SIZE = 'commit_batch_size'
 
 CONNECT_RETRY_WAIT = 3
 
+DEFAULT_COMMIT_INTERVAL = 0
+DEFAULT_COMMIT_BATCH_SIZE = 1000
+
+# Number of attribute blobs for which the row id is kept in memory
+ATTRIBUTES_ID_CACHE_SIZE = 2048
+# Attribute hashes looked up per query, below the SQLite variable limit
+ATTRIBUTES_LOOKUP_SIZE = 500
+
 FILTER_SCHEMA = vol.Schema({
     vol.Optional(CONF_EXCLUDE, default={}): vol.Schema({
         vol.Optional(CONF_DOMAINS): vol.All(cv.ensure_list, [cv.string]),
@@ -68,6 +83,11 @@ CONFIG_SCHEMA = vol.Schema({
         vol.Optional(CONF_PURGE_INTERVAL, default=1):
             vol.All(vol.Coerce(int), vol.Range(min=0)),
         vol.Optional(CONF_DB_URL): cv.string,
+        vol.Optional(CONF_COMMIT_INTERVAL, default=DEFAULT_COMMIT_INTERVAL):
+            vol.All(vol.Coerce(float), vol.Range(min=0)),
+        vol.Optional(CONF_COMMIT_BATCH_SIZE,
+                     default=DEFAULT_COMMIT_BATCH_SIZE):
+            vol.All(vol.Coerce(int), vol.Range(min=1)),
     })
 }, extra=vol.ALLOW_EXTRA)
 
@@ -84,7 +104,7 @@ def run_information(hass, point_in_time: Optional[datetime] = None):
     if point_in_time is None or point_in_time > ins.recording_start:
         return ins.run_info
 
-    with session_scope(hass=hass) as session:
+    with session_scope(hass=hass, read_only=True) as session:
         res = session.query(recorder_runs).filter(
             (recorder_runs.start < point_in_time) &
             (recorder_runs.end > point_in_time)).first()
@@ -93,11 +113,26 @@ def run_information(hass, point_in_time: Optional[datetime] = None):
         return res
 
 
+@bind_hass
+@callback
+def async_register_logbook(hass, event_types, keep_event):
+    """Write logbook entries for the events the logbook shows.
+
+    Entries are written for the events of event_types that keep_event,
+    called in the recorder thread with the native event, returns True for.
+    """
+    hass.data[DATA_INSTANCE].logbook_filter = (
+        frozenset(event_types), keep_event)
+
+
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     """Set up the recorder."""
     conf = config.get(DOMAIN, {})
     keep_days = conf.get(CONF_PURGE_KEEP_DAYS)
     purge_interval = conf.get(CONF_PURGE_INTERVAL)
+    commit_interval = conf.get(CONF_COMMIT_INTERVAL, DEFAULT_COMMIT_INTERVAL)
+    commit_batch_size = conf.get(
+        CONF_COMMIT_BATCH_SIZE, DEFAULT_COMMIT_BATCH_SIZE)
 
     db_url = conf.get(CONF_DB_URL, None)
     if not db_url:
@@ -108,7 +143,8 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     exclude = conf.get(CONF_EXCLUDE, {})
     instance = hass.data[DATA_INSTANCE] = Recorder(
         hass=hass, keep_days=keep_days, purge_interval=purge_interval,
-        uri=db_url, include=include, exclude=exclude)
+        uri=db_url, include=include, exclude=exclude,
+        commit_interval=commit_interval, commit_batch_size=commit_batch_size)
     instance.async_initialize()
     instance.start()
 
@@ -120,9 +156,20 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
         DOMAIN, SERVICE_PURGE, async_handle_purge_service,
         schema=SERVICE_PURGE_SCHEMA)
 
+    websocket_api.async_register_command(hass, websocket_stats)
+
     return await instance.async_db_ready
 
 
+@websocket_api.websocket_command({
+    vol.Required('type'): WS_TYPE_STATS,
+})
+@callback
+def websocket_stats(hass, connection, msg):
+    """Return the recorder statistics."""
+    connection.send_result(msg['id'], hass.data[DATA_INSTANCE].get_stats())
+
+
 PurgeTask = namedtuple('PurgeTask', ['keep_days', 'repack'])
 
 
@@ -131,13 +178,17 @@ class Recorder(threading.Thread):
 
     def __init__(self, hass: HomeAssistant, keep_days: int,
                  purge_interval: int, uri: str,
-                 include: Dict, exclude: Dict) -> None:
+                 include: Dict, exclude: Dict,
+                 commit_interval: float = DEFAULT_COMMIT_INTERVAL,
+                 commit_batch_size: int = DEFAULT_COMMIT_BATCH_SIZE) -> None:
         """Initialize the recorder."""
         threading.Thread.__init__(self, name='Recorder')
 
         self.hass = hass
         self.keep_days = keep_days
         self.purge_interval = purge_interval
+        self.commit_interval = commit_interval
+        self.commit_batch_size = commit_batch_size
         self.queue = queue.Queue()  # type: Any
         self.recording_start = dt_util.utcnow()
         self.db_url = uri
@@ -149,8 +200,17 @@ class Recorder(threading.Thread):
             include.get(CONF_DOMAINS, []), include.get(CONF_ENTITIES, []),
             exclude.get(CONF_DOMAINS, []), exclude.get(CONF_ENTITIES, []))
         self.exclude_t = exclude.get(CONF_EVENT_TYPES, [])
+        # Event types and predicate registered by the logbook
+        self.logbook_filter = None  # type: Optional[Tuple]
 
+        self.stats = RecorderStats()
         self.get_session = None
+        # Sessions for reads outside the recorder thread, which do not
+        # wait for the connection the recorder writes with
+        self.read_engine = None  # type: Any
+        self.get_read_session = None
+        # JSON encoded attributes mapped to their state_attributes row
+        self._attributes_ids = OrderedDict()  # type: OrderedDict
 
     @callback
     def async_initialize(self):
@@ -166,9 +226,8 @@ class Recorder(threading.Thread):
 
     def run(self):
         """Start processing events to save."""
-        from .models import States, Events
+        from .models import Events
         from homeassistant.components import persistent_notification
-        from sqlalchemy import exc
 
         tries = 1
         connected = False
@@ -258,73 +317,249 @@ class Recorder(threading.Thread):
 
             self.hass.helpers.event.track_point_in_time(async_purge, run)
 
+        # Events waiting to be committed in one transaction. Their queue
+        # items are marked done once committed so block_till_done keeps
+        # waiting for them.
+        pending = []
+        batch_deadline = None
+
         while True:
-            event = self.queue.get()
+            try:
+                if pending:
+                    event = self.queue.get(timeout=max(
+                        batch_deadline - time.monotonic(), 0))
+                else:
+                    event = self.queue.get()
+            except queue.Empty:
+                self._commit_pending(pending)
+                continue
 
             if event is None:
+                self._commit_pending(pending)
                 self._close_run()
                 self._close_connection()
                 self.queue.task_done()
                 return
             if isinstance(event, PurgeTask):
-                purge.purge_old_data(self, event.keep_days, event.repack)
+                self._commit_pending(pending)
+                # Purge one batch at a time and queue the rest behind the
+                # events that came in meanwhile
+                if not purge.purge_old_data(
+                        self, event.keep_days, event.repack):
+                    self.queue.put(event)
                 self.queue.task_done()
                 continue
             elif event.event_type == EVENT_TIME_CHANGED:
                 self.queue.task_done()
                 continue
             elif event.event_type in self.exclude_t:
+                self.stats.record_filtered()
                 self.queue.task_done()
                 continue
 
             entity_id = event.data.get(ATTR_ENTITY_ID)
             if entity_id is not None:
                 if not self.entity_filter(entity_id):
+                    self.stats.record_filtered()
                     self.queue.task_done()
                     continue
 
-            tries = 1
-            updated = False
-            while not updated and tries <= 10:
-                if tries != 1:
-                    time.sleep(CONNECT_RETRY_WAIT)
-                try:
-                    with session_scope(session=self.get_session()) as session:
-                        try:
-                            dbevent = Events.from_event(event)
-                            session.add(dbevent)
-                            session.flush()
-                        except (TypeError, ValueError):
-                            _LOGGER.warning(
-                                "Event is not JSON serializable: %s", event)
-
-                        if event.event_type == EVENT_STATE_CHANGED:
-                            try:
-                                dbstate = States.from_event(event)
-                                dbstate.event_id = dbevent.event_id
-                                session.add(dbstate)
-                            except (TypeError, ValueError):
-                                _LOGGER.warning(
-                                    "State is not JSON serializable: %s",
-                                    event.data.get('new_state'))
-
-                    updated = True
-
-                except exc.OperationalError as err:
-                    _LOGGER.error("Error in database connectivity: %s. "
-                                  "(retrying in %s seconds)", err,
-                                  CONNECT_RETRY_WAIT)
-                    tries += 1
-
-                except exc.SQLAlchemyError:
-                    updated = True
-                    _LOGGER.exception("Error saving event: %s", event)
-
-            if not updated:
-                _LOGGER.error("Error in database update. Could not save "
-                              "after %d tries. Giving up", tries)
+            if not pending:
+                batch_deadline = time.monotonic() + self.commit_interval
+            pending.append(event)
 
+            if len(pending) >= self.commit_batch_size:
+                self._commit_pending(pending)
+
+    def _commit_pending(self, pending):
+        """Commit the pending events and mark them done in the queue."""
+        if not pending:
+            return
+
+        self._commit_events(pending)
+
+        for _ in range(len(pending)):
             self.queue.task_done()
+        pending.clear()
+
+    def _commit_events(self, events):
+        """Save events and their states in a single transaction."""
+        from sqlalchemy import exc
+
+        tries = 1
+        updated = False
+        while not updated and tries <= 10:
+            if tries != 1:
+                time.sleep(CONNECT_RETRY_WAIT)
+            # Attribute rows added by this attempt, only remembered once
+            # the transaction is committed
+            new_attributes_ids = {}
+            try:
+                start = time.perf_counter()
+                with session_scope(session=self.get_session()) as session:
+                    rows, serialize_time = self._save_events(
+                        session, events, new_attributes_ids)
+
+                for shared_attrs, attributes_id in \
+                        new_attributes_ids.items():
+                    self._cache_attributes_id(shared_attrs, attributes_id)
+
+                self.stats.record_batch(
+                    len(events), rows, serialize_time,
+                    time.perf_counter() - start - serialize_time)
+                updated = True
+
+            except exc.OperationalError as err:
+                _LOGGER.error("Error in database connectivity: %s. "
+                              "(retrying in %s seconds)", err,
+                              CONNECT_RETRY_WAIT)
+                tries += 1
+
+            except exc.SQLAlchemyError:
+                updated = True
+
+                if len(events) == 1:
+                    _LOGGER.exception("Error saving event: %s", events[0])
+                else:
+                    # Save events one by one so a bad event does not take
+                    # the rest of the batch down with it
+                    for event in events:
+                        self._commit_events([event])
+
+        if not updated:
+            _LOGGER.error("Error in database update. Could not save "
+                          "after %d tries. Giving up", tries)
+
+    def _save_events(self, session, events, new_attributes_ids):
+        """Add events, their states and logbook entries in bulk.
+
+        Returns the number of rows added and the time spent serializing.
+        """
+        from .models import States, Events, LogbookEntries
+
+        serialize_time = 0.0
+        start = time.perf_counter()
+        saved = []
+        for event in events:
+            try:
+                saved.append((event, Events.from_event(event)))
+            except (TypeError, ValueError):
+                _LOGGER.warning(
+                    "Event is not JSON serializable: %s", event)
+
+        serialize_time += time.perf_counter() - start
+
+        # A single flush assigns the event ids the states refer to
+        session.add_all([dbevent for _, dbevent in saved])
+        session.flush()
+
+        start = time.perf_counter()
+        dbstates = []
+        dbentries = []
+        logbook_filter = self.logbook_filter
+        for event, dbevent in saved:
+            if logbook_filter is not None and \
+                    event.event_type in logbook_filter[0] and \
+                    logbook_filter[1](event):
+                dbentry = LogbookEntries.from_event(event, dbevent.event_data)
+                dbentry.event_id = dbevent.event_id
+                dbentries.append(dbentry)
+
+            if event.event_type != EVENT_STATE_CHANGED:
+                continue
+
+            try:
+                dbstate = States.from_event(event)
+            except (TypeError, ValueError):
+                _LOGGER.warning(
+                    "State is not JSON serializable: %s",
+                    event.data.get('new_state'))
+                continue
+
+            dbstate.event_id = dbevent.event_id
+            dbstates.append(dbstate)
+
+        serialize_time += time.perf_counter() - start
+
+        attributes_ids = self._get_attributes_ids(
+            session, {dbstate.attributes for dbstate in dbstates},
+            new_attributes_ids)
+        for dbstate in dbstates:
+            dbstate.attributes_id = attributes_ids[dbstate.attributes]
+            dbstate.attributes = None
+
+        session.bulk_save_objects(dbstates)
+        session.bulk_save_objects(dbentries)
+
+        return (len(saved) + len(dbstates) + len(dbentries) +
+                len(new_attributes_ids), serialize_time)
+
+    def _get_attributes_ids(self, session, all_shared_attrs,
+                            new_attributes_ids):
+        """Return the ids of the rows holding the attribute blobs.
+
+        Blobs that are not cached are looked up together, the ones not
+        stored yet are added with a single flush.
+        """
+        from .models import StateAttributes
+
+        attributes_ids = {}
+        hashes = {}
+        for shared_attrs in all_shared_attrs:
+            attributes_id = self._attributes_ids.get(shared_attrs)
+            if attributes_id is not None:
+                self._attributes_ids.move_to_end(shared_attrs)
+                attributes_ids[shared_attrs] = attributes_id
+            else:
+                hashes[shared_attrs] = \
+                    StateAttributes.hash_shared_attrs(shared_attrs)
+
+        if not hashes:
+            return attributes_ids
+
+        # Blobs with the same hash are told apart by their content
+        all_hashes = list(set(hashes.values()))
+        for index in range(0, len(all_hashes), ATTRIBUTES_LOOKUP_SIZE):
+            query = session.query(
+                StateAttributes.attributes_id,
+                StateAttributes.shared_attrs).filter(
+                    StateAttributes.hash.in_(
+                        all_hashes[index:index + ATTRIBUTES_LOOKUP_SIZE]))
+
+            for attributes_id, shared_attrs in query:
+                if shared_attrs in hashes:
+                    del hashes[shared_attrs]
+                    attributes_ids[shared_attrs] = attributes_id
+                    self._cache_attributes_id(shared_attrs, attributes_id)
+
+        if not hashes:
+            return attributes_ids
+
+        added = [StateAttributes(hash=attr_hash, shared_attrs=shared_attrs)
+                 for shared_attrs, attr_hash in hashes.items()]
+        session.add_all(added)
+        session.flush()
+
+        for dbattributes in added:
+            new_attributes_ids[dbattributes.shared_attrs] = \
+                dbattributes.attributes_id
+            attributes_ids[dbattributes.shared_attrs] = \
+                dbattributes.attributes_id
+
+        return attributes_ids
+
+    def _cache_attributes_id(self, shared_attrs, attributes_id):
+        """Remember the row id of an attributes blob."""
+        self._attributes_ids[shared_attrs] = attributes_id
+        if len(self._attributes_ids) > ATTRIBUTES_ID_CACHE_SIZE:
+            self._attributes_ids.popitem(last=False)
+
+    def clear_attributes_cache(self):
+        """Forget attribute row ids, for when attribute rows got deleted."""
+        from .models import clear_attributes_cache
+
+        self._attributes_ids.clear()
+        clear_attributes_cache()
 
     @callback
     def event_listener(self, event):
@@ -335,12 +570,17 @@ class Recorder(threading.Thread):
         """Block till all events processed."""
         self.queue.join()
 
+    def get_stats(self):
+        """Return queue depth, filter, timing and throughput statistics."""
+        return self.stats.as_dict(queue_depth=self.queue.qsize())
+
     def _setup_connection(self):
         """Ensure database is ready to fly."""
         from sqlalchemy import create_engine, event
         from sqlalchemy.engine import Engine
         from sqlalchemy.orm import scoped_session
         from sqlalchemy.orm import sessionmaker
+        from sqlalchemy.pool import StaticPool
         from sqlite3 import Connection
 
         from . import models
@@ -355,13 +595,14 @@ class Recorder(threading.Thread):
                 old_isolation = dbapi_connection.isolation_level
                 dbapi_connection.isolation_level = None
                 cursor = dbapi_connection.cursor()
+                # Only takes effect on new databases, existing ones are
+                # converted by a purge with repack
+                cursor.execute("PRAGMA auto_vacuum=INCREMENTAL")
                 cursor.execute("PRAGMA journal_mode=WAL")
                 cursor.close()
                 dbapi_connection.isolation_level = old_isolation
 
         if self.db_url == 'sqlite://' or ':memory:' in self.db_url:
-            from sqlalchemy.pool import StaticPool
-
             kwargs['connect_args'] = {'check_same_thread': False}
             kwargs['poolclass'] = StaticPool
             kwargs['pool_reset_on_return'] = None
@@ -375,11 +616,27 @@ class Recorder(threading.Thread):
         models.Base.metadata.create_all(self.engine)
         self.get_session = scoped_session(sessionmaker(bind=self.engine))
 
+        if self.read_engine is not None:
+            self.read_engine.dispose()
+            self.read_engine = None
+
+        if kwargs.get('poolclass') is StaticPool:
+            # An in memory database only exists on its single connection
+            self.get_read_session = self.get_session
+        else:
+            self.read_engine = pool.create_read_engine(self.db_url)
+            self.get_read_session = scoped_session(
+                sessionmaker(bind=self.read_engine))
+
     def _close_connection(self):
         """Close the connection."""
+        if self.read_engine is not None:
+            self.read_engine.dispose()
+            self.read_engine = None
         self.engine.dispose()
         self.engine = None
         self.get_session = None
+        self.get_read_session = None
 
     def _setup_run(self):
         """Log the start of the current run."""
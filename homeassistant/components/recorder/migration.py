@@ -221,14 +221,24 @@ def _apply_update(engine, new_version, old_version):
     elif new_version == 7:
         _create_index(engine, "states", "ix_states_entity_id")
     elif new_version == 8:
+        # The state_attributes table is created with the other tables.
+        # Existing rows keep their inline attributes.
+        _add_columns(engine, "states", [
+            'attributes_id INTEGER',
+        ])
+        _create_index(engine, "states", "ix_states_attributes_id")
         # Pending migration, want to group a few.
-        pass
         # _add_columns(engine, "events", [
         #     'context_parent_id CHARACTER(36)',
         # ])
         # _add_columns(engine, "states", [
         #     'context_parent_id CHARACTER(36)',
         # ])
+    elif new_version == 9:
+        # The logbook_entries table is created with the other tables. It
+        # is filled from now on, the logbook reads older events from the
+        # events table.
+        pass
     else:
         raise ValueError("No schema migration defined for version {}"
                          .format(new_version))
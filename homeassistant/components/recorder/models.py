@@ -1,12 +1,16 @@
 """Models for SQLAlchemy."""
+from collections import OrderedDict
 import json
 from datetime import datetime
 import logging
+import threading
+import zlib
 
 from sqlalchemy import (
-    Boolean, Column, DateTime, ForeignKey, Index, Integer, String, Text,
-    distinct)
+    BigInteger, Boolean, Column, DateTime, ForeignKey, Index, Integer, String,
+    Text, distinct)
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import relationship
 
 import homeassistant.util.dt as dt_util
 from homeassistant.core import (
@@ -17,10 +21,16 @@ from homeassistant.helpers.json import JSONEncoder
 # pylint: disable=invalid-name
 Base = declarative_base()
 
-SCHEMA_VERSION = 7
+SCHEMA_VERSION = 9
+
+# Number of decoded attribute blobs kept in memory
+ATTRIBUTES_CACHE_SIZE = 2048
 
 _LOGGER = logging.getLogger(__name__)
 
+_ATTRIBUTES_CACHE = OrderedDict()  # type: OrderedDict
+_ATTRIBUTES_CACHE_LOCK = threading.Lock()
+
 
 class Events(Base):  # type: ignore
     """Event history data."""
@@ -39,9 +49,15 @@ class Events(Base):  # type: ignore
     @staticmethod
     def from_event(event):
         """Create an event database object from a native event."""
+        try:
+            event_data = event.data_as_json()
+        except ValueError:
+            # The memoized JSON is strict about NaN
+            event_data = json.dumps(event.data, cls=JSONEncoder)
+
         return Events(
             event_type=event.event_type,
-            event_data=json.dumps(event.data, cls=JSONEncoder),
+            event_data=event_data,
             origin=str(event.origin),
             time_fired=event.time_fired,
             context_id=event.context.id,
@@ -78,6 +94,12 @@ class States(Base):   # type: ignore
     entity_id = Column(String(255), index=True)
     state = Column(String(255))
     attributes = Column(Text)
+    attributes_id = Column(Integer,
+                           ForeignKey('state_attributes.attributes_id'),
+                           index=True)
+    # Outer joined by every query for state rows, so decoding the
+    # attributes of the rows does not query them one at a time
+    shared_attributes = relationship('StateAttributes', lazy='joined')
     event_id = Column(Integer, ForeignKey('events.event_id'), index=True)
     last_changed = Column(DateTime(timezone=True), default=datetime.utcnow)
     last_updated = Column(DateTime(timezone=True), default=datetime.utcnow,
@@ -131,9 +153,14 @@ class States(Base):   # type: ignore
             user_id=self.context_user_id
         )
         try:
+            if self.attributes is None and self.attributes_id is not None:
+                attributes = _get_shared_attributes(self)
+            else:
+                attributes = json.loads(self.attributes)
+
             return State(
                 self.entity_id, self.state,
-                json.loads(self.attributes),
+                attributes,
                 _process_timestamp(self.last_changed),
                 _process_timestamp(self.last_updated),
                 context=context,
@@ -147,6 +174,104 @@ class States(Base):   # type: ignore
             return None
 
 
+class StateAttributes(Base):   # type: ignore
+    """Attributes shared by state rows."""
+
+    __tablename__ = 'state_attributes'
+    attributes_id = Column(Integer, primary_key=True)
+    hash = Column(BigInteger, index=True)
+    shared_attrs = Column(Text)
+
+    @staticmethod
+    def hash_shared_attrs(shared_attrs):
+        """Return the hash used to look up a JSON encoded attributes blob."""
+        return zlib.crc32(shared_attrs.encode('utf-8'))
+
+
+class LogbookEntries(Base):   # type: ignore
+    """Events shown in the logbook, with the state change details decoded.
+
+    Rows are written together with their events, for the events the
+    logbook registered with the recorder. Reading the logbook does not
+    need to decode the state_changed event data.
+    """
+
+    __tablename__ = 'logbook_entries'
+    entry_id = Column(Integer, primary_key=True)
+    event_id = Column(Integer, ForeignKey('events.event_id'), index=True)
+    event_type = Column(String(32))
+    time_fired = Column(DateTime(timezone=True), index=True)
+    entity_id = Column(String(255), index=True)
+    domain = Column(String(64))
+    state = Column(String(255))
+    name = Column(String(255))
+    # JSON encoded data of events other than state changes
+    event_data = Column(Text)
+    context_id = Column(String(36))
+    context_user_id = Column(String(36))
+
+    @staticmethod
+    def from_event(event, event_data=None):
+        """Create a logbook entry from a native event.
+
+        State changes keep the details of their new state, other events
+        their JSON encoded event_data.
+        """
+        if event.event_type != 'state_changed':
+            return LogbookEntries(
+                event_type=event.event_type,
+                time_fired=event.time_fired,
+                entity_id=event.data.get('entity_id'),
+                event_data=event_data,
+                context_id=event.context.id,
+                context_user_id=event.context.user_id,
+            )
+
+        new_state = event.data['new_state']
+        return LogbookEntries(
+            event_type=event.event_type,
+            time_fired=event.time_fired,
+            entity_id=new_state.entity_id,
+            domain=new_state.domain,
+            state=new_state.state,
+            name=new_state.name,
+            context_id=event.context.id,
+            context_user_id=event.context.user_id,
+        )
+
+    def to_native(self):
+        """Convert to an event with the data the logbook reads."""
+        context = Context(
+            id=self.context_id,
+            user_id=self.context_user_id
+        )
+
+        if self.event_type == 'state_changed':
+            data = {
+                'entity_id': self.entity_id,
+                'new_state': {
+                    'entity_id': self.entity_id,
+                    'state': self.state,
+                    'attributes': {'friendly_name': self.name},
+                },
+            }
+        else:
+            try:
+                data = json.loads(self.event_data or '{}')
+            except ValueError:
+                # When json.loads fails
+                _LOGGER.exception("Error converting entry to event: %s", self)
+                return None
+
+        return Event(
+            self.event_type,
+            data,
+            EventOrigin.local,
+            _process_timestamp(self.time_fired),
+            context=context,
+        )
+
+
 class RecorderRuns(Base):   # type: ignore
     """Representation of recorder run."""
 
@@ -203,3 +328,31 @@ def _process_timestamp(ts):
         return dt_util.UTC.localize(ts)
 
     return dt_util.as_utc(ts)
+
+
+def _get_shared_attributes(dbstate):
+    """Return the decoded attributes a state row refers to."""
+    attributes_id = dbstate.attributes_id
+
+    with _ATTRIBUTES_CACHE_LOCK:
+        attributes = _ATTRIBUTES_CACHE.get(attributes_id)
+        if attributes is not None:
+            _ATTRIBUTES_CACHE.move_to_end(attributes_id)
+            return attributes
+
+    # Loaded together with the state row
+    row = dbstate.shared_attributes
+    attributes = json.loads(row.shared_attrs) if row is not None else {}
+
+    with _ATTRIBUTES_CACHE_LOCK:
+        _ATTRIBUTES_CACHE[attributes_id] = attributes
+        if len(_ATTRIBUTES_CACHE) > ATTRIBUTES_CACHE_SIZE:
+            _ATTRIBUTES_CACHE.popitem(last=False)
+
+    return attributes
+
+
+def clear_attributes_cache():
+    """Forget decoded attributes, for when attribute rows got deleted."""
+    with _ATTRIBUTES_CACHE_LOCK:
+        _ATTRIBUTES_CACHE.clear()
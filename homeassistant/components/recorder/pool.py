@@ -0,0 +1,108 @@
+"""Read only connections for queries outside the recorder thread."""
+import logging
+import sqlite3
+import time
+
+_LOGGER = logging.getLogger(__name__)
+
+# Connections reading at the same time, more readers wait for one of them
+MAX_READERS = 4
+# Seconds a reader waits for a free connection
+READER_WAIT_TIMEOUT = 30
+# Seconds a single read query may run
+READ_QUERY_TIMEOUT = 60
+
+# SQLite virtual machine instructions between checks of the query timeout
+SQLITE_PROGRESS_STEPS = 10000
+
+# Error messages of queries interrupted by READ_QUERY_TIMEOUT
+QUERY_TIMEOUT_ERRORS = (
+    'interrupted',
+    'canceling statement due to statement timeout',
+    'maximum statement execution time exceeded',
+    'max_statement_time exceeded',
+)
+
+
+def create_read_engine(db_url, max_readers=MAX_READERS,
+                       query_timeout=READ_QUERY_TIMEOUT):
+    """Create an engine with a pool of read only connections.
+
+    Reads through this engine do not hold the connection the recorder
+    writes with, SQLite runs them side by side with the writer in WAL mode.
+    """
+    from sqlalchemy import create_engine, event
+    from sqlalchemy.pool import QueuePool
+
+    kwargs = {
+        'poolclass': QueuePool,
+        'pool_size': max_readers,
+        'max_overflow': 0,
+        'pool_timeout': READER_WAIT_TIMEOUT,
+        'echo': False,
+    }
+
+    if db_url.startswith('sqlite'):
+        kwargs['connect_args'] = {'check_same_thread': False}
+    elif db_url.startswith('postgresql'):
+        kwargs['connect_args'] = {
+            'options': '-c default_transaction_read_only=on '
+                       '-c statement_timeout={}'.format(
+                           int(query_timeout * 1000)),
+        }
+
+    engine = create_engine(db_url, **kwargs)
+
+    # pylint: disable=unused-variable
+    @event.listens_for(engine, 'connect')
+    def set_read_only(dbapi_connection, connection_record):
+        """Make the connection refuse writes and limit query times."""
+        if isinstance(dbapi_connection, sqlite3.Connection):
+            dbapi_connection.execute('PRAGMA query_only = ON')
+        elif engine.dialect.name == 'mysql':
+            _set_mysql_read_only(dbapi_connection, query_timeout)
+
+    if engine.dialect.name == 'sqlite':
+        @event.listens_for(engine, 'before_cursor_execute')
+        def start_query_timer(connection, cursor, statement, parameters,
+                              context, executemany):
+            """Interrupt the query when it runs longer than the timeout."""
+            deadline = time.monotonic() + query_timeout
+            connection.connection.connection.set_progress_handler(
+                lambda: time.monotonic() > deadline, SQLITE_PROGRESS_STEPS)
+
+        @event.listens_for(engine, 'after_cursor_execute')
+        def stop_query_timer(connection, cursor, statement, parameters,
+                             context, executemany):
+            """Stop timing once the query returned.
+
+            Rows fetched later are read as fast as the caller consumes them,
+            like streamed history, which the timeout must not interrupt.
+            """
+            connection.connection.connection.set_progress_handler(None, 0)
+
+    return engine
+
+
+def _set_mysql_read_only(dbapi_connection, query_timeout):
+    """Make a MySQL or MariaDB session read only with a query timeout."""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute('SET SESSION TRANSACTION READ ONLY')
+        try:
+            cursor.execute('SET SESSION max_execution_time = {}'.format(
+                int(query_timeout * 1000)))
+        except Exception:  # pylint: disable=broad-except
+            # MariaDB names it differently and counts in seconds
+            cursor.execute('SET SESSION max_statement_time = {}'.format(
+                float(query_timeout)))
+    except Exception as err:  # pylint: disable=broad-except
+        _LOGGER.warning("Unable to limit read connection: %s", err)
+    finally:
+        cursor.close()
+
+
+def is_query_timeout(err):
+    """Return if a database error is a read query running out of time."""
+    message = str(err).lower()
+    return any(error in message for error in QUERY_TIMEOUT_ERRORS)
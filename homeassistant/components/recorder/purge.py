@@ -8,10 +8,24 @@ from .util import session_scope
 
 _LOGGER = logging.getLogger(__name__)
 
+# Rows deleted per transaction, so writes queued behind a purge only
+# wait for a single batch
+PURGE_BATCH_SIZE = 1000
+
+# Free pages handed back to the file system after each batch when SQLite
+# runs with auto_vacuum=INCREMENTAL
+INCREMENTAL_VACUUM_PAGES = 1000
+
+SQLITE_AUTO_VACUUM_INCREMENTAL = 2
+
 
 def purge_old_data(instance, purge_days, repack):
-    """Purge events and states older than purge_days ago."""
-    from .models import States, Events
+    """Purge a batch of events and states older than purge_days ago.
+
+    Returns True when no old data is left, False if the purge needs to be
+    called again to delete the next batch.
+    """
+    from .models import States, StateAttributes, Events, LogbookEntries
     from sqlalchemy.exc import SQLAlchemyError
 
     purge_before = dt_util.utcnow() - timedelta(days=purge_days)
@@ -19,20 +33,93 @@ def purge_old_data(instance, purge_days, repack):
 
     try:
         with session_scope(session=instance.get_session()) as session:
-            deleted_rows = session.query(States) \
-                .filter((States.last_updated < purge_before)) \
-                .delete(synchronize_session=False)
-            _LOGGER.debug("Deleted %s states", deleted_rows)
+            rows = session.query(States.state_id, States.attributes_id) \
+                .filter(States.last_updated < purge_before) \
+                .limit(PURGE_BATCH_SIZE).all()
+            deleted_states = _delete_ids(
+                session, States, States.state_id, [row[0] for row in rows])
+            _LOGGER.debug("Deleted %s states", deleted_states)
+
+            # Attributes no longer referenced by any state
+            attributes_ids = {row[1] for row in rows if row[1] is not None}
+            if attributes_ids:
+                attributes_ids -= {
+                    row[0] for row in session.query(States.attributes_id)
+                    .filter(States.attributes_id.in_(attributes_ids))
+                    .distinct()}
+            deleted_attributes = _delete_ids(
+                session, StateAttributes, StateAttributes.attributes_id,
+                list(attributes_ids))
+
+            deleted_entries = 0
+            if deleted_states < PURGE_BATCH_SIZE:
+                entry_ids = [
+                    row[0] for row in session.query(LogbookEntries.entry_id)
+                    .filter(LogbookEntries.time_fired < purge_before)
+                    .limit(PURGE_BATCH_SIZE - deleted_states)]
+                deleted_entries = _delete_ids(
+                    session, LogbookEntries, LogbookEntries.entry_id,
+                    entry_ids)
+                _LOGGER.debug("Deleted %s logbook entries", deleted_entries)
+
+            # Events are only deleted once their states and logbook entries
+            # are gone
+            deleted_rows = deleted_states + deleted_entries
+            event_ids = []
+            if deleted_rows < PURGE_BATCH_SIZE:
+                event_ids = [
+                    row[0] for row in session.query(Events.event_id)
+                    .filter(Events.time_fired < purge_before)
+                    .limit(PURGE_BATCH_SIZE - deleted_rows)]
+            deleted_events = _delete_ids(
+                session, Events, Events.event_id, event_ids)
+            _LOGGER.debug("Deleted %s events", deleted_events)
+
+        if deleted_attributes:
+            instance.clear_attributes_cache()
+
+        finished = deleted_rows + deleted_events < PURGE_BATCH_SIZE
 
-            deleted_rows = session.query(Events) \
-                .filter((Events.time_fired < purge_before)) \
-                .delete(synchronize_session=False)
-            _LOGGER.debug("Deleted %s events", deleted_rows)
+        if instance.engine.driver == 'pysqlite':
+            if repack and finished:
+                # Execute sqlite vacuum command to free up space on disk
+                # and switch to incremental vacuum for later purges
+                _LOGGER.debug("Vacuuming SQLite to free space")
+                instance.engine.execute("PRAGMA auto_vacuum=INCREMENTAL")
+                instance.engine.execute("VACUUM")
+            elif _sqlite_auto_vacuum(instance) == \
+                    SQLITE_AUTO_VACUUM_INCREMENTAL:
+                _sqlite_incremental_vacuum(instance)
 
-        # Execute sqlite vacuum command to free up space on disk
-        if repack and instance.engine.driver == 'pysqlite':
-            _LOGGER.debug("Vacuuming SQLite to free space")
-            instance.engine.execute("VACUUM")
+        return finished
 
     except SQLAlchemyError as err:
         _LOGGER.warning("Error purging history: %s.", err)
+        return True
+
+
+def _delete_ids(session, table, column, ids):
+    """Delete the rows of table with the given primary keys."""
+    if not ids:
+        return 0
+
+    return session.query(table) \
+        .filter(column.in_(ids)) \
+        .delete(synchronize_session=False)
+
+
+def _sqlite_auto_vacuum(instance):
+    """Return the auto_vacuum mode of the SQLite database."""
+    return instance.engine.execute("PRAGMA auto_vacuum").scalar()
+
+
+def _sqlite_incremental_vacuum(instance):
+    """Release a bounded number of free pages to the file system."""
+    connection = instance.engine.raw_connection()
+    try:
+        # The pragma frees a single page per step of the statement, a
+        # script runs it to completion
+        connection.connection.executescript(
+            "PRAGMA incremental_vacuum({})".format(INCREMENTAL_VACUUM_PAGES))
+    finally:
+        connection.close()
@@ -0,0 +1,69 @@
+"""Statistics about the work done by the recorder."""
+import threading
+import time
+
+
+class RecorderStats:
+    """Counters updated by the recorder thread.
+
+    Readers call as_dict for a consistent snapshot. It is safe to call from
+    any thread, so stats exporters can poll it directly.
+    """
+
+    def __init__(self):
+        """Initialize the counters."""
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self.events_filtered = 0
+        self.events_recorded = 0
+        self.rows_written = 0
+        self.batches = 0
+        self.last_batch_events = 0
+        self.last_batch_rows = 0
+        self.last_serialize_time = 0.0
+        self.last_commit_time = 0.0
+        self.total_serialize_time = 0.0
+        self.total_commit_time = 0.0
+
+    def record_filtered(self):
+        """Count an event dropped by the recorder filters."""
+        with self._lock:
+            self.events_filtered += 1
+
+    def record_batch(self, events, rows, serialize_time, commit_time):
+        """Count a committed batch and how long it took."""
+        with self._lock:
+            self.batches += 1
+            self.events_recorded += events
+            self.rows_written += rows
+            self.last_batch_events = events
+            self.last_batch_rows = rows
+            self.last_serialize_time = serialize_time
+            self.last_commit_time = commit_time
+            self.total_serialize_time += serialize_time
+            self.total_commit_time += commit_time
+
+    def as_dict(self, queue_depth=None):
+        """Return a snapshot of the counters."""
+        with self._lock:
+            uptime = time.monotonic() - self._started
+            last_batch_time = self.last_serialize_time + self.last_commit_time
+
+            return {
+                'queue_depth': queue_depth,
+                'events_filtered': self.events_filtered,
+                'events_recorded': self.events_recorded,
+                'rows_written': self.rows_written,
+                'batches': self.batches,
+                'last_batch_events': self.last_batch_events,
+                'last_batch_rows': self.last_batch_rows,
+                'last_serialize_time': self.last_serialize_time,
+                'last_commit_time': self.last_commit_time,
+                'total_serialize_time': self.total_serialize_time,
+                'total_commit_time': self.total_commit_time,
+                'rows_per_second':
+                    self.rows_written / uptime if uptime else 0.0,
+                'last_batch_rows_per_second':
+                    self.last_batch_rows / last_batch_time
+                    if last_batch_time else 0.0,
+            }
@@ -4,6 +4,7 @@ import logging
 import time
 
 from .const import DATA_INSTANCE
+from .pool import is_query_timeout
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -12,10 +13,18 @@ QUERY_RETRY_WAIT = 0.1
 
 
 @contextmanager
-def session_scope(*, hass=None, session=None):
-    """Provide a transactional scope around a series of operations."""
+def session_scope(*, hass=None, session=None, read_only=False):
+    """Provide a transactional scope around a series of operations.
+
+    With read_only the session comes from the pool of read only
+    connections, so it does not hold up the recorder writing events.
+    """
     if session is None and hass is not None:
-        session = hass.data[DATA_INSTANCE].get_session()
+        instance = hass.data[DATA_INSTANCE]
+        if read_only:
+            session = instance.get_read_session()
+        else:
+            session = instance.get_session()
 
     if session is None:
         raise RuntimeError('Session required')
@@ -78,6 +87,7 @@ def execute(qry):
         except SQLAlchemyError as err:
             _LOGGER.error("Error executing query: %s", err)
 
-            if tryno == RETRIES - 1:
+            # A query that ran out of time would do so again
+            if tryno == RETRIES - 1 or is_query_timeout(err):
                 raise
             time.sleep(QUERY_RETRY_WAIT)
@@ -259,38 +259,51 @@ class StatisticsSensor(Entity):
     async def _async_initialize_from_database(self):
         """Initialize the list of states from the database.
 
-        The query will get the list of states in DESCENDING order so that we
-        can limit the result to self._sample_size. Afterwards reverse the
-        list so that we get it in the right order again.
-
-        If MaxAge is provided then query will restrict to entries younger then
-        current datetime - MaxAge.
+        The last self._sampling_size states are queried. If MaxAge is
+        provided the query is restricted to entries younger than current
+        datetime - MaxAge.
         """
-        from homeassistant.components.recorder.models import States
         _LOGGER.debug("%s: initializing values from the database",
                       self.entity_id)
 
-        with session_scope(hass=self.hass) as session:
+        records_older_then = None
+        if self._max_age is not None:
+            records_older_then = dt_util.utcnow() - self._max_age
+            _LOGGER.debug("%s: retrieve records not older then %s",
+                          self.entity_id, records_older_then)
+        else:
+            _LOGGER.debug("%s: retrieving all records.", self.entity_id)
+
+        states = await self.hass.async_add_executor_job(
+            self._get_last_states, records_older_then)
+
+        for state in states:
+            self._add_state_to_queue(state)
+
+        self.async_schedule_update_ha_state(True)
+
+        _LOGGER.debug("%s: initializing from database completed",
+                      self.entity_id)
+
+    def _get_last_states(self, records_older_then):
+        """Return the last self._sampling_size states, oldest first.
+
+        The query gets the states in DESCENDING order so that the result
+        can be limited to self._sampling_size.
+        """
+        from homeassistant.components.recorder.models import States
+
+        with session_scope(hass=self.hass, read_only=True) as session:
             query = session.query(States)\
                 .filter(States.entity_id == self._entity_id.lower())
 
-            if self._max_age is not None:
-                records_older_then = dt_util.utcnow() - self._max_age
-                _LOGGER.debug("%s: retrieve records not older then %s",
-                              self.entity_id, records_older_then)
-                query = query.filter(States.last_updated >= records_older_then)
-            else:
-                _LOGGER.debug("%s: retrieving all records.", self.entity_id)
+            if records_older_then is not None:
+                query = query.filter(
+                    States.last_updated >= records_older_then)
 
             query = query\
                 .order_by(States.last_updated.desc())\
                 .limit(self._sampling_size)
             states = execute(query)
 
-        for state in reversed(states):
-            self._add_state_to_queue(state)
-
-        self.async_schedule_update_ha_state(True)
-
-        _LOGGER.debug("%s: initializing from database completed",
-                      self.entity_id)
+        return list(reversed(states))
@@ -8,6 +8,7 @@ from homeassistant.core import callback, DOMAIN as HASS_DOMAIN
 from homeassistant.exceptions import Unauthorized, ServiceNotFound, \
     HomeAssistantError
 from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.json import JSON_DUMP
 from homeassistant.helpers.service import async_get_all_descriptions
 
 from . import const, decorators, messages
@@ -18,6 +19,7 @@ def async_register_commands(hass, async_reg):
     """Register commands."""
     async_reg(hass, handle_subscribe_events)
     async_reg(hass, handle_unsubscribe_events)
+    async_reg(hass, handle_subscribe_states)
     async_reg(hass, handle_call_service)
     async_reg(hass, handle_get_states)
     async_reg(hass, handle_get_services)
@@ -59,7 +61,7 @@ def handle_subscribe_events(hass, connection, msg):
                     event.data['entity_id'], POLICY_READ):
                 return
 
-            connection.send_message(messages.event_message(msg['id'], event))
+            _send_event(connection, msg['id'], event)
 
     else:
         @callback
@@ -68,9 +70,7 @@ def handle_subscribe_events(hass, connection, msg):
             if event.event_type == EVENT_TIME_CHANGED:
                 return
 
-            connection.send_message(messages.event_message(
-                msg['id'], event.as_dict()
-            ))
+            _send_event(connection, msg['id'], event)
 
     connection.subscriptions[msg['id']] = hass.bus.async_listen(
         event_type, forward_events)
@@ -78,6 +78,195 @@ def handle_subscribe_events(hass, connection, msg):
     connection.send_message(messages.result_message(msg['id']))
 
 
+@callback
+def _send_event(connection, iden, event):
+    """Send an event, reusing the JSON encoded for other subscribers."""
+    try:
+        message = messages.cached_event_message(iden, event)
+    except (ValueError, TypeError):
+        # The writer reports what could not be serialized
+        message = messages.event_message(iden, event.as_dict())
+
+    connection.send_message(message)
+
+
+@callback
+@decorators.websocket_command({
+    vol.Required('type'): 'subscribe_states',
+    vol.Optional('entity_ids'): cv.entity_ids,
+    vol.Optional('domains'): vol.All(cv.ensure_list, [cv.string]),
+    vol.Optional('interval', default=const.DEFAULT_STATES_INTERVAL):
+        vol.All(vol.Coerce(float), vol.Range(
+            min=0, max=const.MAX_STATES_INTERVAL)),
+    vol.Optional('diff', default=False): cv.boolean,
+})
+def handle_subscribe_states(hass, connection, msg):
+    """Handle subscribe states command.
+
+    The current states are sent right away. After that, the latest state of
+    every entity that changed is sent once per interval, optionally as the
+    difference with the state sent before.
+
+    Async friendly.
+    """
+    entity_ids = set(msg.get('entity_ids', ()))
+    domains = {domain.lower() for domain in msg.get('domains', ())}
+    entity_perm = connection.user.permissions.check_entity
+    subscription = StateSubscription(
+        hass, connection, msg['id'], msg['interval'], msg['diff'])
+
+    @callback
+    def wanted(entity_id):
+        """Return if the client subscribed to entity_id."""
+        return ((not entity_ids and not domains) or
+                entity_id in entity_ids or
+                entity_id.partition('.')[0] in domains) and \
+            entity_perm(entity_id, POLICY_READ)
+
+    @callback
+    def forward_state(event):
+        """Queue a state change for the next flush."""
+        entity_id = event.data['entity_id']
+        if wanted(entity_id):
+            subscription.async_add(entity_id, event.data['new_state'])
+
+    unsub_state_changed = hass.bus.async_listen(
+        EVENT_STATE_CHANGED, forward_state)
+
+    @callback
+    def async_unsubscribe():
+        """Stop forwarding states."""
+        unsub_state_changed()
+        subscription.async_cancel()
+
+    connection.subscriptions[msg['id']] = async_unsubscribe
+    connection.send_message(messages.result_message(msg['id']))
+
+    for state in hass.states.async_all():
+        if wanted(state.entity_id):
+            subscription.async_add(state.entity_id, state)
+    subscription.async_flush()
+
+
+class StateSubscription:
+    """Coalesce the state changes sent to a subscribed client."""
+
+    def __init__(self, hass, connection, iden, interval, diff):
+        """Initialize the subscription."""
+        self.hass = hass
+        self.connection = connection
+        self.iden = iden
+        self.interval = interval
+        self.diff = diff
+        # Entity id -> latest state, None if removed
+        self._pending = {}
+        # Entity id -> state last sent, only kept to send differences
+        self._sent = {}
+        self._flush_handle = None
+
+    @callback
+    def async_add(self, entity_id, state):
+        """Queue the latest state of an entity."""
+        self._pending[entity_id] = state
+
+        if self._flush_handle is None:
+            self._flush_handle = self.hass.loop.call_later(
+                self.interval, self.async_flush)
+
+    @callback
+    def async_cancel(self):
+        """Drop the queued states."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self._pending = {}
+
+    @callback
+    def async_flush(self):
+        """Send the queued states to the client."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        if not self._pending:
+            return
+
+        pending, self._pending = self._pending, {}
+        changed = {}
+        diffs = {}
+        removed = []
+
+        for entity_id, state in pending.items():
+            if state is None:
+                removed.append(entity_id)
+                self._sent.pop(entity_id, None)
+                continue
+
+            if self.diff:
+                old_state = self._sent.get(entity_id)
+                self._sent[entity_id] = state
+                if old_state is not None:
+                    diffs[entity_id] = _state_diff(old_state, state)
+                    continue
+
+            changed[entity_id] = state
+
+        try:
+            message = _compressed_state_message(
+                self.iden, changed, diffs, removed)
+        except (ValueError, TypeError):
+            # The writer reports what could not be serialized
+            message = messages.event_message(self.iden, {
+                'changed': changed, 'diff': diffs, 'removed': removed})
+
+        self.connection.send_message(message)
+
+
+def _state_diff(old_state, new_state):
+    """Return what changed between two states of an entity."""
+    diff = {'last_updated': new_state.last_updated}
+
+    if new_state.state != old_state.state:
+        diff['state'] = new_state.state
+    if new_state.last_changed != old_state.last_changed:
+        diff['last_changed'] = new_state.last_changed
+    if new_state.context != old_state.context:
+        diff['context'] = new_state.context.as_dict()
+
+    old_attributes = old_state.attributes
+    new_attributes = new_state.attributes
+    if new_attributes != old_attributes:
+        attributes = {
+            key: value for key, value in new_attributes.items()
+            if key not in old_attributes or old_attributes[key] != value}
+        if attributes:
+            diff['attributes'] = attributes
+        removed = [key for key in old_attributes if key not in new_attributes]
+        if removed:
+            diff['attributes_removed'] = removed
+
+    return diff
+
+
+def _compressed_state_message(iden, changed, diffs, removed):
+    """Return a subscribe_states event message encoded as JSON.
+
+    The memoized JSON of the changed states is spliced in.
+    """
+    parts = []
+    if changed:
+        parts.append('"changed": {{{}}}'.format(', '.join(
+            '{}: {}'.format(JSON_DUMP(entity_id), state.as_json())
+            for entity_id, state in changed.items())))
+    if diffs:
+        parts.append('"diff": {}'.format(JSON_DUMP(diffs)))
+    if removed:
+        parts.append('"removed": {}'.format(JSON_DUMP(removed)))
+
+    return '{{"id": {}, "type": "event", "event": {{{}}}}}'.format(
+        iden, ', '.join(parts))
+
+
 @callback
 @decorators.websocket_command({
     vol.Required('type'): 'unsubscribe_events',
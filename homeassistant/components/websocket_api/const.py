@@ -6,6 +6,10 @@ DOMAIN = 'websocket_api'
 URL = '/api/websocket'
 MAX_PENDING_MSG = 512
 
+# Seconds state changes are coalesced for subscribe_states
+DEFAULT_STATES_INTERVAL = 0.5
+MAX_STATES_INTERVAL = 60
+
 ERR_ID_REUSE = 'id_reuse'
 ERR_INVALID_FORMAT = 'invalid_format'
 ERR_NOT_FOUND = 'not_found'
@@ -49,3 +49,13 @@ def event_message(iden, event):
         'type': 'event',
         'event': event,
     }
+
+
+def cached_event_message(iden, event):
+    """Return an event message encoded as JSON.
+
+    The memoized JSON of the event is spliced in, so it is only encoded once
+    for all subscribers.
+    """
+    return '{{"id": {}, "type": "event", "event": {}}}'.format(
+        iden, event.as_json())
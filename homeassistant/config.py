@@ -1,4 +1,5 @@
 """Module to help with parsing and generating configuration files."""
+import asyncio
 from collections import OrderedDict
 # pylint: disable=no-name-in-module
 from distutils.version import LooseVersion  # pylint: disable=import-error
@@ -749,7 +750,7 @@ async def async_process_component_config(
     This method must be run in the event loop.
     """
     domain = integration.domain
-    component = integration.get_component()
+    component = await integration.async_get_component()
 
     if hasattr(component, 'CONFIG_SCHEMA'):
         try:
@@ -765,8 +766,15 @@ async def async_process_component_config(
     if component_platform_schema is None:
         return config
 
+    # Import the platforms concurrently
+    p_configs = list(config_per_platform(config, domain))
+    p_names = list({p_name for p_name, _ in p_configs if p_name is not None})
+    p_modules = dict(zip(p_names, await asyncio.gather(*[
+        _async_get_platform(hass, domain, p_name) for p_name in p_names
+    ])))
+
     platforms = []
-    for p_name, p_config in config_per_platform(config, domain):
+    for p_name, p_config in p_configs:
         # Validate component specific platform schema
         try:
             p_validated = component_platform_schema(p_config)
@@ -781,10 +789,8 @@ async def async_process_component_config(
             platforms.append(p_validated)
             continue
 
-        try:
-            p_integration = await async_get_integration(hass, p_name)
-            platform = p_integration.get_platform(domain)
-        except (IntegrationNotFound, ImportError):
+        platform = p_modules[p_name]
+        if platform is None:
             continue
 
         # Validate platform specific schema
@@ -810,6 +816,16 @@ async def async_process_component_config(
     return config
 
 
+async def _async_get_platform(hass: HomeAssistant, domain: str,
+                              platform_name: str) -> Optional[ModuleType]:
+    """Return a platform of domain, None if it cannot be imported."""
+    try:
+        p_integration = await async_get_integration(hass, platform_name)
+        return await p_integration.async_get_platform(domain)
+    except (IntegrationNotFound, ImportError):
+        return None
+
+
 async def async_check_ha_config_file(hass: HomeAssistant) -> Optional[str]:
     """Check if Home Assistant configuration file is valid.
 
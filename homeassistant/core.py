@@ -41,6 +41,7 @@ from homeassistant.util.async_ import (
     run_coroutine_threadsafe, run_callback_threadsafe,
     fire_coroutine_threadsafe)
 from homeassistant import util
+from homeassistant.helpers.json import JSON_DUMP
 import homeassistant.util.dt as dt_util
 from homeassistant.util import location, slugify
 from homeassistant.util.unit_system import UnitSystem, METRIC_SYSTEM  # NOQA
@@ -154,6 +155,8 @@ class HomeAssistant:
         self.config_entries = None  # type: Optional[ConfigEntries]
         # If not None, use to signal end-of-loop
         self._stopped = None  # type: Optional[asyncio.Event]
+        # If not None, wraps jobs to measure how long they block the loop
+        self.job_monitor = None  # type: Any
 
     @property
     def is_running(self) -> bool:
@@ -264,12 +267,21 @@ class HomeAssistant:
         while isinstance(check_target, functools.partial):
             check_target = check_target.func
 
+        monitor = self.job_monitor
+
         if asyncio.iscoroutine(check_target):
+            if monitor is not None:
+                target = monitor.wrap_coroutine(target)
             task = self.loop.create_task(target)  # type: ignore
         elif is_callback(check_target):
+            if monitor is not None:
+                target = monitor.wrap_callback(target)
             self.loop.call_soon(target, *args)
         elif asyncio.iscoroutinefunction(check_target):
-            task = self.loop.create_task(target(*args))
+            coro = target(*args)
+            if monitor is not None:
+                coro = monitor.wrap_coroutine(coro, target)
+            task = self.loop.create_task(coro)
         else:
             task = self.loop.run_in_executor(  # type: ignore
                 None, target, *args)
@@ -330,6 +342,8 @@ class HomeAssistant:
         args: parameters for method to call.
         """
         if not asyncio.iscoroutine(target) and is_callback(target):
+            if self.job_monitor is not None:
+                target = self.job_monitor.wrap_callback(target)
             target(*args)
         else:
             self.async_add_job(target, *args)
@@ -439,9 +453,14 @@ class EventOrigin(enum.Enum):
 
 
 class Event:
-    """Representation of an event within the bus."""
+    """Representation of an event within the bus.
+
+    Events are not modified once fired, their JSON is memoized so it is
+    encoded once however many clients receive the event.
+    """
 
-    __slots__ = ['event_type', 'data', 'origin', 'time_fired', 'context']
+    __slots__ = ['event_type', 'data', 'origin', 'time_fired', 'context',
+                 '_json', '_data_json']
 
     def __init__(self, event_type: str, data: Optional[Dict] = None,
                  origin: EventOrigin = EventOrigin.local,
@@ -453,6 +472,8 @@ class Event:
         self.origin = origin
         self.time_fired = time_fired or dt_util.utcnow()
         self.context = context or Context()
+        self._json = None  # type: Optional[str]
+        self._data_json = None  # type: Optional[str]
 
     def as_dict(self) -> Dict:
         """Create a dict representation of this Event.
@@ -467,6 +488,41 @@ class Event:
             'context': self.context.as_dict()
         }
 
+    def as_json(self) -> str:
+        """Return the JSON representation of as_dict.
+
+        Async friendly.
+        """
+        if self._json is None:
+            self._json = (
+                '{{"event_type": {}, "data": {}, "origin": {}, '
+                '"time_fired": {}, "context": {}}}').format(
+                    JSON_DUMP(self.event_type), self.data_as_json(),
+                    JSON_DUMP(str(self.origin)), JSON_DUMP(self.time_fired),
+                    JSON_DUMP(self.context.as_dict()))
+
+        return self._json
+
+    def data_as_json(self) -> str:
+        """Return the JSON representation of the event data.
+
+        The memoized JSON of states in the data is reused.
+
+        Async friendly.
+        """
+        if self._data_json is None:
+            if any(isinstance(value, State) for value in self.data.values()):
+                self._data_json = '{{{}}}'.format(', '.join(
+                    '{}: {}'.format(
+                        JSON_DUMP(str(key)),
+                        value.as_json() if isinstance(value, State)
+                        else JSON_DUMP(value))
+                    for key, value in self.data.items()))
+            else:
+                self._data_json = JSON_DUMP(self.data)
+
+        return self._data_json
+
     def __repr__(self) -> str:
         """Return the representation."""
         # pylint: disable=maybe-no-member
@@ -663,7 +719,8 @@ class State:
     """
 
     __slots__ = ['entity_id', 'state', 'attributes',
-                 'last_changed', 'last_updated', 'context']
+                 'last_changed', 'last_updated', 'context',
+                 'domain', 'object_id', '_json']
 
     def __init__(self, entity_id: str, state: Any,
                  attributes: Optional[Dict] = None,
@@ -692,16 +749,9 @@ class State:
         self.last_updated = last_updated or dt_util.utcnow()
         self.last_changed = last_changed or self.last_updated
         self.context = context or Context()
-
-    @property
-    def domain(self) -> str:
-        """Domain of this state."""
-        return split_entity_id(self.entity_id)[0]
-
-    @property
-    def object_id(self) -> str:
-        """Object id of this state."""
-        return split_entity_id(self.entity_id)[1]
+        # Split once, both are read far more often than states are created
+        self.domain, _, self.object_id = self.entity_id.partition('.')
+        self._json = None  # type: Optional[str]
 
     @property
     def name(self) -> str:
@@ -725,6 +775,18 @@ class State:
                 'last_updated': self.last_updated,
                 'context': self.context.as_dict()}
 
+    def as_json(self) -> str:
+        """Return the JSON representation of as_dict.
+
+        States are not modified once created, so it is encoded only once.
+
+        Async friendly.
+        """
+        if self._json is None:
+            self._json = JSON_DUMP(self.as_dict())
+
+        return self._json
+
     @classmethod
     def from_dict(cls, json_dict: Dict) -> Any:
         """Initialize a state from a dict.
@@ -783,6 +845,10 @@ class StateMachine:
                  loop: asyncio.events.AbstractEventLoop) -> None:
         """Initialize state machine."""
         self._states = {}  # type: Dict[str, State]
+        # Entity ids by domain, the values are unused
+        self._domain_index = {}  # type: Dict[str, Dict[str, None]]
+        # Sorted entity ids by domain, None for all entities
+        self._sorted_ids = {}  # type: Dict[Optional[str], List[str]]
         self._bus = bus
         self._loop = loop
 
@@ -803,23 +869,43 @@ class StateMachine:
         if domain_filter is None:
             return list(self._states.keys())
 
-        domain_filter = domain_filter.lower()
+        return list(self._domain_index.get(domain_filter.lower(), ()))
+
+    @callback
+    def async_sorted_entity_ids(
+            self, domain_filter: Optional[str] = None) -> List[str]:
+        """List of entity ids that are being tracked, sorted.
+
+        The list is shared until entities are added or removed and must not
+        be modified. This method must be run in the event loop.
+        """
+        if domain_filter is not None:
+            domain_filter = domain_filter.lower()
 
-        return [state.entity_id for state in self._states.values()
-                if state.domain == domain_filter]
+        entity_ids = self._sorted_ids.get(domain_filter)
 
-    def all(self) -> List[State]:
-        """Create a list of all states."""
+        if entity_ids is None:
+            entity_ids = self._sorted_ids[domain_filter] = sorted(
+                self.async_entity_ids(domain_filter))
+
+        return entity_ids
+
+    def all(self, domain_filter: Optional[str] = None) -> List[State]:
+        """Create a list of all states, optionally of a single domain."""
         return run_callback_threadsafe(  # type: ignore
-            self._loop, self.async_all).result()
+            self._loop, self.async_all, domain_filter).result()
 
     @callback
-    def async_all(self) -> List[State]:
-        """Create a list of all states.
+    def async_all(self, domain_filter: Optional[str] = None) -> List[State]:
+        """Create a list of all states, optionally of a single domain.
 
         This method must be run in the event loop.
         """
-        return list(self._states.values())
+        if domain_filter is None:
+            return list(self._states.values())
+
+        return [self._states[entity_id] for entity_id
+                in self._domain_index.get(domain_filter.lower(), ())]
 
     def get(self, entity_id: str) -> Optional[State]:
         """Retrieve state of entity_id or None if not found.
@@ -858,6 +944,7 @@ class StateMachine:
         if old_state is None:
             return False
 
+        self._async_unindex(old_state)
         self._bus.async_fire(EVENT_STATE_CHANGED, {
             'entity_id': entity_id,
             'old_state': old_state,
@@ -919,12 +1006,34 @@ class StateMachine:
         state = State(entity_id, new_state, attributes, last_changed, None,
                       context)
         self._states[entity_id] = state
+        if old_state is None:
+            self._async_index(state)
         self._bus.async_fire(EVENT_STATE_CHANGED, {
             'entity_id': entity_id,
             'old_state': old_state,
             'new_state': state,
         }, EventOrigin.local, context)
 
+    @callback
+    def _async_index(self, state: State) -> None:
+        """Add a new entity to the domain index."""
+        domain_ids = self._domain_index.get(state.domain)
+        if domain_ids is None:
+            domain_ids = self._domain_index[state.domain] = {}
+        domain_ids[state.entity_id] = None
+        self._sorted_ids.pop(state.domain, None)
+        self._sorted_ids.pop(None, None)
+
+    @callback
+    def _async_unindex(self, state: State) -> None:
+        """Remove an entity from the domain index."""
+        domain_ids = self._domain_index[state.domain]
+        del domain_ids[state.entity_id]
+        if not domain_ids:
+            del self._domain_index[state.domain]
+        self._sorted_ids.pop(state.domain, None)
+        self._sorted_ids.pop(None, None)
+
 
 class Service:
     """Representation of a callable service."""
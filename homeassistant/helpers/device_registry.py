@@ -2,20 +2,22 @@
 import logging
 import uuid
 from asyncio import Event
-from collections import OrderedDict
-from typing import List, Optional, cast
+from collections import OrderedDict, UserDict
+from typing import Any, Dict, List, Optional, cast  # noqa: F401
 
 import attr
 
 from homeassistant.core import callback
 from homeassistant.loader import bind_hass
 
+from .registry_index import index_add, index_remove
 from .typing import HomeAssistantType
 
 _LOGGER = logging.getLogger(__name__)
 _UNDEF = object()
 
 DATA_REGISTRY = 'device_registry'
+EVENT_DEVICE_REGISTRY_UPDATED = 'device_registry_updated'
 
 STORAGE_KEY = 'core.device_registry'
 STORAGE_VERSION = 1
@@ -64,13 +66,86 @@ def format_mac(mac):
     return mac
 
 
+class DeviceRegistryItems(UserDict):
+    """Devices of the device registry, keyed by device id.
+
+    Keeps indexes of the devices by identifier, connection, area and config
+    entry up to date as devices are set and deleted, so looking them up does
+    not scan every device.
+    """
+
+    def __init__(self, devices=None):
+        """Initialize the container."""
+        super().__init__()
+        self.data = OrderedDict()
+        # identifier or connection -> device id
+        self._identifier_index = {}  # type: Dict[Any, str]
+        self._connection_index = {}  # type: Dict[Any, str]
+        # area_id or config_entry_id -> device ids in registry order
+        self._area_index = {}  # type: Dict[str, OrderedDict]
+        self._config_entry_index = {}  # type: Dict[str, OrderedDict]
+
+        if devices:
+            self.update(devices)
+
+    def __setitem__(self, device_id, device):
+        """Add or replace a device."""
+        old = self.data.get(device_id)
+        if old is not None:
+            self._unindex(device_id, old)
+
+        self.data[device_id] = device
+        for identifier in device.identifiers:
+            self._identifier_index[identifier] = device_id
+        for connection in device.connections:
+            self._connection_index[connection] = device_id
+        index_add(self._area_index, device.area_id, device_id)
+        for config_entry_id in device.config_entries:
+            index_add(self._config_entry_index, config_entry_id, device_id)
+
+    def __delitem__(self, device_id):
+        """Remove a device."""
+        self._unindex(device_id, self.data.pop(device_id))
+
+    def _unindex(self, device_id, device):
+        """Remove a device from the indexes."""
+        for index, keys in ((self._identifier_index, device.identifiers),
+                            (self._connection_index, device.connections)):
+            for key in keys:
+                if index.get(key) == device_id:
+                    del index[key]
+        index_remove(self._area_index, device.area_id, device_id)
+        for config_entry_id in device.config_entries:
+            index_remove(self._config_entry_index, config_entry_id, device_id)
+
+    def get_device(self, identifiers, connections):
+        """Return the device with any of the identifiers or connections."""
+        for index, keys in ((self._identifier_index, identifiers),
+                            (self._connection_index, connections)):
+            for key in keys:
+                device_id = index.get(key)
+                if device_id is not None:
+                    return self.data[device_id]
+        return None
+
+    def get_devices_for_area(self, area_id):
+        """Return the devices in an area."""
+        return [self.data[device_id]
+                for device_id in self._area_index.get(area_id, ())]
+
+    def get_devices_for_config_entry(self, config_entry_id):
+        """Return the devices of a config entry."""
+        return [self.data[device_id] for device_id
+                in self._config_entry_index.get(config_entry_id, ())]
+
+
 class DeviceRegistry:
     """Class to hold a registry of devices."""
 
     def __init__(self, hass):
         """Initialize the device registry."""
         self.hass = hass
-        self.devices = None
+        self.devices = None  # type: Optional[DeviceRegistryItems]
         self._store = hass.helpers.storage.Store(STORAGE_VERSION, STORAGE_KEY)
 
     @callback
@@ -81,11 +156,7 @@ class DeviceRegistry:
     @callback
     def async_get_device(self, identifiers: set, connections: set):
         """Check if device is registered."""
-        for device in self.devices.values():
-            if any(iden in device.identifiers for iden in identifiers) or \
-                    any(conn in device.connections for conn in connections):
-                return device
-        return None
+        return self.devices.get_device(identifiers, connections)
 
     @callback
     def async_get_or_create(self, *, config_entry_id, connections=None,
@@ -109,8 +180,9 @@ class DeviceRegistry:
         }
 
         device = self.async_get_device(identifiers, connections)
+        is_new = device is None
 
-        if device is None:
+        if is_new:
             device = DeviceEntry()
             self.devices[device.id] = device
 
@@ -129,7 +201,8 @@ class DeviceRegistry:
             manufacturer=manufacturer,
             model=model,
             name=name,
-            sw_version=sw_version
+            sw_version=sw_version,
+            is_new=is_new
         )
 
     @callback
@@ -150,7 +223,8 @@ class DeviceRegistry:
                              sw_version=_UNDEF,
                              hub_device_id=_UNDEF,
                              area_id=_UNDEF,
-                             name_by_user=_UNDEF):
+                             name_by_user=_UNDEF,
+                             is_new=False):
         """Update device attributes."""
         old = self.devices[device_id]
 
@@ -200,13 +274,19 @@ class DeviceRegistry:
 
         new = self.devices[device_id] = attr.evolve(old, **changes)
         self.async_schedule_save()
+
+        self.hass.bus.async_fire(EVENT_DEVICE_REGISTRY_UPDATED, {
+            'action': 'create' if is_new else 'update',
+            'device_id': device_id,
+        })
+
         return new
 
     async def async_load(self):
         """Load the device registry."""
         data = await self._store.async_load()
 
-        devices = OrderedDict()
+        devices = DeviceRegistryItems()
 
         if data is not None:
             for device in data['devices']:
@@ -261,17 +341,16 @@ class DeviceRegistry:
     @callback
     def async_clear_config_entry(self, config_entry_id):
         """Clear config entry from registry entries."""
-        for dev_id, device in self.devices.items():
-            if config_entry_id in device.config_entries:
-                self._async_update_device(
-                    dev_id, remove_config_entry_id=config_entry_id)
+        for device in self.devices.get_devices_for_config_entry(
+                config_entry_id):
+            self._async_update_device(
+                device.id, remove_config_entry_id=config_entry_id)
 
     @callback
     def async_clear_area_id(self, area_id: str) -> None:
         """Clear area id from registry entries."""
-        for dev_id, device in self.devices.items():
-            if area_id == device.area_id:
-                self._async_update_device(dev_id, area_id=None)
+        for device in self.devices.get_devices_for_area(area_id):
+            self._async_update_device(device.id, area_id=None)
 
 
 @bind_hass
@@ -301,5 +380,4 @@ async def async_get_registry(hass: HomeAssistantType) -> DeviceRegistry:
 def async_entries_for_area(registry: DeviceRegistry, area_id: str) \
         -> List[DeviceEntry]:
     """Return entries that match an area."""
-    return [device for device in registry.devices.values()
-            if device.area_id == area_id]
+    return registry.devices.get_devices_for_area(area_id)
@@ -8,23 +8,24 @@ registered. Registering a new entity while a timer is in progress resets the
 timer.
 """
 from asyncio import Event
-from collections import OrderedDict
-from itertools import chain
+from collections import OrderedDict, UserDict
 import logging
-from typing import List, Optional, cast
+from typing import Dict, List, Optional, Tuple, cast  # noqa: F401
 import weakref
 
 import attr
 
 from homeassistant.core import callback, split_entity_id, valid_entity_id
 from homeassistant.loader import bind_hass
-from homeassistant.util import ensure_unique_string, slugify
+from homeassistant.util import slugify
 from homeassistant.util.yaml import load_yaml
 
+from .registry_index import index_add, index_remove
 from .typing import HomeAssistantType
 
 PATH_REGISTRY = 'entity_registry.yaml'
 DATA_REGISTRY = 'entity_registry'
+EVENT_ENTITY_REGISTRY_UPDATED = 'entity_registry_updated'
 SAVE_DELAY = 10
 _LOGGER = logging.getLogger(__name__)
 _UNDEF = object()
@@ -75,13 +76,74 @@ class RegistryEntry:
         return lambda: self.update_listeners.remove(weak_listener)
 
 
+class EntityRegistryItems(UserDict):
+    """Entries of the entity registry, keyed by entity_id.
+
+    Keeps indexes of the entries by unique id, device and config entry up
+    to date as entries are set and deleted, so looking them up does not
+    scan every entity.
+    """
+
+    def __init__(self, entries=None):
+        """Initialize the container."""
+        super().__init__()
+        self.data = OrderedDict()
+        # (domain, platform, unique_id) -> entity_id
+        self._unique_id_index = {}  # type: Dict[Tuple[str, str, str], str]
+        # device_id or config_entry_id -> entity_ids in registry order
+        self._device_index = {}  # type: Dict[str, OrderedDict]
+        self._config_entry_index = {}  # type: Dict[str, OrderedDict]
+
+        if entries:
+            self.update(entries)
+
+    def __setitem__(self, entity_id, entry):
+        """Add or replace an entry."""
+        old = self.data.get(entity_id)
+        if old is not None:
+            self._unindex(entity_id, old)
+
+        self.data[entity_id] = entry
+        self._unique_id_index[
+            (entry.domain, entry.platform, entry.unique_id)] = entity_id
+        index_add(self._device_index, entry.device_id, entity_id)
+        index_add(self._config_entry_index, entry.config_entry_id, entity_id)
+
+    def __delitem__(self, entity_id):
+        """Remove an entry."""
+        self._unindex(entity_id, self.data.pop(entity_id))
+
+    def _unindex(self, entity_id, entry):
+        """Remove an entry from the indexes."""
+        key = (entry.domain, entry.platform, entry.unique_id)
+        if self._unique_id_index.get(key) == entity_id:
+            del self._unique_id_index[key]
+        index_remove(self._device_index, entry.device_id, entity_id)
+        index_remove(
+            self._config_entry_index, entry.config_entry_id, entity_id)
+
+    def get_entity_id(self, domain, platform, unique_id):
+        """Return the entity_id of a unique id, None if not registered."""
+        return self._unique_id_index.get((domain, platform, unique_id))
+
+    def get_entries_for_device(self, device_id):
+        """Return the entries of a device."""
+        return [self.data[entity_id]
+                for entity_id in self._device_index.get(device_id, ())]
+
+    def get_entries_for_config_entry(self, config_entry_id):
+        """Return the entries of a config entry."""
+        return [self.data[entity_id] for entity_id
+                in self._config_entry_index.get(config_entry_id, ())]
+
+
 class EntityRegistry:
     """Class to hold a registry of entities."""
 
     def __init__(self, hass):
         """Initialize the registry."""
         self.hass = hass
-        self.entities = None
+        self.entities = None  # type: Optional[EntityRegistryItems]
         self._store = hass.helpers.storage.Store(STORAGE_VERSION, STORAGE_KEY)
 
     @callback
@@ -97,11 +159,7 @@ class EntityRegistry:
     @callback
     def async_get_entity_id(self, domain: str, platform: str, unique_id: str):
         """Check if an entity_id is currently registered."""
-        for entity in self.entities.values():
-            if entity.domain == domain and entity.platform == platform and \
-               entity.unique_id == unique_id:
-                return entity.entity_id
-        return None
+        return self.entities.get_entity_id(domain, platform, unique_id)
 
     @callback
     def async_generate_entity_id(self, domain, suggested_object_id,
@@ -110,12 +168,20 @@ class EntityRegistry:
 
         Conflicts checked against registered and currently existing entities.
         """
-        return ensure_unique_string(
-            '{}.{}'.format(domain, slugify(suggested_object_id)),
-            chain(self.entities.keys(),
-                  self.hass.states.async_entity_ids(domain),
-                  known_object_ids if known_object_ids else [])
-        )
+        preferred_entity_id = '{}.{}'.format(
+            domain, slugify(suggested_object_id))
+        known_object_ids = known_object_ids or ()
+        entity_id = preferred_entity_id
+        tries = 1
+
+        # Look the candidates up instead of collecting every known entity
+        while (entity_id in self.entities or
+               self.hass.states.get(entity_id) is not None or
+               entity_id in known_object_ids):
+            tries += 1
+            entity_id = '{}_{}'.format(preferred_entity_id, tries)
+
+        return entity_id
 
     @callback
     def async_get_or_create(self, domain, platform, unique_id, *,
@@ -150,6 +216,12 @@ class EntityRegistry:
         _LOGGER.info('Registered new %s.%s entity: %s',
                      domain, platform, entity_id)
         self.async_schedule_save()
+
+        self.hass.bus.async_fire(EVENT_ENTITY_REGISTRY_UPDATED, {
+            'action': 'create',
+            'entity_id': entity_id,
+        })
+
         return entity
 
     @callback
@@ -158,6 +230,11 @@ class EntityRegistry:
         self.entities.pop(entity_id)
         self.async_schedule_save()
 
+        self.hass.bus.async_fire(EVENT_ENTITY_REGISTRY_UPDATED, {
+            'action': 'remove',
+            'entity_id': entity_id,
+        })
+
     @callback
     def async_update_entity(self, entity_id, *, name=_UNDEF,
                             new_entity_id=_UNDEF):
@@ -222,6 +299,11 @@ class EntityRegistry:
 
         self.async_schedule_save()
 
+        self.hass.bus.async_fire(EVENT_ENTITY_REGISTRY_UPDATED, {
+            'action': 'update',
+            'entity_id': entity_id,
+        })
+
         return new
 
     async def async_load(self):
@@ -231,7 +313,7 @@ class EntityRegistry:
             old_conf_load_func=load_yaml,
             old_conf_migrate_func=_async_migrate
         )
-        entities = OrderedDict()
+        entities = EntityRegistryItems()
 
         if data is not None:
             for entity in data['entities']:
@@ -274,9 +356,8 @@ class EntityRegistry:
     @callback
     def async_clear_config_entry(self, config_entry):
         """Clear config entry from registry entries."""
-        for entity_id, entry in self.entities.items():
-            if config_entry == entry.config_entry_id:
-                self._async_update_entity(entity_id, config_entry_id=None)
+        for entry in self.entities.get_entries_for_config_entry(config_entry):
+            self._async_update_entity(entry.entity_id, config_entry_id=None)
 
 
 @bind_hass
@@ -306,8 +387,7 @@ async def async_get_registry(hass: HomeAssistantType) -> EntityRegistry:
 def async_entries_for_device(registry: EntityRegistry, device_id: str) \
         -> List[RegistryEntry]:
     """Return entries that match a device."""
-    return [entry for entry in registry.entities.values()
-            if entry.device_id == device_id]
+    return registry.entities.get_entries_for_device(device_id)
 
 
 async def _async_migrate(entities):
@@ -1,16 +1,27 @@
 """Helpers for listening to events."""
 from datetime import timedelta
 import functools as ft
+import heapq
+import itertools
+import logging
 
 from homeassistant.loader import bind_hass
 from homeassistant.helpers.sun import get_astral_event_next
-from ..core import HomeAssistant, callback
+from ..core import HomeAssistant, callback, split_entity_id
 from ..const import (
     ATTR_NOW, EVENT_STATE_CHANGED, EVENT_TIME_CHANGED, MATCH_ALL,
     SUN_EVENT_SUNRISE, SUN_EVENT_SUNSET)
 from ..util import dt as dt_util
 from ..util.async_ import run_callback_threadsafe
 
+DATA_STATE_CHANGE_ROUTER = 'event_state_change_router'
+DATA_TIME_SCHEDULER = 'event_time_scheduler'
+
+# Rebuild the heap once this many cancelled entries linger in it
+SCHEDULER_COMPACT_THRESHOLD = 512
+
+_LOGGER = logging.getLogger(__name__)
+
 # PyLint does not like the use of threaded_listener_factory
 # pylint: disable=invalid-name
 
@@ -64,10 +75,6 @@ def async_track_state_change(hass, entity_ids, action, from_state=None,
     @callback
     def state_change_listener(event):
         """Handle specific state changes."""
-        if entity_ids != MATCH_ALL and \
-           event.data.get('entity_id') not in entity_ids:
-            return
-
         old_state = event.data.get('old_state')
         if old_state is not None:
             old_state = old_state.state
@@ -81,7 +88,8 @@ def async_track_state_change(hass, entity_ids, action, from_state=None,
                                event.data.get('old_state'),
                                event.data.get('new_state'))
 
-    return hass.bus.async_listen(EVENT_STATE_CHANGED, state_change_listener)
+    return _async_get_state_change_router(hass).async_listen(
+        entity_ids, state_change_listener)
 
 
 track_state_change = threaded_listener_factory(async_track_state_change)
@@ -90,28 +98,63 @@ track_state_change = threaded_listener_factory(async_track_state_change)
 @callback
 @bind_hass
 def async_track_template(hass, template, action, variables=None):
-    """Add a listener that track state changes with template condition."""
-    from . import condition
+    """Add a listener that track state changes with template condition.
+
+    The listener follows the states the template read during its last
+    render, so it only renders again when one of them changes.
+    """
+    router = _async_get_state_change_router(hass)
 
     # Local variable to keep track of if the action has already been triggered
     already_triggered = False
+    tracked = None
+    unsub = None
+
+    @callback
+    def async_track(render_info):
+        """Listen to the states read by the last render."""
+        nonlocal tracked, unsub
+        entity_ids, domains = _render_info_tracked(render_info, variables)
+        if (entity_ids, domains) == tracked:
+            return
+
+        if unsub is not None:
+            unsub()
+        tracked = entity_ids, domains
+        unsub = router.async_listen(
+            entity_ids, template_condition_listener, domains)
 
     @callback
-    def template_condition_listener(entity_id, from_s, to_s):
+    def template_condition_listener(event):
         """Check if condition is correct and run action."""
         nonlocal already_triggered
-        template_result = condition.async_template(hass, template, variables)
+        render_info = template.async_render_to_info(variables)
+        async_track(render_info)
+
+        if render_info.exception is not None:
+            _LOGGER.error("Error during template condition: %s",
+                          render_info.exception)
+            template_result = False
+        else:
+            template_result = render_info.result.lower() == 'true'
 
         # Check to see if template returns true
         if template_result and not already_triggered:
             already_triggered = True
-            hass.async_run_job(action, entity_id, from_s, to_s)
+            hass.async_run_job(action, event.data.get('entity_id'),
+                               event.data.get('old_state'),
+                               event.data.get('new_state'))
         elif not template_result:
             already_triggered = False
 
-    return async_track_state_change(
-        hass, template.extract_entities(variables),
-        template_condition_listener)
+    async_track(template.async_render_to_info(variables))
+
+    @callback
+    def async_remove():
+        """Remove the listener."""
+        unsub()
+
+    return async_remove
 
 
 track_template = threaded_listener_factory(async_track_template)
@@ -192,28 +235,7 @@ def async_track_point_in_utc_time(hass, action, point_in_time):
     # Ensure point_in_time is UTC
     point_in_time = dt_util.as_utc(point_in_time)
 
-    @callback
-    def point_in_time_listener(event):
-        """Listen for matching time_changed events."""
-        now = event.data[ATTR_NOW]
-
-        if now < point_in_time or hasattr(point_in_time_listener, 'run'):
-            return
-
-        # Set variable so that we will never run twice.
-        # Because the event bus might have to wait till a thread comes
-        # available to execute this listener it might occur that the
-        # listener gets lined up twice to be executed. This will make
-        # sure the second time it does nothing.
-        point_in_time_listener.run = True
-        async_unsub()
-
-        hass.async_run_job(action, now)
-
-    async_unsub = hass.bus.async_listen(EVENT_TIME_CHANGED,
-                                        point_in_time_listener)
-
-    return async_unsub
+    return _async_get_scheduler(hass).async_schedule(point_in_time, action)
 
 
 track_point_in_utc_time = threaded_listener_factory(
@@ -394,6 +416,298 @@ def async_track_time_change(hass, action, hour=None, minute=None, second=None):
 track_time_change = threaded_listener_factory(async_track_time_change)
 
 
+@callback
+def _async_get_state_change_router(hass):
+    """Return the state change router for this Home Assistant instance."""
+    router = hass.data.get(DATA_STATE_CHANGE_ROUTER)
+
+    if router is None:
+        router = hass.data[DATA_STATE_CHANGE_ROUTER] = \
+            StateChangeRouter(hass)
+
+    return router
+
+
+class StateChangeRouter:
+    """Dispatch state changed events to listeners by entity id.
+
+    Listeners are indexed by the entity ids and domains they track, so a
+    state change only reaches the listeners of that entity or its domain
+    plus those tracking all entities. A single state changed listener is
+    kept on the bus while anything is subscribed.
+    """
+
+    def __init__(self, hass):
+        """Initialize the router."""
+        self.hass = hass
+        self._entity_listeners = {}
+        self._domain_listeners = {}
+        self._match_all_listeners = []
+        self._count = 0
+        self._unsub_state_changed = None
+
+    def __len__(self):
+        """Return the number of subscriptions."""
+        return self._count
+
+    @callback
+    def async_listen(self, entity_ids, listener, domains=()):
+        """Call listener with state changed events of entity_ids.
+
+        entity_ids is MATCH_ALL or an iterable of lowercase entity ids,
+        domains an iterable of domains of which all entities are tracked.
+        Returns a function that removes the listener.
+        """
+        if entity_ids == MATCH_ALL:
+            lists = [self._match_all_listeners]
+        else:
+            lists = [self._entity_listeners.setdefault(entity_id, [])
+                     for entity_id in set(entity_ids)]
+            lists.extend(self._domain_listeners.setdefault(domain, [])
+                         for domain in set(domains))
+
+        for listeners in lists:
+            listeners.append(listener)
+
+        self._count += 1
+
+        if self._unsub_state_changed is None:
+            self._unsub_state_changed = self.hass.bus.async_listen(
+                EVENT_STATE_CHANGED, self._async_state_changed)
+
+        @callback
+        def async_remove():
+            """Remove the listener."""
+            nonlocal lists
+            if lists is None:
+                return
+
+            for listeners in lists:
+                listeners.remove(listener)
+            lists = None
+
+            if entity_ids != MATCH_ALL:
+                for entity_id in set(entity_ids):
+                    if not self._entity_listeners.get(entity_id, True):
+                        del self._entity_listeners[entity_id]
+                for domain in set(domains):
+                    if not self._domain_listeners.get(domain, True):
+                        del self._domain_listeners[domain]
+
+            self._count -= 1
+
+            if not self._count and self._unsub_state_changed is not None:
+                self._unsub_state_changed()
+                self._unsub_state_changed = None
+
+        return async_remove
+
+    @callback
+    def _async_state_changed(self, event):
+        """Pass a state changed event to the listeners of its entity."""
+        entity_id = event.data.get('entity_id')
+        listeners = self._entity_listeners.get(entity_id)
+
+        if self._domain_listeners and entity_id:
+            domain_listeners = self._domain_listeners.get(
+                entity_id.partition('.')[0])
+            if domain_listeners:
+                listeners = listeners + domain_listeners if listeners \
+                    else domain_listeners
+
+        if listeners:
+            listeners = self._match_all_listeners + listeners
+        elif self._match_all_listeners:
+            listeners = list(self._match_all_listeners)
+        else:
+            return
+
+        for listener in listeners:
+            try:
+                listener(event)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Error handling state change for %s",
+                                  event.data.get('entity_id'))
+
+
+def _render_info_tracked(render_info, variables):
+    """Return the entity ids and domains to track for a template render."""
+    if render_info.all_states:
+        return MATCH_ALL, frozenset()
+
+    if not render_info.entities and not render_info.domains:
+        # Templates that read no state, like those only using now(), are
+        # rendered on any state change as before
+        entity_ids = render_info.template.extract_entities(variables)
+        if entity_ids == MATCH_ALL:
+            return MATCH_ALL, frozenset()
+        return frozenset(entity_id.lower() for entity_id in entity_ids), \
+            frozenset()
+
+    domains = frozenset(render_info.domains)
+    # Entities of a tracked domain would otherwise be handled twice
+    return frozenset(
+        entity_id for entity_id in render_info.entities
+        if split_entity_id(entity_id)[0] not in domains), domains
+
+
+@callback
+def _async_get_scheduler(hass):
+    """Return the time scheduler for this Home Assistant instance."""
+    scheduler = hass.data.get(DATA_TIME_SCHEDULER)
+
+    if scheduler is None:
+        scheduler = hass.data[DATA_TIME_SCHEDULER] = TimeScheduler(hass)
+
+    return scheduler
+
+
+class TimeScheduler:
+    """Run actions once at a point in UTC time.
+
+    All pending actions are kept in a single heap ordered by deadline. One
+    loop timer is armed for the earliest deadline, so waiting actions cost
+    nothing until they are due. A single time changed listener is kept while
+    actions are pending so that a clock that jumps forward, or a time changed
+    event fired by hand, still runs everything that has become due.
+    """
+
+    def __init__(self, hass):
+        """Initialize the scheduler."""
+        self.hass = hass
+        self._heap = []
+        self._counter = itertools.count()
+        self._cancelled = 0
+        self._timer = None
+        self._timer_deadline = None
+        self._unsub_time_changed = None
+
+    def __len__(self):
+        """Return the number of pending actions."""
+        return len(self._heap) - self._cancelled
+
+    @callback
+    def async_schedule(self, point_in_time, action):
+        """Schedule action to be called with the time once it is due.
+
+        Returns a function that cancels the action.
+        """
+        # An entry is [deadline, sequence, action]. The sequence keeps
+        # actions with equal deadlines in the order they were scheduled and
+        # a cancelled entry has its action replaced by None.
+        entry = [point_in_time, next(self._counter), action]
+        heapq.heappush(self._heap, entry)
+
+        if self._unsub_time_changed is None:
+            self._unsub_time_changed = self.hass.bus.async_listen(
+                EVENT_TIME_CHANGED, self._async_time_changed)
+
+        if self._timer_deadline is None or \
+                point_in_time < self._timer_deadline:
+            self._async_arm_timer(dt_util.utcnow())
+
+        @callback
+        def async_cancel():
+            """Cancel the scheduled action."""
+            if entry[2] is None:
+                return
+
+            entry[2] = None
+            self._cancelled += 1
+
+            if self._cancelled > SCHEDULER_COMPACT_THRESHOLD and \
+                    self._cancelled * 2 > len(self._heap):
+                self._heap = [item for item in self._heap
+                              if item[2] is not None]
+                heapq.heapify(self._heap)
+                self._cancelled = 0
+
+            if not self:
+                self._async_stop()
+
+        return async_cancel
+
+    @callback
+    def async_run_due(self, now):
+        """Run all actions with a deadline at or before now."""
+        heap = self._heap
+        due = []
+
+        # Collect first so that actions scheduled by the actions we run,
+        # like the next run of an interval, wait for the next check.
+        while heap and heap[0][0] <= now:
+            entry = heapq.heappop(heap)
+            action = entry[2]
+            if action is None:
+                self._cancelled -= 1
+                continue
+            entry[2] = None
+            due.append(action)
+
+        for action in due:
+            try:
+                self.hass.async_run_job(action, now)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Error running scheduled action %s", action)
+
+        if self:
+            self._async_arm_timer(dt_util.utcnow())
+        else:
+            self._async_stop()
+
+    @callback
+    def _async_arm_timer(self, now):
+        """Arm the loop timer for the earliest pending deadline."""
+        heap = self._heap
+
+        while heap and heap[0][2] is None:
+            heapq.heappop(heap)
+            self._cancelled -= 1
+
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+            self._timer_deadline = None
+
+        if not heap:
+            return
+
+        self._timer_deadline = heap[0][0]
+        delay = max((self._timer_deadline - now).total_seconds(), 0)
+        self._timer = self.hass.loop.call_later(delay, self._async_timer_fired)
+
+    @callback
+    def _async_timer_fired(self):
+        """Handle the loop timer firing."""
+        self._timer = None
+        self._timer_deadline = None
+        self.async_run_due(dt_util.utcnow())
+
+    @callback
+    def _async_time_changed(self, event):
+        """Run due actions when time moved past the earliest deadline."""
+        now = event.data[ATTR_NOW]
+        heap = self._heap
+
+        if heap and heap[0][0] <= now:
+            self.async_run_due(now)
+
+    @callback
+    def _async_stop(self):
+        """Release the timer and listener when nothing is pending."""
+        self._heap.clear()
+        self._cancelled = 0
+
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+            self._timer_deadline = None
+
+        if self._unsub_time_changed is not None:
+            self._unsub_time_changed()
+            self._unsub_time_changed = None
+
+
 def _process_state_match(parameter):
     """Convert parameter to function that matches input against parameter."""
     if parameter is None or parameter == MATCH_ALL:
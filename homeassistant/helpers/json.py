@@ -1,5 +1,6 @@
 """Helpers to help with encoding Home Assistant objects in JSON."""
 from datetime import datetime
+from functools import partial
 import json
 import logging
 from typing import Any
@@ -24,3 +25,8 @@ class JSONEncoder(json.JSONEncoder):
             return o.as_dict()
 
         return json.JSONEncoder.default(self, o)
+
+
+# Strict JSON as understood by browsers, used for the JSON memoized by
+# events and states
+JSON_DUMP = partial(json.dumps, cls=JSONEncoder, allow_nan=False)
@@ -0,0 +1,22 @@
+"""Secondary indexes of the entries kept by registries."""
+from collections import OrderedDict
+from typing import Any, Dict, Hashable
+
+
+def index_add(index: Dict[Hashable, OrderedDict], key: Hashable,
+              entry_id: Any) -> None:
+    """Add entry_id to the entry ids of key, ignoring a None key."""
+    if key is not None:
+        index.setdefault(key, OrderedDict())[entry_id] = None
+
+
+def index_remove(index: Dict[Hashable, OrderedDict], key: Hashable,
+                 entry_id: Any) -> None:
+    """Remove entry_id from the entry ids of key."""
+    entry_ids = index.get(key)
+    if entry_ids is None:
+        return
+
+    entry_ids.pop(entry_id, None)
+    if not entry_ids:
+        del index[key]
@@ -2,17 +2,21 @@
 import asyncio
 from functools import wraps
 import logging
-from typing import Callable
+from typing import Callable, Dict, List  # noqa: F401
 
 import voluptuous as vol
 
 from homeassistant.auth.permissions.const import CAT_ENTITIES, POLICY_CONTROL
 from homeassistant.const import (
-    ATTR_ENTITY_ID, ENTITY_MATCH_ALL, ATTR_AREA_ID)
+    ATTR_ENTITY_ID, ENTITY_MATCH_ALL, ATTR_AREA_ID, EVENT_STATE_CHANGED)
 import homeassistant.core as ha
 from homeassistant.exceptions import (
     HomeAssistantError, TemplateError, Unauthorized, UnknownUser)
 from homeassistant.helpers import template, typing
+from homeassistant.helpers.device_registry import (
+    EVENT_DEVICE_REGISTRY_UPDATED)
+from homeassistant.helpers.entity_registry import (
+    EVENT_ENTITY_REGISTRY_UPDATED)
 from homeassistant.loader import async_get_integration, bind_hass
 from homeassistant.util.yaml import load_yaml
 import homeassistant.helpers.config_validation as cv
@@ -28,6 +32,9 @@ CONF_SERVICE_DATA_TEMPLATE = 'data_template'
 _LOGGER = logging.getLogger(__name__)
 
 SERVICE_DESCRIPTION_CACHE = 'service_description_cache'
+DATA_TARGET_RESOLVER = 'service_target_resolver'
+
+GROUP_DOMAIN = 'group'
 
 
 @bind_hass
@@ -115,6 +122,7 @@ async def async_extract_entity_ids(hass, service_call, expand_group=True):
         return []
 
     extracted = set()
+    resolver = _async_get_target_resolver(hass)
 
     if entity_ids:
         # Entity ID attr can be a list or a string
@@ -122,8 +130,7 @@ async def async_extract_entity_ids(hass, service_call, expand_group=True):
             entity_ids = [entity_ids]
 
         if expand_group:
-            entity_ids = \
-                hass.components.group.expand_entity_ids(entity_ids)
+            entity_ids = resolver.async_expand_entity_ids(entity_ids)
 
         extracted.update(entity_ids)
 
@@ -131,28 +138,113 @@ async def async_extract_entity_ids(hass, service_call, expand_group=True):
         if isinstance(area_ids, str):
             area_ids = [area_ids]
 
-        dev_reg, ent_reg = await asyncio.gather(
-            hass.helpers.device_registry.async_get_registry(),
-            hass.helpers.entity_registry.async_get_registry(),
-        )
-        devices = [
-            device
-            for area_id in area_ids
-            for device in
-            hass.helpers.device_registry.async_entries_for_area(
-                dev_reg, area_id)
-        ]
-        extracted.update(
-            entry.entity_id
-            for device in devices
-            for entry in
-            hass.helpers.entity_registry.async_entries_for_device(
-                ent_reg, device.id)
-        )
+        extracted.update(await resolver.async_area_entity_ids(area_ids))
 
     return extracted
 
 
+@ha.callback
+def _async_get_target_resolver(hass):
+    """Return the target resolver, creating it on first use."""
+    resolver = hass.data.get(DATA_TARGET_RESOLVER)
+    if resolver is None:
+        resolver = hass.data[DATA_TARGET_RESOLVER] = TargetResolver(hass)
+    return resolver
+
+
+class TargetResolver:
+    """Cache the entity ids that groups and areas of service calls target.
+
+    Expanded groups are forgotten when the members of a group change,
+    expanded areas when the device or entity registry changes.
+    """
+
+    def __init__(self, hass):
+        """Initialize the resolver and listen for changes."""
+        self.hass = hass
+        # group entity_id -> entity ids of its members, nested groups
+        # expanded
+        self._groups = {}  # type: Dict[str, List[str]]
+        # area_id -> entity ids of the devices in the area
+        self._areas = {}  # type: Dict[str, List[str]]
+
+        hass.bus.async_listen(EVENT_STATE_CHANGED, self._async_state_changed)
+        hass.bus.async_listen(
+            EVENT_DEVICE_REGISTRY_UPDATED, self._async_registry_updated)
+        hass.bus.async_listen(
+            EVENT_ENTITY_REGISTRY_UPDATED, self._async_registry_updated)
+
+    @ha.callback
+    def async_expand_entity_ids(self, entity_ids):
+        """Return entity_ids with groups replaced by their members."""
+        found_ids = set()
+        for entity_id in entity_ids:
+            if not isinstance(entity_id, str):
+                continue
+
+            entity_id = entity_id.lower()
+            if ha.split_entity_id(entity_id)[0] != GROUP_DOMAIN:
+                found_ids.add(entity_id)
+                continue
+
+            members = self._groups.get(entity_id)
+            if members is None:
+                members = self._groups[entity_id] = \
+                    self.hass.components.group.expand_entity_ids([entity_id])
+            found_ids.update(members)
+
+        return found_ids
+
+    async def async_area_entity_ids(self, area_ids):
+        """Return the entity ids of the devices in the areas."""
+        if any(area_id not in self._areas for area_id in area_ids):
+            dev_reg, ent_reg = await asyncio.gather(
+                self.hass.helpers.device_registry.async_get_registry(),
+                self.hass.helpers.entity_registry.async_get_registry(),
+            )
+            for area_id in area_ids:
+                if area_id in self._areas:
+                    continue
+                self._areas[area_id] = [
+                    entry.entity_id
+                    for device in
+                    self.hass.helpers.device_registry.async_entries_for_area(
+                        dev_reg, area_id)
+                    for entry in
+                    self.hass.helpers.entity_registry.async_entries_for_device(
+                        ent_reg, device.id)
+                ]
+
+        return {
+            entity_id
+            for area_id in area_ids
+            for entity_id in self._areas[area_id]
+        }
+
+    @ha.callback
+    def _async_state_changed(self, event):
+        """Forget the expanded groups when the members of a group change."""
+        if not self._groups or \
+                ha.split_entity_id(event.data['entity_id'])[0] != GROUP_DOMAIN:
+            return
+
+        if _group_members(event.data.get('old_state')) != \
+                _group_members(event.data.get('new_state')):
+            self._groups.clear()
+
+    @ha.callback
+    def _async_registry_updated(self, event):
+        """Forget the expanded areas when a registry changes."""
+        self._areas.clear()
+
+
+def _group_members(state):
+    """Return the members listed by the state of a group."""
+    if state is None:
+        return None
+    return state.attributes.get(ATTR_ENTITY_ID)
+
+
 async def _load_services_file(hass: HomeAssistantType, domain: str):
     """Load services file for an integration."""
     integration = await async_get_integration(hass, domain)
@@ -272,10 +364,8 @@ async def entity_service_call(hass, platforms, func, call, service_name='',
             if target_all_entities:
                 platforms_entities.append(list(platform.entities.values()))
             else:
-                platforms_entities.append([
-                    entity for entity in platform.entities.values()
-                    if entity.entity_id in entity_ids
-                ])
+                platforms_entities.append(
+                    _platform_entities(platform, entity_ids))
 
     elif target_all_entities:
         # If we target all entities, we will select all entities the user
@@ -288,10 +378,7 @@ async def entity_service_call(hass, platforms, func, call, service_name='',
     else:
         for platform in platforms:
             platform_entities = []
-            for entity in platform.entities.values():
-                if entity.entity_id not in entity_ids:
-                    continue
-
+            for entity in _platform_entities(platform, entity_ids):
                 if not entity_perms(entity.entity_id, POLICY_CONTROL):
                     raise Unauthorized(
                         context=call.context,
@@ -316,6 +403,19 @@ async def entity_service_call(hass, platforms, func, call, service_name='',
             future.result()  # pop exception if have
 
 
+def _platform_entities(platform, entity_ids):
+    """Return the entities of a platform that a service call targets."""
+    entities = platform.entities
+    if len(entity_ids) < len(entities):
+        # Platforms key their entities by entity_id, look the few targets
+        # up instead of going over every entity of the platform
+        return [entities[entity_id] for entity_id in entity_ids
+                if entity_id in entities]
+
+    return [entity for entity in entities.values()
+            if entity.entity_id in entity_ids]
+
+
 async def _handle_service_platform_call(func, data, entities, context,
                                         required_features):
     """Handle a function call."""
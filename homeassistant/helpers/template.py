@@ -36,6 +36,9 @@ _RE_GET_ENTITIES = re.compile(
 )
 _RE_JINJA_DELIMITERS = re.compile(r"\{%|\{\{")
 
+# RenderInfo of the template being rendered with async_render_to_info
+_RENDER_INFO = 'template.render_info'
+
 
 @bind_hass
 def attach(hass, obj):
@@ -89,6 +92,43 @@ def extract_entities(template, variables=None):
     return MATCH_ALL
 
 
+class RenderInfo:
+    """States read while rendering a template."""
+
+    def __init__(self, template):
+        """Initialize the render info."""
+        self.template = template
+        self.result = None
+        self.exception = None
+        # Entity ids of the states that were read
+        self.entities = set()
+        # Domains of which all states were read
+        self.domains = set()
+        # Whether all states were read
+        self.all_states = False
+
+
+def _collect_entity(hass, entity_id):
+    """Note that a template read the state of entity_id."""
+    render_info = hass.data.get(_RENDER_INFO)
+    if render_info is not None and isinstance(entity_id, str):
+        render_info.entities.add(entity_id.lower())
+
+
+def _collect_domain(hass, domain):
+    """Note that a template read all states of domain."""
+    render_info = hass.data.get(_RENDER_INFO)
+    if render_info is not None:
+        render_info.domains.add(domain)
+
+
+def _collect_all_states(hass):
+    """Note that a template read all states."""
+    render_info = hass.data.get(_RENDER_INFO)
+    if render_info is not None:
+        render_info.all_states = True
+
+
 class Template:
     """Class to hold a template and manage caching and rendering."""
 
@@ -141,6 +181,29 @@ class Template:
         except jinja2.TemplateError as err:
             raise TemplateError(err)
 
+    def async_render_to_info(self, variables: TemplateVarsType = None,
+                             **kwargs) -> RenderInfo:
+        """Render given template and note which states it reads.
+
+        The result or the TemplateError raised are stored on the returned
+        RenderInfo. This method must be run in the event loop.
+        """
+        if self._compiled is None:
+            self._ensure_compiled()
+
+        render_info = RenderInfo(self)
+        previous = self.hass.data.get(_RENDER_INFO)
+        self.hass.data[_RENDER_INFO] = render_info
+
+        try:
+            render_info.result = self.async_render(variables, **kwargs)
+        except TemplateError as ex:
+            render_info.exception = ex
+        finally:
+            self.hass.data[_RENDER_INFO] = previous
+
+        return render_info
+
     def render_with_possible_json_value(self, value, error_value=_SENTINEL):
         """Render template with value exposed.
 
@@ -190,7 +253,7 @@ class Template:
         global_vars = ENV.make_globals({
             'closest': template_methods.closest,
             'distance': template_methods.distance,
-            'is_state': self.hass.states.is_state,
+            'is_state': template_methods.is_state,
             'is_state_attr': template_methods.is_state_attr,
             'state_attr': template_methods.state_attr,
             'states': AllStates(self.hass),
@@ -221,17 +284,18 @@ class AllStates:
 
     def __iter__(self):
         """Return all states."""
-        return iter(
-            _wrap_state(state) for state in
-            sorted(self._hass.states.async_all(),
-                   key=lambda state: state.entity_id))
+        _collect_all_states(self._hass)
+        return _iter_states(
+            self._hass, self._hass.states.async_sorted_entity_ids())
 
     def __len__(self):
         """Return number of states."""
+        _collect_all_states(self._hass)
         return len(self._hass.states.async_entity_ids())
 
     def __call__(self, entity_id):
         """Return the states."""
+        _collect_entity(self._hass, entity_id)
         state = self._hass.states.get(entity_id)
         return STATE_UNKNOWN if state is None else state.state
 
@@ -246,18 +310,20 @@ class DomainStates:
 
     def __getattr__(self, name):
         """Return the states."""
-        return _wrap_state(
-            self._hass.states.get('{}.{}'.format(self._domain, name)))
+        entity_id = '{}.{}'.format(self._domain, name)
+        _collect_entity(self._hass, entity_id)
+        return _wrap_state(self._hass.states.get(entity_id))
 
     def __iter__(self):
         """Return the iteration over all the states."""
-        return iter(sorted(
-            (_wrap_state(state) for state in self._hass.states.async_all()
-             if state.domain == self._domain),
-            key=lambda state: state.entity_id))
+        _collect_domain(self._hass, self._domain)
+        return _iter_states(
+            self._hass, self._hass.states.async_sorted_entity_ids(
+                self._domain))
 
     def __len__(self):
         """Return number of states."""
+        _collect_domain(self._hass, self._domain)
         return len(self._hass.states.async_entity_ids(self._domain))
 
 
@@ -296,6 +362,13 @@ def _wrap_state(state):
     return None if state is None else TemplateState(state)
 
 
+def _iter_states(hass, entity_ids):
+    """Return an iterator over the wrapped states of entity_ids."""
+    states = [hass.states.get(entity_id) for entity_id in entity_ids]
+    return iter([TemplateState(state) for state in states
+                 if state is not None])
+
+
 class TemplateMethods:
     """Class to expose helpers to templates."""
 
@@ -361,7 +434,8 @@ class TemplateMethods:
 
             group = self._hass.components.group
 
-            states = [self._hass.states.get(entity_id) for entity_id
+            _collect_entity(self._hass, gr_entity_id)
+            states = [self._resolve_state(entity_id) for entity_id
                       in group.expand_entity_ids([gr_entity_id])]
 
         return _wrap_state(loc_helper.closest(latitude, longitude, states))
@@ -421,6 +495,11 @@ class TemplateMethods:
         return self._hass.config.units.length(
             loc_util.distance(*locations[0] + locations[1]), 'm')
 
+    def is_state(self, entity_id, state):
+        """Test if a state is a specific value."""
+        _collect_entity(self._hass, entity_id)
+        return self._hass.states.is_state(entity_id, state)
+
     def is_state_attr(self, entity_id, name, value):
         """Test if a state is a specific attribute."""
         state_attr = self.state_attr(entity_id, name)
@@ -428,7 +507,7 @@ class TemplateMethods:
 
     def state_attr(self, entity_id, name):
         """Get a specific attribute from a state."""
-        state_obj = self._hass.states.get(entity_id)
+        state_obj = self._resolve_state(entity_id)
         if state_obj is not None:
             return state_obj.attributes.get(name)
         return None
@@ -438,6 +517,7 @@ class TemplateMethods:
         if isinstance(entity_id_or_state, State):
             return entity_id_or_state
         if isinstance(entity_id_or_state, str):
+            _collect_entity(self._hass, entity_id_or_state)
             return self._hass.states.get(entity_id_or_state)
         return None
 
@@ -9,6 +9,7 @@ import functools as ft
 import importlib
 import json
 import logging
+import os
 import pathlib
 import sys
 from types import ModuleType
@@ -39,6 +40,11 @@ _LOGGER = logging.getLogger(__name__)
 
 DATA_COMPONENTS = 'components'
 DATA_INTEGRATIONS = 'integrations'
+DATA_PENDING_IMPORTS = 'pending_imports'
+DATA_INDEX = 'integration_index'
+INDEX_STORAGE_KEY = 'core.integration_index'
+INDEX_STORAGE_VERSION = 1
+INDEX_SAVE_DELAY = 10
 PACKAGE_CUSTOM_COMPONENTS = 'custom_components'
 PACKAGE_BUILTIN = 'homeassistant.components'
 LOOKUP_PATHS = [PACKAGE_CUSTOM_COMPONENTS, PACKAGE_BUILTIN]
@@ -85,10 +91,12 @@ class Integration:
                               manifest_path, err)
                 continue
 
-            return cls(
+            integration = cls(
                 hass, "{}.{}".format(root_module.__name__, domain),
                 manifest_path.parent, manifest
             )
+            integration.manifest_mtime = _mtime(str(manifest_path))
+            return integration
 
         return None
 
@@ -121,6 +129,9 @@ class Integration:
         self.after_dependencies = manifest.get(
             'after_dependencies')  # type: Optional[List[str]]
         self.requirements = manifest['requirements']  # type: List[str]
+        self.manifest = manifest
+        # Set when resolved from a manifest.json file
+        self.manifest_mtime = None  # type: Optional[float]
         _LOGGER.info("Loaded %s from %s", self.domain, pkg_path)
 
     def get_component(self) -> ModuleType:
@@ -140,6 +151,54 @@ class Integration:
             )
         return cache[full_name]  # type: ignore
 
+    async def async_get_component(self) -> ModuleType:
+        """Return the component, importing it in the executor."""
+        cache = self.hass.data.setdefault(DATA_COMPONENTS, {})
+        if self.domain in cache:
+            return cache[self.domain]  # type: ignore
+        return await self._async_import(self.domain, self.get_component)
+
+    async def async_get_platform(self, platform_name: str) -> ModuleType:
+        """Return a platform, importing it in the executor."""
+        cache = self.hass.data.setdefault(DATA_COMPONENTS, {})
+        full_name = "{}.{}".format(self.domain, platform_name)
+        if full_name in cache:
+            return cache[full_name]  # type: ignore
+        return await self._async_import(
+            full_name, self.get_platform, platform_name)
+
+    async def _async_import(self, name: str, import_func: Callable,
+                            *args: Any) -> ModuleType:
+        """Run import_func in the executor, once for concurrent callers."""
+        pending = self.hass.data.setdefault(DATA_PENDING_IMPORTS, {})
+        future = pending.get(name)
+        if future is not None:
+            return await future  # type: ignore
+
+        future = pending[name] = self.hass.async_create_task(
+            self._async_import_job(name, import_func, *args))
+        try:
+            return await future  # type: ignore
+        finally:
+            pending.pop(name, None)
+
+    async def _async_import_job(self, name: str, import_func: Callable,
+                                *args: Any) -> ModuleType:
+        """Run import_func in the executor, retrying in the event loop.
+
+        Before Python 3.8, modules creating asyncio objects like a Lock when
+        imported can only be imported in the thread of the event loop.
+        """
+        try:
+            return await self.hass.async_add_executor_job(
+                import_func, *args)
+        except RuntimeError as err:
+            if 'no current event loop' not in str(err):
+                raise
+            _LOGGER.debug("Importing %s needs the event loop, retrying in "
+                          "the event loop", name)
+        return import_func(*args)  # type: ignore
+
     def __repr__(self) -> str:
         """Text representation of class."""
         return "<Integration {}: {}>".format(self.domain, self.pkg_path)
@@ -170,6 +229,16 @@ async def async_get_integration(hass: 'HomeAssistant', domain: str)\
     if int_or_evt is not _UNDEF:
         return cast(Integration, int_or_evt)
 
+    index = hass.data.get(
+        DATA_INDEX)  # type: Optional[IntegrationIndex]
+    if index is not None:
+        integration = index.async_get_integration(domain)
+        if integration is not None:
+            if integration.pkg_path.startswith(PACKAGE_CUSTOM_COMPONENTS):
+                _LOGGER.warning(CUSTOM_WARNING, domain)
+            cache[domain] = integration
+            return integration
+
     event = cache[domain] = asyncio.Event()
 
     try:
@@ -180,6 +249,8 @@ async def async_get_integration(hass: 'HomeAssistant', domain: str)\
         if integration is not None:
             _LOGGER.warning(CUSTOM_WARNING, domain)
             cache[domain] = integration
+            if index is not None:
+                index.async_add_integration(integration)
             event.set()
             return integration
 
@@ -195,6 +266,8 @@ async def async_get_integration(hass: 'HomeAssistant', domain: str)\
 
     if integration is not None:
         cache[domain] = integration
+        if index is not None:
+            index.async_add_integration(integration)
         event.set()
         return integration
 
@@ -383,7 +456,20 @@ async def async_component_dependencies(hass,  # type: HomeAssistant
 
     Raises CircularDependency if a circular dependency is found.
     """
-    return await _async_component_dependencies(hass, domain, set(), set())
+    index = hass.data.get(
+        DATA_INDEX)  # type: Optional[IntegrationIndex]
+    if index is not None:
+        indexed = index.dependencies.get(domain)
+        if indexed is not None:
+            return set(indexed)
+
+    dependencies = await _async_component_dependencies(
+        hass, domain, set(), set())
+
+    if index is not None:
+        index.async_add_dependencies(domain, dependencies)
+
+    return dependencies
 
 
 async def _async_component_dependencies(hass,  # type: HomeAssistant
@@ -417,6 +503,147 @@ async def _async_component_dependencies(hass,  # type: HomeAssistant
     return loaded
 
 
+def _mtime(path: str) -> Optional[float]:
+    """Return the modification time of path, None if it does not exist."""
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+def _integration_roots(hass: 'HomeAssistant') -> List[str]:
+    """Return the directories holding integrations."""
+    from homeassistant import components
+
+    return [hass.config.path(PACKAGE_CUSTOM_COMPONENTS)] + \
+        list(components.__path__)  # type: ignore
+
+
+class IntegrationIndex:
+    """Persisted manifests, dependencies and satisfied requirements.
+
+    A restart with unchanged code skips reading manifests, walking
+    dependencies and scanning installed packages. Manifests and dependencies
+    are dropped when Home Assistant is upgraded or a directory holding
+    integrations or a manifest changed. Requirements are dropped when a
+    directory on sys.path changed.
+    """
+
+    def __init__(self, hass: 'HomeAssistant', store: Any,
+                 data: Optional[Dict]) -> None:
+        """Initialize the index from stored data validated by validate."""
+        from homeassistant.const import __version__
+
+        data = data or {}
+        self.hass = hass
+        self._store = store
+        self.version = __version__
+        self.roots = {}  # type: Dict[str, Optional[float]]
+        self.paths = {}  # type: Dict[str, Optional[float]]
+        self.manifests = {}  # type: Dict[str, Dict]
+        self.dependencies = {}  # type: Dict[str, List[str]]
+        self.requirements = set()  # type: Set[str]
+        self._stored = data
+
+    def validate(self) -> None:
+        """Keep the stored entries that are still valid.
+
+        Runs in the executor as it checks the file system.
+        """
+        data = self._stored
+        self.roots = {path: _mtime(path)
+                      for path in _integration_roots(self.hass)}
+        self.paths = {path: _mtime(path) for path in sys.path}
+
+        if data.get('version') == self.version and \
+                data.get('roots') == self.roots:
+            self.manifests = {
+                domain: entry
+                for domain, entry in data.get('manifests', {}).items()
+                if _mtime(entry['manifest_path']) == entry['mtime']}
+
+            # Closures are only valid when none of their manifests changed
+            self.dependencies = {
+                domain: dependencies
+                for domain, dependencies in data.get(
+                    'dependencies', {}).items()
+                if all(dep in self.manifests for dep in dependencies)}
+
+        if data.get('paths') == self.paths:
+            self.requirements = set(data.get('requirements', []))
+
+        self._stored = {}
+
+    def async_get_integration(self, domain: str) -> Optional[Integration]:
+        """Return the indexed integration of domain.
+
+        Async friendly.
+        """
+        entry = self.manifests.get(domain)
+        if entry is None:
+            return None
+
+        integration = Integration(
+            self.hass, entry['package'],
+            pathlib.Path(entry['manifest_path']).parent, entry['manifest'])
+        integration.manifest_mtime = entry['mtime']
+        return integration
+
+    def async_add_integration(self, integration: Integration) -> None:
+        """Index an integration resolved from its manifest."""
+        if integration.manifest_mtime is None:
+            return
+
+        self.manifests[integration.domain] = {
+            'package': integration.pkg_path,
+            'manifest_path': str(integration.file_path / 'manifest.json'),
+            'mtime': integration.manifest_mtime,
+            'manifest': integration.manifest,
+        }
+        self._async_schedule_save()
+
+    def async_add_dependencies(self, domain: str,
+                               dependencies: Set[str]) -> None:
+        """Index the dependencies of domain, including itself."""
+        # Legacy integrations have no manifest to invalidate the closure
+        if all(dep in self.manifests for dep in dependencies):
+            self.dependencies[domain] = sorted(dependencies)
+            self._async_schedule_save()
+
+    def async_add_requirement(self, requirement: str) -> None:
+        """Index a requirement that is installed."""
+        if requirement not in self.requirements:
+            self.requirements.add(requirement)
+            self._async_schedule_save()
+
+    def _async_schedule_save(self) -> None:
+        """Save the index once the additions settled."""
+        self._store.async_delay_save(self._data_to_save, INDEX_SAVE_DELAY)
+
+    def _data_to_save(self) -> Dict:
+        """Return the data to store."""
+        return {
+            'version': self.version,
+            'roots': self.roots,
+            'paths': self.paths,
+            'manifests': self.manifests,
+            'dependencies': self.dependencies,
+            'requirements': sorted(self.requirements),
+        }
+
+
+async def async_load_index(hass: 'HomeAssistant') -> None:
+    """Load the integration index, used from then on to resolve."""
+    from homeassistant.helpers.storage import Store
+
+    store = Store(hass, INDEX_STORAGE_VERSION, INDEX_STORAGE_KEY, True)
+    data = await store.async_load()
+    index = IntegrationIndex(
+        hass, store, data if isinstance(data, dict) else None)
+    await hass.async_add_executor_job(index.validate)
+    hass.data[DATA_INDEX] = index
+
+
 def _async_mount_config_dir(hass,  # type: HomeAssistant
                             ) -> bool:
     """Mount config dir in order to load custom_component.
@@ -10,6 +10,7 @@ from urllib.parse import urlparse
 import pkg_resources
 
 import homeassistant.util.package as pkg_util
+from homeassistant import loader
 from homeassistant.core import HomeAssistant
 
 DATA_PIP_LOCK = 'pip_lock'
@@ -28,16 +29,21 @@ async def async_process_requirements(hass: HomeAssistant, name: str,
     if pip_lock is None:
         pip_lock = hass.data[DATA_PIP_LOCK] = asyncio.Lock(loop=hass.loop)
 
-    pkg_cache = hass.data.get(DATA_PKG_CACHE)
-    if pkg_cache is None:
-        pkg_cache = hass.data[DATA_PKG_CACHE] = PackageLoadable(hass)
+    pkg_cache = _get_pkg_cache(hass)
 
     pip_install = partial(pkg_util.install_package,
                           **pip_kwargs(hass.config.config_dir))
 
+    index = hass.data.get(loader.DATA_INDEX)
+
     async with pip_lock:
         for req in requirements:
+            if index is not None and req in index.requirements:
+                continue
+
             if await pkg_cache.loadable(req):
+                if index is not None:
+                    index.async_add_requirement(req)
                 continue
 
             ret = await hass.async_add_executor_job(pip_install, req)
@@ -50,6 +56,34 @@ async def async_process_requirements(hass: HomeAssistant, name: str,
     return True
 
 
+async def async_requirements_loadable(hass: HomeAssistant,
+                                      requirements: List[str]) -> bool:
+    """Return if all requirements are met without installing any.
+
+    This method is a coroutine.
+    """
+    index = hass.data.get(loader.DATA_INDEX)
+    pkg_cache = _get_pkg_cache(hass)
+
+    for req in requirements:
+        if index is not None and req in index.requirements:
+            continue
+
+        if not await pkg_cache.loadable(req):
+            return False
+
+    return True
+
+
+def _get_pkg_cache(hass: HomeAssistant) -> 'PackageLoadable':
+    """Return the package cache of hass."""
+    pkg_cache = hass.data.get(
+        DATA_PKG_CACHE)  # type: Optional[PackageLoadable]
+    if pkg_cache is None:
+        pkg_cache = hass.data[DATA_PKG_CACHE] = PackageLoadable(hass)
+    return pkg_cache
+
+
 def pip_kwargs(config_dir: Optional[str]) -> Dict[str, Any]:
     """Return keyword arguments for PIP install."""
     kwargs = {
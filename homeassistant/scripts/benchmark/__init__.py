@@ -141,6 +141,75 @@ async def async_million_state_changed_helper(hass):
     return timer() - start
 
 
+@benchmark
+async def async_state_changed_dispatch_scaling(hass):
+    """Fire state changes while growing the number of tracked entities.
+
+    Each listener tracks its own entity, so the cost of a state change
+    should stay flat as the number of listeners grows.
+    """
+    events_per_round = 10**5
+    total = 0
+
+    @core.callback
+    def listener(*args):
+        """Handle state change."""
+
+    for listener_count in (1, 10, 100, 1000, 10000):
+        unsubs = [
+            hass.helpers.event.async_track_state_change(
+                'light.bench_{}'.format(idx), listener)
+            for idx in range(listener_count)
+        ]
+        event_data = {
+            'entity_id': 'light.bench_0',
+            'old_state': core.State('light.bench_0', 'off'),
+            'new_state': core.State('light.bench_0', 'on'),
+        }
+
+        start = timer()
+
+        for _ in range(events_per_round):
+            hass.bus.async_fire(EVENT_STATE_CHANGED, event_data)
+
+        await hass.async_block_till_done()
+
+        runtime = timer() - start
+        total += runtime
+        print('{:>6} listeners: {:.2f}us per state change'.format(
+            listener_count, runtime / events_per_round * 10**6))
+
+        for unsub in unsubs:
+            unsub()
+
+    return total
+
+
+@benchmark
+async def mqtt_topic_matching(hass):
+    """Match topics against the subscriptions of 1500 entities."""
+    from homeassistant.components.mqtt import Subscription
+    from homeassistant.components.mqtt.matcher import TopicMatcher
+
+    matcher = TopicMatcher()
+    for idx in range(1500):
+        matcher.add(Subscription(
+            'zigbee2mqtt/device_{}'.format(idx), None))
+        matcher.add(Subscription(
+            'homeassistant/+/device_{}/#'.format(idx), None))
+
+    topics = [
+        'zigbee2mqtt/device_{}'.format(idx % 1500) for idx in range(10**5)
+    ]
+
+    start = timer()
+
+    for topic in topics:
+        list(matcher.iter_match(topic))
+
+    return timer() - start
+
+
 @benchmark
 @asyncio.coroutine
 def logbook_filtering_state(hass):
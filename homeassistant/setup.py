@@ -4,12 +4,13 @@ import logging.handlers
 from timeit import default_timer as timer
 
 from types import ModuleType
-from typing import Awaitable, Callable, Optional, Dict, List
+from typing import Awaitable, Callable, Optional, Dict, List, Set
 
 from homeassistant import requirements, core, loader, config as conf_util
 from homeassistant.config import async_notify_setup_error
 from homeassistant.const import EVENT_COMPONENT_LOADED, PLATFORM_FORMAT
 from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_per_platform
 from homeassistant.util.async_ import run_coroutine_threadsafe
 
 
@@ -19,6 +20,8 @@ ATTR_COMPONENT = 'component'
 
 DATA_SETUP = 'setup_tasks'
 DATA_DEPS_REQS = 'deps_reqs_processed'
+# Domain -> seconds spent in each phase of setting it up
+DATA_SETUP_TIME = 'setup_time'
 
 SLOW_SETUP_WARNING = 10
 
@@ -94,6 +97,9 @@ async def _async_setup_component(hass: core.HomeAssistant,
         _LOGGER.error("Setup failed for %s: %s", domain, msg)
         async_notify_setup_error(hass, domain, link)
 
+    timings = hass.data.setdefault(DATA_SETUP_TIME, {})[domain] = {}
+    phase_start = timer()
+
     try:
         integration = await loader.async_get_integration(hass, domain)
     except loader.IntegrationNotFound:
@@ -114,14 +120,34 @@ async def _async_setup_component(hass: core.HomeAssistant,
             "%s -> %s", domain, err.from_domain, err.to_domain)
         return False
 
+    timings['resolve'] = timer() - phase_start
+    phase_start = timer()
+
     # Process requirements as soon as possible, so we can import the component
-    # without requiring imports to be in functions.
+    # without requiring imports to be in functions. This includes waiting for
+    # the dependencies to be set up.
     try:
         await async_process_deps_reqs(hass, config, integration)
     except HomeAssistantError as err:
         log_error(str(err))
         return False
 
+    timings['requirements'] = timer() - phase_start
+    phase_start = timer()
+
+    try:
+        component = await integration.async_get_component()
+    except ImportError:
+        log_error("Unable to import component", False)
+        return False
+    except Exception:  # pylint: disable=broad-except
+        _LOGGER.exception("Error importing component %s", domain)
+        async_notify_setup_error(hass, domain, False)
+        return False
+
+    timings['import'] = timer() - phase_start
+    phase_start = timer()
+
     processed_config = await conf_util.async_process_component_config(
         hass, config, integration)
 
@@ -129,15 +155,11 @@ async def _async_setup_component(hass: core.HomeAssistant,
         log_error("Invalid config.")
         return False
 
+    timings['config_validation'] = timer() - phase_start
+
     start = timer()
     _LOGGER.info("Setting up %s", domain)
 
-    try:
-        component = integration.get_component()
-    except ImportError:
-        log_error("Unable to import component", False)
-        return False
-
     if hasattr(component, 'PLATFORM_SCHEMA'):
         # Entity components have their own warning
         warn_task = None
@@ -160,6 +182,7 @@ async def _async_setup_component(hass: core.HomeAssistant,
         return False
     finally:
         end = timer()
+        timings['setup'] = end - start
         if warn_task:
             warn_task.cancel()
     _LOGGER.info("Setup of domain %s took %.1f seconds.", domain, end - start)
@@ -222,10 +245,14 @@ async def async_prepare_setup_platform(hass: core.HomeAssistant,
         return None
 
     try:
-        platform = integration.get_platform(domain)
+        platform = await integration.async_get_platform(domain)
     except ImportError:
         log_error("Platform not found.")
         return None
+    except Exception:  # pylint: disable=broad-except
+        _LOGGER.exception("Error importing platform %s", platform_path)
+        async_notify_setup_error(hass, platform_path)
+        return None
 
     # Already loaded
     if platform_path in hass.config.components:
@@ -235,10 +262,15 @@ async def async_prepare_setup_platform(hass: core.HomeAssistant,
     # If the integration is not set up yet, and can be set up, set it up.
     if integration.domain not in hass.config.components:
         try:
-            component = integration.get_component()
+            component = await integration.async_get_component()
         except ImportError:
             log_error("Unable to import the component")
             return None
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception("Error importing component %s",
+                              integration.domain)
+            async_notify_setup_error(hass, platform_path)
+            return None
 
         if (hasattr(component, 'setup')
                 or hasattr(component, 'async_setup')):
@@ -251,6 +283,43 @@ async def async_prepare_setup_platform(hass: core.HomeAssistant,
     return platform
 
 
+async def async_import_integrations(
+        hass: core.HomeAssistant, config: Dict, domains: Set[str]) -> None:
+    """Import the components and configured platforms of domains.
+
+    The modules are imported concurrently in the executor, ahead of setting
+    up the domains. Integrations with requirements that are not installed
+    yet are left to be imported by their setup, after installing them.
+    Errors are left to be reported by the setup.
+    """
+    tasks = [_async_import_component(hass, domain) for domain in domains]
+
+    for domain in domains:
+        for p_name, _ in config_per_platform(config, domain):
+            if p_name is not None:
+                tasks.append(_async_import_platform(hass, domain, p_name))
+
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def _async_import_component(
+        hass: core.HomeAssistant, domain: str) -> None:
+    """Import the component of a domain."""
+    integration = await loader.async_get_integration(hass, domain)
+    if await requirements.async_requirements_loadable(
+            hass, integration.requirements):
+        await integration.async_get_component()
+
+
+async def _async_import_platform(
+        hass: core.HomeAssistant, domain: str, platform_name: str) -> None:
+    """Import a platform of a domain."""
+    integration = await loader.async_get_integration(hass, platform_name)
+    if await requirements.async_requirements_loadable(
+            hass, integration.requirements):
+        await integration.async_get_platform(domain)
+
+
 async def async_process_deps_reqs(
         hass: core.HomeAssistant, config: Dict,
         integration: loader.Integration) -> None:
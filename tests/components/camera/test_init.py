@@ -10,7 +10,8 @@ from homeassistant.setup import setup_component, async_setup_component
 from homeassistant.const import (
     ATTR_ENTITY_ID, ATTR_ENTITY_PICTURE, EVENT_HOMEASSISTANT_START)
 from homeassistant.components import camera, http
-from homeassistant.components.camera.const import DOMAIN, PREF_PRELOAD_STREAM
+from homeassistant.components.camera.const import (
+    DOMAIN, DATA_CAMERA_SNAPSHOTS, PREF_PRELOAD_STREAM, PREF_SNAPSHOT_MAX_AGE)
 from homeassistant.components.camera.prefs import CameraEntityPreferences
 from homeassistant.components.websocket_api.const import TYPE_RESULT
 from homeassistant.exceptions import HomeAssistantError
@@ -266,6 +267,57 @@ async def test_websocket_update_prefs(hass, hass_ws_client,
         setup_camera_prefs[PREF_PRELOAD_STREAM]
 
 
+async def test_get_image_coalesced(hass, hass_ws_client, mock_camera):
+    """Test concurrent requests for an image share a single fetch."""
+    with patch('homeassistant.components.demo.camera.DemoCamera.camera_image',
+               return_value=b'Test') as mock_image:
+        images = await asyncio.gather(*(
+            camera.async_get_image(hass, 'camera.demo_camera')
+            for _ in range(3)))
+
+    assert [image.content for image in images] == [b'Test'] * 3
+    assert len(mock_image.mock_calls) == 1
+
+    client = await hass_ws_client(hass)
+    await client.send_json({
+        'id': 9,
+        'type': 'camera/snapshot_stats',
+        'entity_id': 'camera.demo_camera',
+    })
+    msg = await client.receive_json()
+
+    assert msg['success']
+    assert msg['result'] == {'hits': 0, 'coalesced': 2, 'misses': 1}
+
+
+async def test_get_image_max_age(hass, mock_camera):
+    """Test images younger than the max age are served from the cache."""
+    common.mock_camera_prefs(hass, 'camera.demo_camera', {
+        PREF_SNAPSHOT_MAX_AGE: 10,
+    })
+
+    with patch('homeassistant.components.demo.camera.DemoCamera.camera_image',
+               return_value=b'Test') as mock_image:
+        await camera.async_get_image(hass, 'camera.demo_camera')
+        image = await camera.async_get_image(hass, 'camera.demo_camera')
+
+    assert image.content == b'Test'
+    assert len(mock_image.mock_calls) == 1
+
+    cache = hass.data[DATA_CAMERA_SNAPSHOTS].async_get_cache(
+        'camera.demo_camera')
+    assert cache.as_dict() == {'hits': 1, 'coalesced': 0, 'misses': 1}
+
+    with patch('homeassistant.components.camera.snapshot.monotonic',
+               return_value=cache.fetched + 11), \
+            patch('homeassistant.components.demo.camera.DemoCamera.'
+                  'camera_image', return_value=b'New') as mock_image:
+        image = await camera.async_get_image(hass, 'camera.demo_camera')
+
+    assert image.content == b'New'
+    assert len(mock_image.mock_calls) == 1
+
+
 async def test_play_stream_service_no_source(hass, mock_camera, mock_stream):
     """Test camera play_stream service."""
     data = {
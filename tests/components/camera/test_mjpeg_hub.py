@@ -0,0 +1,100 @@
+"""The tests for sharing MJPEG sources between viewers."""
+import asyncio
+from unittest.mock import Mock
+
+from homeassistant.components.camera import mjpeg_hub
+from homeassistant.components.camera.const import DATA_CAMERA_HUBS
+
+from tests.common import mock_coro
+
+
+async def test_viewers_share_source(hass):
+    """Test viewers of a key share one source until the last one leaves."""
+    starts = []
+    stopped = asyncio.Event()
+
+    async def source(publish):
+        """Publish frames until cancelled."""
+        starts.append(publish)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            stopped.set()
+
+    hub = mjpeg_hub.async_get_hub(hass, 'key', source)
+    assert mjpeg_hub.async_get_hub(hass, 'key', source) is hub
+
+    viewer = hub.async_subscribe()
+    viewer2 = hub.async_subscribe()
+    await hass.async_block_till_done()
+
+    assert len(starts) == 1
+    starts[0](b'frame1')
+    starts[0](b'frame2')
+
+    # The slow viewer only gets the latest frame
+    assert await viewer.async_get() == b'frame2'
+    assert viewer.dropped == 1
+
+    starts[0](b'frame3')
+    assert await viewer.async_get() == b'frame3'
+    assert await viewer2.async_get() == b'frame3'
+    assert viewer2.dropped == 2
+
+    hub.async_unsubscribe(viewer)
+    assert not stopped.is_set()
+
+    hub.async_unsubscribe(viewer2)
+    await stopped.wait()
+    assert 'key' not in hass.data[DATA_CAMERA_HUBS]
+
+
+async def test_viewer_joining_unchanged_source(hass):
+    """Test a viewer joining gets the latest frame of the source."""
+    async def source(publish):
+        """Publish the frame of an image that never changes."""
+        publish(b'frame')
+        await asyncio.Event().wait()
+
+    hub = mjpeg_hub.async_get_hub(hass, 'key', source)
+    viewer = hub.async_subscribe()
+    await hass.async_block_till_done()
+
+    assert await viewer.async_get() == b'frame'
+
+    viewer2 = hub.async_subscribe()
+    assert await viewer2.async_get() == b'frame'
+
+    hub.async_unsubscribe(viewer)
+    hub.async_unsubscribe(viewer2)
+
+
+async def test_source_ends(hass):
+    """Test viewers get the last frame and stop when the source ends."""
+    async def source(publish):
+        """Publish a single frame."""
+        publish(b'frame')
+
+    hub = mjpeg_hub.async_get_hub(hass, 'key', source)
+    viewer = hub.async_subscribe()
+    await hass.async_block_till_done()
+
+    assert await viewer.async_get() == b'frame'
+    assert await viewer.async_get() is None
+    assert 'key' not in hass.data[DATA_CAMERA_HUBS]
+
+
+async def test_read_mjpeg_frames(hass):
+    """Test frames are split out of an MJPEG stream."""
+    chunks = [
+        b'--frame\r\nContent-Type: image/jpeg\r\n\r\n\xff\xd8one',
+        b'\xff\xd9\r\n--frame\r\n\r\n\xff',
+        b'\xd8two\xff\xd9\r\n',
+        b'',
+    ]
+    stream = Mock(read=Mock(side_effect=lambda size: mock_coro(chunks.pop(0))))
+    frames = []
+
+    await mjpeg_hub.async_read_mjpeg_frames(hass, stream, frames.append)
+
+    assert frames == [b'\xff\xd8one\xff\xd9', b'\xff\xd8two\xff\xd9']
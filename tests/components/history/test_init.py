@@ -1,5 +1,6 @@
 """The tests the History component."""
 # pylint: disable=protected-access,invalid-name
+import asyncio
 from datetime import timedelta
 import unittest
 from unittest.mock import patch, sentinel
@@ -176,6 +177,15 @@ class TestComponentHistory(unittest.TestCase):
             self.hass, zero, four, filters=history.Filters())
         assert states == hist
 
+    def test_stream_significant_states(self):
+        """Test streaming returns the same states one entity at a time."""
+        zero, four, states = self.record_states()
+        streamed = list(history.stream_significant_states(
+            self.hass, zero, four, filters=history.Filters()))
+
+        assert [entity_id for entity_id, _ in streamed] == sorted(states)
+        assert dict(streamed) == states
+
     def test_get_significant_states_with_initial(self):
         """Test that only significant states are returned.
 
@@ -524,3 +534,118 @@ async def test_fetch_period_api(hass, hass_client):
     response = await client.get(
         '/api/history/period/{}'.format(dt_util.utcnow().isoformat()))
     assert response.status == 200
+
+
+def test_downsample_states():
+    """Test numeric series are reduced to their bucket extremes."""
+    states = [ha.State('sensor.power', str(value))
+              for value in (5, 1, 9, 4, 'unavailable', 3, 8, 2, 7, 6)]
+
+    assert history.downsample_states(states, 10) is states
+    assert history.downsample_states(states, None) is states
+
+    result = history.downsample_states(states, 4)
+    assert [state.state for state in result] == \
+        ['5', '1', '9', 'unavailable', '8', '2', '6']
+
+
+async def test_fetch_period_api_max_points(hass, hass_client):
+    """Test the fetch period view validates max_points."""
+    await hass.async_add_job(init_recorder_component, hass)
+    await async_setup_component(hass, 'history', {})
+    await hass.async_add_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+    client = await hass_client()
+    response = await client.get(
+        '/api/history/period/{}'.format(dt_util.utcnow().isoformat()),
+        params={'max_points': 'many'})
+    assert response.status == 400
+
+    response = await client.get(
+        '/api/history/period/{}'.format(dt_util.utcnow().isoformat()),
+        params={'max_points': '100'})
+    assert response.status == 200
+
+
+async def test_fetch_period_api_stream(hass, hass_client):
+    """Test the fetch period view streams the history."""
+    await hass.async_add_job(init_recorder_component, hass)
+    await async_setup_component(hass, 'history', {})
+    start = dt_util.utcnow()
+    hass.states.async_set('sensor.power', '10')
+    hass.states.async_set('light.kitchen', 'on')
+    await hass.async_block_till_done()
+    await hass.async_add_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+    client = await hass_client()
+
+    response = await client.get(
+        '/api/history/period/{}'.format(start.isoformat()),
+        params={'stream': ''})
+    assert response.status == 200
+
+    result = await response.json()
+    assert [[state['entity_id'], state['state']] for states in result
+            for state in states] == \
+        [['light.kitchen', 'on'], ['sensor.power', '10']]
+
+
+async def test_state_changes_during_period_coalesced(hass):
+    """Test requests for states at the same time share a query."""
+    await hass.async_add_job(init_recorder_component, hass)
+    hass.states.async_set('sensor.power', '10')
+    hass.states.async_set('light.kitchen', 'off')
+    await hass.async_block_till_done()
+    await hass.async_add_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+
+    start = dt_util.utcnow()
+    hass.states.async_set('sensor.power', '20')
+    hass.states.async_set('light.kitchen', 'on')
+    await hass.async_block_till_done()
+    await hass.async_add_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+    end = dt_util.utcnow()
+
+    with patch('homeassistant.components.history._query_states',
+               wraps=history._query_states) as mock_query:
+        power, kitchen = await asyncio.gather(
+            history.async_state_changes_during_period(
+                hass, start, end, entity_id='sensor.power'),
+            history.async_state_changes_during_period(
+                hass, start, end, entity_id='light.kitchen'))
+
+        # Answered from the cache
+        later = await history.async_state_changes_during_period(
+            hass, start + timedelta(microseconds=1), end,
+            entity_id='light.kitchen')
+
+    assert mock_query.call_count == 1
+    assert [state.state for state in power['sensor.power']] == ['10', '20']
+    assert [state.state for state in kitchen['light.kitchen']] == \
+        ['off', 'on']
+    assert kitchen['light.kitchen'][0].last_changed == start
+    assert [state.state for state in later['light.kitchen']] == \
+        ['off', 'on']
+
+
+async def test_state_changes_until_now_not_cached(hass):
+    """Test states queried until now only answer their own batch."""
+    await hass.async_add_job(init_recorder_component, hass)
+    start = dt_util.utcnow()
+    hass.states.async_set('sensor.power', '10')
+    await hass.async_block_till_done()
+    await hass.async_add_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+
+    with patch('homeassistant.components.history._query_states',
+               wraps=history._query_states) as mock_query:
+        first = await history.async_state_changes_during_period(
+            hass, start, entity_id='sensor.power')
+
+        hass.states.async_set('sensor.power', '20')
+        await hass.async_block_till_done()
+        await hass.async_add_job(
+            hass.data[recorder.DATA_INSTANCE].block_till_done)
+
+        later = await history.async_state_changes_during_period(
+            hass, start, entity_id='sensor.power')
+
+    assert mock_query.call_count == 2
+    assert [state.state for state in first['sensor.power']] == ['10']
+    assert [state.state for state in later['sensor.power']] == ['10', '20']
@@ -14,7 +14,8 @@ import homeassistant.core as ha
 from homeassistant.helpers.template import Template
 import homeassistant.util.dt as dt_util
 
-from tests.common import init_recorder_component, get_test_home_assistant
+from tests.common import (
+    init_recorder_component, get_test_home_assistant, mock_coro_func)
 
 
 class TestHistoryStatsSensor(unittest.TestCase):
@@ -129,19 +130,93 @@ class TestHistoryStatsSensor(unittest.TestCase):
         assert sensor4._type == 'ratio'
 
         with patch('homeassistant.components.history.'
-                   'state_changes_during_period', return_value=fake_states):
-            with patch('homeassistant.components.history.get_state',
-                       return_value=None):
-                sensor1.update()
-                sensor2.update()
-                sensor3.update()
-                sensor4.update()
+                   'async_state_changes_during_period',
+                   side_effect=mock_coro_func(fake_states)):
+            sensor1.update()
+            sensor2.update()
+            sensor3.update()
+            sensor4.update()
 
         assert sensor1.state == 0.5
         assert sensor2.state is None
         assert sensor3.state == 2
         assert sensor4.state == 50
 
+    def test_measure_incremental(self):
+        """Test the measure follows state changes without new queries."""
+        t0 = dt_util.utcnow() - timedelta(minutes=40)
+        fake_states = {
+            'binary_sensor.test_id': [
+                ha.State('binary_sensor.test_id', 'on', last_changed=t0),
+            ]
+        }
+
+        start = Template('{{ as_timestamp(now()) - 3600 }}', self.hass)
+        end = Template('{{ now() }}', self.hass)
+
+        sensor = HistoryStatsSensor(
+            self.hass, 'binary_sensor.test_id', 'on', start, end, None,
+            'count', 'test')
+
+        with patch('homeassistant.components.history.'
+                   'async_state_changes_during_period',
+                   side_effect=mock_coro_func(fake_states)) as mock_changes:
+            sensor.update()
+            assert sensor.state == 1
+
+            with patch.object(sensor, 'async_schedule_update_ha_state'):
+                for state in ('off', 'on'):
+                    sensor._async_state_changed(
+                        'binary_sensor.test_id', None,
+                        ha.State('binary_sensor.test_id', state))
+
+            sensor._period = (datetime.now(), datetime.now())
+            sensor.update()
+
+        assert sensor.state == 2
+        assert mock_changes.call_count == 1
+
+    def test_measure_past_period_advancing(self):
+        """Test a period ending in the past moving over loaded history."""
+        now = dt_util.utcnow()
+        states = [
+            ha.State('binary_sensor.test_id', 'on',
+                     last_changed=now - timedelta(minutes=150)),
+            ha.State('binary_sensor.test_id', 'off',
+                     last_changed=now - timedelta(minutes=90)),
+        ]
+
+        async def fake_changes(hass, start_time, end_time=None,
+                               entity_id=None):
+            """Return the states changed until end_time."""
+            return {entity_id: [
+                state for state in states
+                if end_time is None or state.last_changed <= end_time]}
+
+        # From 3 hours until 2 hours ago
+        start = Template('{{ as_timestamp(now()) - 10800 }}', self.hass)
+        end = Template('{{ as_timestamp(now()) - 7200 }}', self.hass)
+
+        sensor = HistoryStatsSensor(
+            self.hass, 'binary_sensor.test_id', 'on', start, end, None,
+            'time', 'test')
+
+        with patch('homeassistant.components.history.'
+                   'async_state_changes_during_period',
+                   side_effect=fake_changes) as mock_changes:
+            sensor.update()
+            assert sensor.state == 0.5
+
+            # From 2 hours until 1 hour ago, the entity turned off in it
+            sensor._start = Template(
+                '{{ as_timestamp(now()) - 7200 }}', self.hass)
+            sensor._end = Template(
+                '{{ as_timestamp(now()) - 3600 }}', self.hass)
+            sensor.update()
+
+        assert sensor.state == 0.5
+        assert mock_changes.call_count == 1
+
     def test_wrong_date(self):
         """Test when start or end value is not a timestamp or a date."""
         good = Template('{{ now() }}', self.hass)
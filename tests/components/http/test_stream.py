@@ -0,0 +1,32 @@
+"""Test streaming JSON lists."""
+import json
+
+from aiohttp import web
+
+from homeassistant.components.http import async_stream_json_list
+
+
+async def test_stream_json_list(hass, aiohttp_client):
+    """Test items are joined into a JSON list in chunks."""
+    closed = []
+
+    def encode_items():
+        """Encode five numbers."""
+        try:
+            for number in range(5):
+                yield json.dumps(number)
+        finally:
+            closed.append(True)
+
+    async def handler(request):
+        """Stream the numbers."""
+        return await async_stream_json_list(request, hass, encode_items, 2)
+
+    app = web.Application()
+    app.router.add_get('/', handler)
+    client = await aiohttp_client(app)
+
+    response = await client.get('/')
+    assert response.status == 200
+    assert await response.json() == [0, 1, 2, 3, 4]
+    assert closed == [True]
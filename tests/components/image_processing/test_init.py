@@ -1,4 +1,5 @@
 """The tests for the image_processing component."""
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import patch, PropertyMock
 
 from homeassistant.core import callback
@@ -7,6 +8,8 @@ from homeassistant.setup import setup_component
 from homeassistant.exceptions import HomeAssistantError
 import homeassistant.components.http as http
 import homeassistant.components.image_processing as ip
+from homeassistant.util.async_ import (
+    run_callback_threadsafe, run_coroutine_threadsafe)
 
 from tests.common import (
     get_test_home_assistant, get_test_instance_port, assert_setup_component)
@@ -109,6 +112,37 @@ class TestImageProcessing:
         assert mock_image.called
         assert state.state == '0'
 
+    @patch('homeassistant.components.demo.camera.DemoCamera.camera_image',
+           autospec=True, return_value=b'Test')
+    def test_process_image_in_worker(self, mock_camera):
+        """Process images with a job in the worker pool."""
+        self.hass.start()
+        self.hass.data[ip.DATA_WORKER_POOL] = ThreadPoolExecutor(1)
+
+        with patch('homeassistant.components.image_processing.'
+                   'ImageProcessingEntity.process_image_job',
+                   new_callable=PropertyMock, return_value=len), \
+                patch('homeassistant.components.image_processing.'
+                      'ImageProcessingEntity.async_process_job_result') \
+                as mock_result:
+            common.scan(self.hass, entity_id='image_processing.test')
+            self.hass.block_till_done()
+
+            assert mock_camera.called
+            assert mock_result.mock_calls[0][1] == (4,)
+
+            # Skip images while the platform is busy with earlier ones
+            semaphore = run_callback_threadsafe(
+                self.hass.loop, ip._async_get_worker_semaphore, self.hass,
+                'test', 1).result()
+            run_coroutine_threadsafe(
+                semaphore.acquire(), self.hass.loop).result()
+
+            common.scan(self.hass, entity_id='image_processing.test')
+            self.hass.block_till_done()
+
+            assert len(mock_result.mock_calls) == 1
+
 
 class TestImageProcessingAlpr:
     """Test class for alpr image processing."""
@@ -1,5 +1,6 @@
 """The tests for the logbook component."""
 # pylint: disable=protected-access,invalid-name
+import json
 import logging
 from datetime import (timedelta, datetime)
 import unittest
@@ -16,6 +17,8 @@ from homeassistant.const import (
     STATE_NOT_HOME, STATE_ON, STATE_OFF)
 import homeassistant.util.dt as dt_util
 from homeassistant.components import logbook, recorder
+from homeassistant.components.recorder.models import Events, LogbookEntries
+from homeassistant.components.recorder.util import session_scope
 from homeassistant.components.alexa.smart_home import EVENT_ALEXA_SMART_HOME
 from homeassistant.components.homekit.const import (
     ATTR_DISPLAY_NAME, ATTR_VALUE, DOMAIN as DOMAIN_HOMEKIT,
@@ -83,6 +86,87 @@ class TestComponentLogbook(unittest.TestCase):
         assert 'switch.test_switch' == last_call.data.get(
             logbook.ATTR_ENTITY_ID)
 
+    def test_get_entries_paged(self):
+        """Test reading the logbook entries a page at a time."""
+        start = (dt_util.utcnow() + timedelta(days=1)).replace(
+            minute=0, second=0, microsecond=0)
+
+        with session_scope(hass=self.hass) as session:
+            for minutes, entity_id in ((1, 'light.kitchen'),
+                                       (2, 'light.hall'),
+                                       (20, 'light.kitchen'),
+                                       (40, 'light.hall')):
+                session.add(LogbookEntries(
+                    event_type=EVENT_STATE_CHANGED,
+                    time_fired=start + timedelta(minutes=minutes),
+                    entity_id=entity_id,
+                    domain='light',
+                    state=STATE_ON,
+                    name=entity_id,
+                ))
+
+        query = logbook.LogbookQuery(
+            self.hass, {}, start, start + timedelta(hours=1))
+
+        # A page is completed with the rest of its last block of entries
+        entries = query.all(1)
+        assert [entry['entity_id'] for entry in entries] == \
+            ['light.kitchen', 'light.hall']
+        assert entries[0]['message'] == 'turned on'
+
+        entries = query.all(1, query.next_cursor)
+        assert [entry['when'] for entry in entries] == \
+            [start + timedelta(minutes=20)]
+
+        entries = query.all(1, query.next_cursor)
+        assert [entry['when'] for entry in entries] == \
+            [start + timedelta(minutes=40)]
+        assert query.next_cursor is None
+
+        query = logbook.LogbookQuery(
+            self.hass, {}, start, start + timedelta(hours=1), 'light.hall')
+        assert len(query.all()) == 2
+        assert query.next_cursor is None
+
+    def test_get_old_events_paged(self):
+        """Test events from before the logbook entries table are paged."""
+        start = (dt_util.utcnow() + timedelta(days=1)).replace(
+            minute=0, second=0, microsecond=0)
+        self.hass.data[logbook.DATA_INDEX_START] = \
+            start + timedelta(hours=1)
+
+        with session_scope(hass=self.hass) as session:
+            for minutes, name in ((1, 'one'), (2, 'two'), (20, 'three')):
+                session.add(Events.from_event(ha.Event(
+                    logbook.EVENT_LOGBOOK_ENTRY,
+                    {logbook.ATTR_NAME: name,
+                     logbook.ATTR_MESSAGE: 'is old'},
+                    time_fired=start + timedelta(minutes=minutes))))
+            session.add(LogbookEntries(
+                event_type=logbook.EVENT_LOGBOOK_ENTRY,
+                time_fired=start + timedelta(minutes=70),
+                event_data=json.dumps({logbook.ATTR_NAME: 'four',
+                                       logbook.ATTR_MESSAGE: 'is new'}),
+            ))
+
+        query = logbook.LogbookQuery(
+            self.hass, {}, start, start + timedelta(hours=2))
+
+        entries = query.all(1)
+        assert [entry['name'] for entry in entries] == ['one', 'two']
+
+        # The last page of old events ends where the index starts
+        entries = query.all(1, query.next_cursor)
+        assert [entry['name'] for entry in entries] == ['three']
+        assert query.next_cursor is not None
+
+        entries = query.all(1, query.next_cursor)
+        assert [entry['name'] for entry in entries] == ['four']
+        assert query.next_cursor is None
+
+        assert [entry['name'] for entry in query.all()] == \
+            ['one', 'two', 'three', 'four']
+
     def test_service_call_create_log_book_entry_no_message(self):
         """Test if service call create log book entry without message."""
         calls = []
@@ -852,3 +936,115 @@ async def test_humanify_script_started_event(hass):
     assert event2['domain'] == 'script'
     assert event2['message'] == 'started'
     assert event2['entity_id'] == 'script.bye'
+
+
+async def test_logbook_registers_with_recorder(hass):
+    """Test the recorder writes entries for the events the logbook shows."""
+    await hass.async_add_job(init_recorder_component, hass)
+    await async_setup_component(hass, 'logbook', {})
+
+    event_types, keep_event = \
+        hass.data[recorder.DATA_INSTANCE].logbook_filter
+    assert event_types == set(logbook.ALL_EVENT_TYPES)
+    assert keep_event(ha.Event(EVENT_AUTOMATION_TRIGGERED))
+    assert keep_event(ha.Event(EVENT_STATE_CHANGED, {
+        'entity_id': 'light.kitchen',
+        'old_state': ha.State('light.kitchen', 'off'),
+        'new_state': ha.State('light.kitchen', 'on'),
+    }))
+
+
+def test_state_changes_not_recorded():
+    """Test state changes the logbook does not show are left out."""
+    old_state = ha.State('sensor.temperature', '18')
+    changes = [
+        (None, ha.State('light.kitchen', 'on')),
+        (ha.State('light.kitchen', 'on'), None),
+        (old_state, ha.State(
+            'sensor.temperature', '19', {'unit_of_measurement': 'C'})),
+        (ha.State('light.hall', 'off'),
+         ha.State('light.hall', 'on', {ATTR_HIDDEN: True})),
+        (ha.State('group.all_lights', 'off'),
+         ha.State('group.all_lights', 'on', {'auto': True})),
+        (old_state, ha.State(
+            'sensor.temperature', '18', {'icon': 'mdi:thermometer'},
+            last_changed=datetime(2019, 1, 1, tzinfo=dt_util.UTC))),
+    ]
+
+    for old, new in changes:
+        event = ha.Event(EVENT_STATE_CHANGED, {
+            'entity_id': (new or old).entity_id,
+            'old_state': old,
+            'new_state': new,
+        })
+        assert not logbook._keep_recorded_event(event)
+
+
+async def test_logbook_view_paged(hass, hass_client):
+    """Test reading a page of the logbook view."""
+    await hass.async_add_job(init_recorder_component, hass)
+    await async_setup_component(hass, 'logbook', {})
+    await hass.async_add_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+
+    hass.states.async_set('switch.test', STATE_OFF)
+    hass.states.async_set('switch.test', STATE_ON)
+    await hass.async_block_till_done()
+    await hass.async_add_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+
+    client = await hass_client()
+    start = dt_util.utcnow() - timedelta(hours=1)
+
+    response = await client.get(
+        '/api/logbook/{}?limit=10'.format(start.isoformat()))
+    assert response.status == 200
+    json = await response.json()
+    assert [entry['entity_id'] for entry in json['entries']] == \
+        ['switch.test']
+    assert json['cursor'] is None
+
+    response = await client.get(
+        '/api/logbook/{}?limit=0'.format(start.isoformat()))
+    assert response.status == 400
+
+    response = await client.get(
+        '/api/logbook/{}?cursor=invalid'.format(start.isoformat()))
+    assert response.status == 400
+
+
+async def test_websocket_get_entries(hass, hass_ws_client):
+    """Test reading a page of the logbook over the websocket API."""
+    await hass.async_add_job(init_recorder_component, hass)
+    await async_setup_component(hass, 'logbook', {})
+    await hass.async_add_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+
+    hass.states.async_set('switch.test', STATE_OFF)
+    hass.states.async_set('switch.test', STATE_ON)
+    hass.states.async_set('switch.second', STATE_OFF)
+    hass.states.async_set('switch.second', STATE_ON)
+    await hass.async_block_till_done()
+    await hass.async_add_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+
+    client = await hass_ws_client(hass)
+    start = dt_util.utcnow() - timedelta(hours=1)
+
+    await client.send_json({
+        'id': 5,
+        'type': logbook.WS_TYPE_GET_ENTRIES,
+        'start_time': start.isoformat(),
+        'entity_id': 'switch.second',
+    })
+    msg = await client.receive_json()
+    assert msg['success']
+    assert [entry['entity_id'] for entry in msg['result']['entries']] == \
+        ['switch.second']
+    assert msg['result']['cursor'] is None
+
+    await client.send_json({
+        'id': 6,
+        'type': logbook.WS_TYPE_GET_ENTRIES,
+        'start_time': start.isoformat(),
+        'cursor': 'invalid',
+    })
+    msg = await client.receive_json()
+    assert not msg['success']
+    assert msg['error']['code'] == 'invalid_format'
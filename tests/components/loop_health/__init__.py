@@ -0,0 +1 @@
+"""Tests for the loop_health component."""
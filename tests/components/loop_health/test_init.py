@@ -0,0 +1,98 @@
+"""Tests for the loop health monitor."""
+import asyncio
+from unittest.mock import Mock, patch
+
+from homeassistant.components import loop_health
+from homeassistant.core import callback
+from homeassistant.setup import async_setup_component
+
+
+async def test_setup_installs_monitor(hass):
+    """Test the monitor hooks into the job scheduling."""
+    assert await async_setup_component(hass, loop_health.DOMAIN, {})
+    monitor = hass.data[loop_health.DOMAIN]
+    assert hass.job_monitor is monitor
+
+    monitor.async_stop()
+    assert hass.job_monitor is None
+
+
+async def test_record_lag(hass):
+    """Test lag samples end up in the histogram."""
+    monitor = loop_health.LoopHealthMonitor(hass, 0.01)
+    monitor.async_record_lag(0.0005)
+    monitor.async_record_lag(0.02)
+    monitor.async_record_lag(5)
+
+    histogram = monitor.as_dict()['lag_histogram']
+    assert histogram[0] == {'le': 0.001, 'count': 1}
+    assert histogram[3] == {'le': 0.05, 'count': 1}
+    assert histogram[-1] == {'le': None, 'count': 1}
+    assert monitor.max_lag == 5
+    assert monitor.async_reset_max_lag() == 5
+    assert monitor.async_reset_max_lag() == 0
+
+
+async def test_slow_callback_recorded(hass):
+    """Test callbacks blocking the loop are attributed to their origin."""
+    monitor = loop_health.LoopHealthMonitor(hass, 0)
+    monitor.async_start()
+
+    calls = []
+
+    @callback
+    def slow_callback(value):
+        """Record the call."""
+        calls.append(value)
+
+    hass.async_add_job(slow_callback, 1)
+    await hass.async_block_till_done()
+    monitor.async_stop()
+
+    assert calls == [1]
+    jobs = monitor.top_slow_jobs()
+    assert len(jobs) == 1
+    assert jobs[0]['integration'] == 'tests'
+    assert jobs[0]['job'].endswith('slow_callback')
+    assert jobs[0]['count'] == 1
+
+
+async def test_slow_coroutine_steps_recorded(hass):
+    """Test every step of a coroutine is timed and results pass through."""
+    monitor = loop_health.LoopHealthMonitor(hass, 0)
+    monitor.async_start()
+
+    async def two_steps():
+        """Suspend once and return a value."""
+        await asyncio.sleep(0)
+        return 'done'
+
+    task = hass.async_add_job(two_steps)
+    assert await task == 'done'
+    monitor.async_stop()
+
+    jobs = monitor.top_slow_jobs()
+    assert len(jobs) == 1
+    assert jobs[0]['count'] == 2
+
+
+async def test_fast_jobs_not_recorded(hass):
+    """Test jobs below the threshold are not kept."""
+    monitor = loop_health.LoopHealthMonitor(hass, 10)
+    monitor.record_job(test_fast_jobs_not_recorded, 1)
+    assert monitor.top_slow_jobs() == []
+
+
+async def test_websocket_info(hass):
+    """Test the websocket command returns the statistics."""
+    with patch.object(loop_health, 'PROBE_INTERVAL', 60):
+        assert await async_setup_component(hass, loop_health.DOMAIN, {})
+
+    connection = Mock()
+    loop_health.websocket_info(
+        hass, connection, {'id': 5, 'type': loop_health.WS_TYPE_INFO})
+
+    msg_id, result = connection.send_result.mock_calls[0][1]
+    assert msg_id == 5
+    assert len(result['lag_histogram']) == len(loop_health.LAG_BUCKETS)
+    assert 'executor_queue_depth' in result
@@ -0,0 +1,33 @@
+"""Tests for the loop lag sensor."""
+from homeassistant.components import loop_health
+from homeassistant.setup import async_setup_component
+
+
+async def test_sensor_reports_lag_and_slow_jobs(hass):
+    """Test the sensor reports the lag and slowest jobs of the monitor."""
+    assert await async_setup_component(hass, loop_health.DOMAIN, {})
+    await hass.async_block_till_done()
+
+    monitor = hass.data[loop_health.DOMAIN]
+    # Stop sampling so only the lag recorded below is reported
+    monitor.async_stop()
+    monitor.async_reset_max_lag()
+
+    monitor.async_record_lag(0.25)
+    monitor.record_job(('homeassistant.components.demo', 'slow_job'), 0.5)
+
+    await hass.helpers.entity_component.async_update_entity(
+        'sensor.event_loop_lag')
+
+    state = hass.states.get('sensor.event_loop_lag')
+    assert state.state == '250.0'
+    assert state.attributes['unit_of_measurement'] == 'ms'
+    assert state.attributes['slowest_jobs'] == [
+        'homeassistant.components.demo.slow_job (500 ms)']
+    assert 'executor_queue_depth' in state.attributes
+
+    # The lag is reset by every update
+    await hass.helpers.entity_component.async_update_entity(
+        'sensor.event_loop_lag')
+
+    assert hass.states.get('sensor.event_loop_lag').state == '0.0'
@@ -811,3 +811,33 @@ async def test_mqtt_ws_subscription(hass, hass_ws_client):
     })
     response = await client.receive_json()
     assert response['success']
+
+
+async def test_messages_delivered_in_batches(hass):
+    """Test messages from the paho thread wake up the loop once a batch."""
+    await async_mock_mqtt_client(hass)
+    mqtt_data = hass.data['mqtt']
+    calls = []
+
+    @callback
+    def record_calls(msg):
+        """Record calls."""
+        calls.append(msg.payload)
+
+    await mqtt.async_subscribe(hass, 'test-topic', record_calls)
+
+    def receive_messages():
+        """Receive messages like the paho network thread."""
+        for idx in range(mqtt.MAX_MESSAGE_BATCH + 5):
+            mqtt_data._mqtt_on_message(None, None, mqtt.Message(
+                'test-topic', str(idx).encode(), 0, False))
+
+    with mock.patch.object(
+            hass.loop, 'call_soon_threadsafe',
+            wraps=hass.loop.call_soon_threadsafe) as mock_threadsafe:
+        receive_messages()
+        await hass.async_block_till_done()
+        await hass.async_block_till_done()
+
+    assert len(mock_threadsafe.mock_calls) == 1
+    assert calls == [str(idx) for idx in range(mqtt.MAX_MESSAGE_BATCH + 5)]
@@ -0,0 +1,45 @@
+"""The tests for the MQTT topic matcher."""
+# pylint: disable=protected-access
+import pytest
+
+from homeassistant.components.mqtt import Subscription
+from homeassistant.components.mqtt.matcher import TopicMatcher
+
+
+def _match(matcher, topic):
+    """Return the topics of the subscriptions matching topic."""
+    return sorted(sub.topic for sub in matcher.iter_match(topic))
+
+
+def test_match_wildcards():
+    """Test matching plain topics and wildcards."""
+    matcher = TopicMatcher()
+    for topic in ('a/b', 'a/+', 'a/#', '#', '+/b', '$SYS/#', 'a/b/c'):
+        matcher.add(Subscription(topic, None))
+
+    assert _match(matcher, 'a/b') == ['#', '+/b', 'a/#', 'a/+', 'a/b']
+    # Multi level wildcard also matches the parent level
+    assert _match(matcher, 'a') == ['#', 'a/#']
+    assert _match(matcher, 'a/b/c') == ['#', 'a/#', 'a/b/c']
+    assert _match(matcher, 'x/b') == ['#', '+/b']
+    # Wildcards do not match the first level of $ topics
+    assert _match(matcher, '$SYS/broker') == ['$SYS/#']
+
+
+def test_remove():
+    """Test removing subscriptions prunes the tree."""
+    matcher = TopicMatcher()
+    first = Subscription('a/b', None, 0)
+    second = Subscription('a/b', None, 1)
+    matcher.add(first)
+    matcher.add(second)
+
+    matcher.remove(first)
+    assert list(matcher.iter_match('a/b')) == [second]
+
+    matcher.remove(second)
+    assert list(matcher.iter_match('a/b')) == []
+    assert matcher._root.children == {}
+
+    with pytest.raises(ValueError):
+        matcher.remove(second)
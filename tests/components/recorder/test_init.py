@@ -1,16 +1,17 @@
 """The tests for the Recorder component."""
 # pylint: disable=protected-access
 import unittest
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
 import pytest
 
 from homeassistant.core import callback
 from homeassistant.const import MATCH_ALL
-from homeassistant.components.recorder import Recorder
+from homeassistant.components.recorder import Recorder, websocket_stats
 from homeassistant.components.recorder.const import DATA_INSTANCE
 from homeassistant.components.recorder.util import session_scope
-from homeassistant.components.recorder.models import States, Events
+from homeassistant.components.recorder.models import (
+    States, StateAttributes, Events)
 
 from tests.common import get_test_home_assistant, init_recorder_component
 
@@ -189,6 +190,109 @@ def test_saving_state_include_domain_exclude_entity(hass_recorder):
     assert hass.states.get('test.ok').state == 'state2'
 
 
+def test_saving_state_batched(hass_recorder):
+    """Test saving states in batched transactions."""
+    hass = hass_recorder({'commit_interval': 1, 'commit_batch_size': 2})
+    batches = []
+    commit_events = Recorder._commit_events
+
+    def mock_commit_events(recorder, events):
+        """Record the size of each committed batch."""
+        batches.append(len(events))
+        commit_events(recorder, events)
+
+    with patch.object(Recorder, '_commit_events', mock_commit_events):
+        states = _add_entities(
+            hass, ['test.recorder{}'.format(idx) for idx in range(5)])
+
+    assert len(states) == 5
+    assert sum(batches) == 5
+    assert max(batches) <= 2
+
+    with session_scope(hass=hass) as session:
+        event_ids = {state.event_id for state in session.query(States)}
+        assert len(event_ids) == 5
+        assert session.query(Events).filter(
+            Events.event_id.in_(event_ids)).count() == 5
+
+
+def test_saving_state_shared_attributes(hass_recorder):
+    """Test states with equal attributes share one attributes row."""
+    hass = hass_recorder()
+    states = _add_entities(hass, ['test.one', 'test.two', 'test.three'])
+
+    assert len(states) == 3
+    for state in states:
+        assert state == hass.states.get(state.entity_id)
+
+    with session_scope(hass=hass) as session:
+        assert session.query(StateAttributes).count() == 1
+        assert {row.attributes for row in session.query(States)} == {None}
+
+
+def test_attributes_ids_resolved_together(hass_recorder):
+    """Test the attributes of a batch are looked up with a single query."""
+    from sqlalchemy import event
+
+    hass = hass_recorder()
+    _add_entities(hass, ['test.one'])
+    instance = hass.data[DATA_INSTANCE]
+    instance._attributes_ids.clear()
+
+    with session_scope(hass=hass) as session:
+        existing = session.query(StateAttributes).one()
+        existing_id = existing.attributes_id
+        existing_attrs = existing.shared_attrs
+    all_shared_attrs = {existing_attrs, '{"a": 1}', '{"a": 2}'}
+
+    statements = []
+
+    def count_statement(conn, cursor, statement, *args):
+        """Record the statements sent to the database."""
+        statements.append(statement)
+
+    event.listen(instance.engine, 'before_cursor_execute', count_statement)
+    try:
+        new_attributes_ids = {}
+        with session_scope(hass=hass) as session:
+            attributes_ids = instance._get_attributes_ids(
+                session, all_shared_attrs, new_attributes_ids)
+    finally:
+        event.remove(
+            instance.engine, 'before_cursor_execute', count_statement)
+
+    assert len([statement for statement in statements
+                if statement.startswith('SELECT')]) == 1
+    assert attributes_ids[existing_attrs] == existing_id
+    assert set(new_attributes_ids) == {'{"a": 1}', '{"a": 2}'}
+    assert len(set(attributes_ids.values())) == 3
+
+    with session_scope(hass=hass) as session:
+        assert session.query(StateAttributes).count() == 3
+
+
+def test_recorder_stats(hass_recorder):
+    """Test the recorder statistics."""
+    hass = hass_recorder({'exclude': {'domains': 'test'}})
+    _add_entities(hass, ['test.recorder', 'test2.recorder'])
+
+    stats = hass.data[DATA_INSTANCE].get_stats()
+    assert stats['queue_depth'] == 0
+    assert stats['events_filtered'] == 1
+    assert stats['events_recorded'] >= 1
+    # Event and state row of test2.recorder
+    assert stats['rows_written'] >= 2
+    assert stats['batches'] >= 1
+    assert stats['total_commit_time'] > 0
+    assert stats['rows_per_second'] > 0
+
+    connection = Mock()
+    websocket_stats(hass, connection, {'id': 5, 'type': 'recorder/stats'})
+    msg_id, result = connection.send_result.mock_calls[0][1]
+    assert msg_id == 5
+    assert result['events_filtered'] == 1
+
+
 def test_recorder_setup_failure():
     """Test some exceptions."""
     hass = get_test_home_assistant()
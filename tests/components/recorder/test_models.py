@@ -1,5 +1,6 @@
 """The tests for the Recorder component."""
 import unittest
+from unittest.mock import patch
 from datetime import datetime
 
 from sqlalchemy import create_engine
@@ -9,7 +10,8 @@ import homeassistant.core as ha
 from homeassistant.const import EVENT_STATE_CHANGED
 from homeassistant.util import dt
 from homeassistant.components.recorder.models import (
-    Base, Events, States, RecorderRuns)
+    Base, Events, States, StateAttributes, LogbookEntries, RecorderRuns,
+    clear_attributes_cache)
 
 ENGINE = None
 SESSION = None
@@ -78,6 +80,96 @@ class TestStates(unittest.TestCase):
         assert db_state.last_changed == event.time_fired
         assert db_state.last_updated == event.time_fired
 
+    def test_to_native_shared_attributes(self):
+        """Test resolving attributes stored in the shared table."""
+        from sqlalchemy import event
+
+        session = SESSION()
+        shared_attrs = '{"unit_of_measurement": "\\u00b0C"}'
+        dbattributes = StateAttributes(
+            hash=StateAttributes.hash_shared_attrs(shared_attrs),
+            shared_attrs=shared_attrs)
+        session.add(dbattributes)
+        session.flush()
+
+        for entity_id in ('sensor.kitchen', 'sensor.living_room'):
+            session.add(States(
+                entity_id=entity_id,
+                state='20',
+                attributes_id=dbattributes.attributes_id,
+            ))
+        session.flush()
+        session.expunge_all()
+
+        statements = []
+
+        def count_statement(conn, cursor, statement, *args):
+            """Count the statements sent to the database."""
+            statements.append(statement)
+
+        event.listen(ENGINE, 'before_cursor_execute', count_statement)
+        try:
+            states = [row.to_native() for row in session.query(States)]
+            assert [state.attributes['unit_of_measurement']
+                    for state in states] == ['\u00b0C', '\u00b0C']
+
+            # The attributes are joined instead of queried per row
+            assert len(statements) == 1
+
+            # Served from the cache once loaded
+            with patch.object(session, 'query') as mock_query:
+                row = States(
+                    entity_id='sensor.bedroom', state='19',
+                    attributes_id=dbattributes.attributes_id)
+                assert row.to_native().attributes == states[0].attributes
+                assert not mock_query.called
+        finally:
+            event.remove(ENGINE, 'before_cursor_execute', count_statement)
+            session.rollback()
+            clear_attributes_cache()
+
+
+class TestLogbookEntries(unittest.TestCase):
+    """Test LogbookEntries model."""
+
+    # pylint: disable=no-self-use
+
+    def test_from_state_changed_event(self):
+        """Test converting a state change to a logbook entry."""
+        old_state = ha.State('light.kitchen', 'off')
+        new_state = ha.State(
+            'light.kitchen', 'on', {'friendly_name': 'Kitchen'})
+        event = ha.Event(EVENT_STATE_CHANGED, {
+            'entity_id': 'light.kitchen',
+            'old_state': old_state,
+            'new_state': new_state,
+        }, context=new_state.context)
+
+        entry = LogbookEntries.from_event(event)
+        assert entry.entity_id == 'light.kitchen'
+        assert entry.domain == 'light'
+        assert entry.state == 'on'
+        assert entry.name == 'Kitchen'
+
+        native = entry.to_native()
+        assert native.event_type == EVENT_STATE_CHANGED
+        assert native.time_fired == event.time_fired
+        assert native.context == event.context
+        assert ha.State.from_dict(native.data['new_state']).name == 'Kitchen'
+
+    def test_from_logbook_event(self):
+        """Test converting other logbook events."""
+        event = ha.Event('logbook_entry', {
+            'name': 'Alarm',
+            'message': 'is triggered',
+            'entity_id': 'switch.siren',
+        })
+
+        entry = LogbookEntries.from_event(
+            event, Events.from_event(event).event_data)
+        assert entry.entity_id == 'switch.siren'
+        assert entry.to_native() == event
+
 
 class TestRecorderRuns(unittest.TestCase):
     """Test recorder run model."""
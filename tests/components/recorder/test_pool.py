@@ -0,0 +1,67 @@
+"""Test the read only connection pool."""
+import time
+
+import pytest
+
+from homeassistant.components.recorder import pool
+
+
+@pytest.fixture
+def db_url(tmpdir):
+    """Return the URL of a database with a table holding a row."""
+    from sqlalchemy import create_engine
+
+    url = 'sqlite:///{}'.format(tmpdir.join('test.db'))
+    engine = create_engine(url)
+    engine.execute('CREATE TABLE test (value INTEGER)')
+    engine.execute('INSERT INTO test VALUES (1)')
+    engine.dispose()
+    return url
+
+
+def test_read_engine_read_only(db_url):
+    """Test the read engine reads but does not write."""
+    from sqlalchemy.exc import OperationalError
+
+    engine = pool.create_read_engine(db_url, max_readers=2)
+    try:
+        assert engine.execute('SELECT value FROM test').scalar() == 1
+
+        with pytest.raises(OperationalError):
+            engine.execute('INSERT INTO test VALUES (2)')
+    finally:
+        engine.dispose()
+
+
+def test_read_query_timeout(db_url):
+    """Test a read query is interrupted when it runs out of time."""
+    from sqlalchemy.exc import OperationalError
+
+    engine = pool.create_read_engine(db_url, query_timeout=0)
+    try:
+        with pytest.raises(OperationalError) as err:
+            engine.execute(
+                'WITH RECURSIVE cnt(x) AS (SELECT 1 UNION ALL '
+                'SELECT x + 1 FROM cnt LIMIT 10000000) '
+                'SELECT count(*) FROM cnt')
+
+        assert pool.is_query_timeout(err.value)
+    finally:
+        engine.dispose()
+
+
+def test_slow_fetch_not_interrupted(db_url):
+    """Test rows fetched after the query returned are not timed."""
+    engine = pool.create_read_engine(db_url, query_timeout=0.1)
+    try:
+        result = engine.execute(
+            'WITH RECURSIVE cnt(x) AS (SELECT 1 UNION ALL '
+            'SELECT x + 1 FROM cnt LIMIT 100000) '
+            'SELECT x FROM cnt')
+
+        assert len(result.fetchmany(1000)) == 1000
+        # A client reading a stream slowly
+        time.sleep(0.2)
+        assert len(result.fetchall()) == 99000
+    finally:
+        engine.dispose()
@@ -7,7 +7,8 @@ from unittest.mock import patch
 from homeassistant.components import recorder
 from homeassistant.components.recorder.const import DATA_INSTANCE
 from homeassistant.components.recorder.purge import purge_old_data
-from homeassistant.components.recorder.models import States, Events
+from homeassistant.components.recorder.models import (
+    States, StateAttributes, Events, LogbookEntries)
 from homeassistant.components.recorder.util import session_scope
 from tests.common import get_test_home_assistant, init_recorder_component
 
@@ -117,6 +118,31 @@ class TestRecorderPurge(unittest.TestCase):
             # we should only have 2 events left
             assert events.count() == 2
 
+    def test_purge_old_logbook_entries(self):
+        """Test deleting old logbook entries before their events."""
+        self._add_test_events()
+
+        with session_scope(hass=self.hass) as session:
+            for event in session.query(Events).filter(
+                    Events.event_type.like("EVENT_TEST%")):
+                session.add(LogbookEntries(
+                    event_id=event.event_id,
+                    event_type=event.event_type,
+                    event_data=event.event_data,
+                    time_fired=event.time_fired,
+                ))
+
+        with session_scope(hass=self.hass) as session:
+            entries = session.query(LogbookEntries).filter(
+                LogbookEntries.event_type.like("EVENT_TEST%"))
+            assert entries.count() == 6
+
+            purge_old_data(self.hass.data[DATA_INSTANCE], 4, repack=False)
+
+            assert entries.count() == 2
+            assert session.query(Events).filter(
+                Events.event_type.like("EVENT_TEST%")).count() == 2
+
     def test_purge_method(self):
         """Test purge method."""
         service_data = {'keep_days': 4}
@@ -172,3 +198,81 @@ class TestRecorderPurge(unittest.TestCase):
                 self.hass.data[DATA_INSTANCE].block_till_done()
                 assert mock_logger.debug.mock_calls[3][1][0] == \
                     "Vacuuming SQLite to free space"
+
+    def test_purge_in_batches(self):
+        """Test purging old data in bounded batches."""
+        self._add_test_events()
+        self._add_test_states()
+
+        with session_scope(hass=self.hass) as session, \
+                patch('homeassistant.components.recorder.purge.'
+                      'PURGE_BATCH_SIZE', 3):
+            states = session.query(States)
+            events = session.query(Events).filter(
+                Events.event_type.like("EVENT_TEST%"))
+
+            # 4 old states first, then 4 old events
+            instance = self.hass.data[DATA_INSTANCE]
+            assert not purge_old_data(instance, 4, repack=False)
+            assert states.count() == 3
+            assert events.count() == 6
+
+            assert not purge_old_data(instance, 4, repack=False)
+            assert states.count() == 2
+            assert events.count() == 4
+
+            assert purge_old_data(instance, 4, repack=False)
+            assert states.count() == 2
+            assert events.count() == 2
+
+    def test_purge_service_in_batches(self):
+        """Test the purge service runs until all batches are done."""
+        self._add_test_events()
+        self._add_test_states()
+
+        with session_scope(hass=self.hass) as session, \
+                patch('homeassistant.components.recorder.purge.'
+                      'PURGE_BATCH_SIZE', 1):
+            self.hass.services.call('recorder', 'purge',
+                                    service_data={'keep_days': 4})
+            self.hass.block_till_done()
+            self.hass.data[DATA_INSTANCE].block_till_done()
+
+            assert session.query(States).count() == 2
+            assert session.query(Events).filter(
+                Events.event_type.like("EVENT_TEST%")).count() == 2
+
+    def test_purge_unused_attributes(self):
+        """Test purging attributes rows no longer used by any state."""
+        now = datetime.now()
+        eleven_days_ago = now - timedelta(days=11)
+
+        self.hass.block_till_done()
+        self.hass.data[DATA_INSTANCE].block_till_done()
+
+        with recorder.session_scope(hass=self.hass) as session:
+            old_attrs = StateAttributes(hash=1, shared_attrs='{"old": 1}')
+            kept_attrs = StateAttributes(hash=2, shared_attrs='{"kept": 1}')
+            session.add_all([old_attrs, kept_attrs])
+            session.flush()
+
+            for timestamp, attributes_id in (
+                    (eleven_days_ago, old_attrs.attributes_id),
+                    (eleven_days_ago, kept_attrs.attributes_id),
+                    (now, kept_attrs.attributes_id)):
+                session.add(States(
+                    entity_id='test.recorder2',
+                    domain='sensor',
+                    state='on',
+                    attributes_id=attributes_id,
+                    last_changed=timestamp,
+                    last_updated=timestamp,
+                    created=timestamp,
+                ))
+
+        with session_scope(hass=self.hass) as session:
+            purge_old_data(self.hass.data[DATA_INSTANCE], 4, repack=False)
+
+            assert session.query(States).count() == 1
+            assert [row.shared_attrs for row in
+                    session.query(StateAttributes)] == ['{"kept": 1}']
@@ -57,3 +57,32 @@ def test_recorder_bad_execute(hass_recorder):
         util.execute((mck1,))
 
     assert e_mock.call_count == 2
+
+
+def test_recorder_execute_timeout_not_retried(hass_recorder):
+    """A query that ran out of time is not retried."""
+    from sqlalchemy.exc import OperationalError
+    hass_recorder()
+
+    def to_native():
+        """Raise a query timeout."""
+        raise OperationalError('SELECT', {}, Exception('interrupted'))
+
+    mck1 = MagicMock()
+    mck1.to_native = to_native
+
+    with pytest.raises(OperationalError), \
+            patch('homeassistant.components.recorder.time.sleep') as e_mock:
+        util.execute((mck1,))
+
+    assert e_mock.call_count == 0
+
+
+def test_read_session_in_memory(hass_recorder):
+    """Reads of an in memory database share the recorder connection."""
+    hass = hass_recorder()
+    instance = hass.data[DATA_INSTANCE]
+
+    assert instance.read_engine is None
+    with util.session_scope(hass=hass, read_only=True) as session:
+        assert session.bind is instance.engine
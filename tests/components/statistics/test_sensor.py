@@ -322,3 +322,50 @@ class TestStatisticsSensor(unittest.TestCase):
         # now in mock_data['return_time'].
         assert mock_data['return_time'] == state.attributes.get('max_age') +\
             timedelta(hours=1)
+
+    def test_initialize_from_database_with_maxage_sampling_size(self):
+        """Test only the last sampling_size states of max_age are read."""
+        mock_data = {
+            'return_time': datetime(2017, 8, 2, 12, 23, 42,
+                                    tzinfo=dt_util.UTC),
+        }
+        # The two last values are read, out of three younger than max_age
+        expected_min_age = mock_data['return_time'] + \
+            timedelta(hours=len(self.values) - 2)
+
+        def mock_now():
+            return mock_data['return_time']
+
+        def mock_purge(self):
+            return
+
+        init_recorder_component(self.hass)
+
+        with patch('homeassistant.components.statistics.sensor.dt_util.utcnow',
+                   new=mock_now), \
+                patch.object(StatisticsSensor, '_purge_old', mock_purge):
+            for value in self.values:
+                self.hass.states.set('sensor.test_monitored', value,
+                                     {ATTR_UNIT_OF_MEASUREMENT: TEMP_CELSIUS})
+                self.hass.block_till_done()
+                mock_data['return_time'] += timedelta(hours=1)
+
+            self.hass.data[recorder.DATA_INSTANCE].block_till_done()
+            assert setup_component(self.hass, 'sensor', {
+                'sensor': {
+                    'platform': 'statistics',
+                    'name': 'test',
+                    'entity_id': 'sensor.test_monitored',
+                    'sampling_size': 2,
+                    'max_age': {'hours': 3}
+                }
+            })
+            self.hass.block_till_done()
+
+            self.hass.start()
+            self.hass.block_till_done()
+
+            state = self.hass.states.get('sensor.test_mean')
+
+        assert state.attributes.get('count') == 2
+        assert expected_min_age == state.attributes.get('min_age')
@@ -160,6 +160,65 @@ async def test_subscribe_unsubscribe_events(hass, websocket_client):
     assert sum(hass.bus.async_listeners().values()) == init_count
 
 
+async def test_subscribe_states(hass, websocket_client):
+    """Test subscribe_states coalesces changes and sends differences."""
+    hass.states.async_set('light.bowl', 'off', {'friendly_name': 'Bowl'})
+    hass.states.async_set('switch.ac', 'off')
+
+    await websocket_client.send_json({
+        'id': 5,
+        'type': 'subscribe_states',
+        'domains': ['light'],
+        'interval': 0,
+        'diff': True,
+    })
+
+    msg = await websocket_client.receive_json()
+    assert msg['id'] == 5
+    assert msg['type'] == const.TYPE_RESULT
+    assert msg['success']
+
+    msg = await websocket_client.receive_json()
+    assert msg['id'] == 5
+    assert msg['type'] == 'event'
+    assert list(msg['event']) == ['changed']
+    assert msg['event']['changed']['light.bowl']['state'] == 'off'
+
+    hass.states.async_set('light.bowl', 'on', {
+        'friendly_name': 'Bowl', 'brightness': 100})
+    hass.states.async_set('switch.ac', 'on')
+    hass.states.async_set('light.bowl', 'on', {'brightness': 200})
+    hass.states.async_set('light.ceiling', 'on')
+
+    with timeout(3, loop=hass.loop):
+        msg = await websocket_client.receive_json()
+
+    event = msg['event']
+    assert list(event['changed']) == ['light.ceiling']
+    diff = event['diff']['light.bowl']
+    assert diff['state'] == 'on'
+    assert diff['attributes'] == {'brightness': 200}
+    assert diff['attributes_removed'] == ['friendly_name']
+    assert 'removed' not in event
+
+    hass.states.async_remove('light.ceiling')
+
+    with timeout(3, loop=hass.loop):
+        msg = await websocket_client.receive_json()
+
+    assert msg['event'] == {'removed': ['light.ceiling']}
+
+    await websocket_client.send_json({
+        'id': 6,
+        'type': 'unsubscribe_events',
+        'subscription': 5
+    })
+
+    msg = await websocket_client.receive_json()
+    assert msg['id'] == 6
+    assert msg['success']
+
+
 async def test_get_states(hass, websocket_client):
     """Test get_states command."""
     hass.states.async_set('greeting.hello', 'world')
@@ -211,6 +211,36 @@ async def test_removing_area_id(registry):
     assert entry_w_area != entry_wo_area
 
 
+async def test_indexes_follow_updates(registry):
+    """Make sure lookups keep up with merged identifiers and areas."""
+    entry = registry.async_get_or_create(
+        config_entry_id='123',
+        identifiers={('bridgeid', '0123')},
+        manufacturer='manufacturer', model='model')
+    entry = registry.async_get_or_create(
+        config_entry_id='123',
+        connections={
+            (device_registry.CONNECTION_NETWORK_MAC, '12:34:56:AB:CD:EF')
+        },
+        identifiers={('bridgeid', '0123'), ('serial', '4567')},
+        manufacturer='manufacturer', model='model')
+
+    assert registry.async_get_device({('serial', '4567')}, set()) == entry
+    assert registry.async_get_device(set(), {
+        (device_registry.CONNECTION_NETWORK_MAC, '12:34:56:ab:cd:ef')
+    }) == entry
+    assert registry.async_get_device({('serial', '0000')}, set()) is None
+
+    entry = registry.async_update_device(entry.id, area_id='12345A')
+    assert device_registry.async_entries_for_area(
+        registry, '12345A') == [entry]
+
+    entry = registry.async_update_device(entry.id, area_id='67890B')
+    assert device_registry.async_entries_for_area(registry, '12345A') == []
+    assert device_registry.async_entries_for_area(
+        registry, '67890B') == [entry]
+
+
 async def test_specifying_hub_device_create(registry):
     """Test specifying a hub and updating."""
     hub = registry.async_get_or_create(
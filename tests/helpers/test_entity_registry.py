@@ -189,6 +189,33 @@ def test_removing_config_entry_id(registry):
     assert entry.config_entry_id is None
 
 
+def test_indexes_follow_updates(registry):
+    """Test lookups keep up with renamed and removed entities."""
+    entry = registry.async_get_or_create(
+        'light', 'hue', '1234', device_id='mock-dev-id')
+    entry2 = registry.async_get_or_create(
+        'light', 'hue', '5678', device_id='mock-dev-id')
+
+    assert entity_registry.async_entries_for_device(
+        registry, 'mock-dev-id') == [entry, entry2]
+
+    updated = registry.async_update_entity(
+        entry.entity_id, new_entity_id='light.renamed')
+
+    assert registry.async_get_entity_id(
+        'light', 'hue', '1234') == 'light.renamed'
+    assert entity_registry.async_entries_for_device(
+        registry, 'mock-dev-id') == [entry2, updated]
+
+    registry.async_remove('light.renamed')
+
+    assert registry.async_get_entity_id('light', 'hue', '1234') is None
+    assert entity_registry.async_entries_for_device(
+        registry, 'mock-dev-id') == [entry2]
+    assert entity_registry.async_entries_for_device(
+        registry, 'unknown-dev-id') == []
+
+
 async def test_migration(hass):
     """Test migration from old data to new."""
     old_conf = {
@@ -10,9 +10,16 @@ import pytest
 from homeassistant.core import callback
 from homeassistant.setup import setup_component
 import homeassistant.core as ha
-from homeassistant.const import MATCH_ALL
+from homeassistant.const import (
+    EVENT_STATE_CHANGED, EVENT_TIME_CHANGED, MATCH_ALL)
 from homeassistant.helpers.event import (
+    DATA_STATE_CHANGE_ROUTER,
+    DATA_TIME_SCHEDULER,
+    SCHEDULER_COMPACT_THRESHOLD,
     async_call_later,
+    async_track_point_in_utc_time,
+    async_track_state_change,
+    async_track_template,
     call_later,
     track_point_in_utc_time,
     track_point_in_time,
@@ -29,7 +36,8 @@ from homeassistant.helpers.template import Template
 from homeassistant.components import sun
 import homeassistant.util.dt as dt_util
 
-from tests.common import get_test_home_assistant, fire_time_changed
+from tests.common import (
+    async_fire_time_changed, get_test_home_assistant, fire_time_changed)
 from unittest.mock import patch
 
 
@@ -771,3 +779,209 @@ def test_async_call_later(hass):
     assert p_action is action
     assert p_point == now + timedelta(seconds=3)
     assert remove is mock()
+
+
+async def test_scheduler_runs_at_deadline(hass):
+    """Test the scheduler runs actions from a loop timer below a second."""
+    runs = []
+    now = dt_util.utcnow()
+
+    async_track_point_in_utc_time(
+        hass, callback(lambda now: runs.append(now)),
+        now + timedelta(milliseconds=50))
+
+    await asyncio.sleep(0.2)
+    await hass.async_block_till_done()
+
+    assert len(runs) == 1
+    assert len(hass.data[DATA_TIME_SCHEDULER]) == 0
+
+
+async def test_scheduler_cancel(hass):
+    """Test cancelling scheduled actions and releasing the listener."""
+    runs = []
+    now = dt_util.utcnow()
+    point = now + timedelta(hours=1)
+    listeners = hass.bus.async_listeners().get(EVENT_TIME_CHANGED, 0)
+
+    unsubs = [
+        async_track_point_in_utc_time(
+            hass, callback(lambda now, i=i: runs.append(i)), point)
+        for i in range(3)
+    ]
+    scheduler = hass.data[DATA_TIME_SCHEDULER]
+
+    assert len(scheduler) == 3
+    assert hass.bus.async_listeners()[EVENT_TIME_CHANGED] == listeners + 1
+
+    unsubs[1]()
+    # Cancelling twice is a no-op
+    unsubs[1]()
+    assert len(scheduler) == 2
+
+    async_fire_time_changed(hass, point)
+    await hass.async_block_till_done()
+
+    assert runs == [0, 2]
+    assert len(scheduler) == 0
+    assert hass.bus.async_listeners().get(EVENT_TIME_CHANGED, 0) == listeners
+
+    # Cancelling after the action ran is a no-op
+    unsubs[0]()
+    assert len(scheduler) == 0
+
+
+async def test_scheduler_compacts_cancelled(hass):
+    """Test the scheduler drops cancelled entries in bulk."""
+    point = dt_util.utcnow() + timedelta(hours=1)
+    keep = async_track_point_in_utc_time(hass, lambda now: None, point)
+    unsubs = [
+        async_track_point_in_utc_time(hass, lambda now: None, point)
+        for _ in range(SCHEDULER_COMPACT_THRESHOLD + 1)
+    ]
+    scheduler = hass.data[DATA_TIME_SCHEDULER]
+
+    for unsub in unsubs:
+        unsub()
+
+    assert len(scheduler) == 1
+    assert len(scheduler._heap) < SCHEDULER_COMPACT_THRESHOLD
+
+    keep()
+    assert len(scheduler._heap) == 0
+
+
+async def test_state_change_router_dispatch(hass):
+    """Test state changes only reach listeners of that entity."""
+    light_runs = []
+    switch_runs = []
+    all_runs = []
+    listeners = hass.bus.async_listeners().get(EVENT_STATE_CHANGED, 0)
+
+    unsub_light = async_track_state_change(
+        hass, ['light.Bowl', 'light.ceiling'],
+        callback(lambda *args: light_runs.append(args)))
+    unsub_switch = async_track_state_change(
+        hass, 'switch.ac', callback(lambda *args: switch_runs.append(args)))
+    unsub_all = async_track_state_change(
+        hass, MATCH_ALL, callback(lambda *args: all_runs.append(args)))
+    router = hass.data[DATA_STATE_CHANGE_ROUTER]
+
+    assert len(router) == 3
+    assert hass.bus.async_listeners()[EVENT_STATE_CHANGED] == listeners + 1
+
+    hass.states.async_set('light.bowl', 'on')
+    hass.states.async_set('light.ceiling', 'on')
+    hass.states.async_set('light.other', 'on')
+    await hass.async_block_till_done()
+
+    assert [run[0] for run in light_runs] == ['light.bowl', 'light.ceiling']
+    assert len(switch_runs) == 0
+    assert len(all_runs) == 3
+
+    unsub_light()
+    # Removing twice is a no-op
+    unsub_light()
+    assert len(router) == 2
+
+    hass.states.async_set('light.bowl', 'off')
+    hass.states.async_set('switch.ac', 'on')
+    await hass.async_block_till_done()
+
+    assert len(light_runs) == 2
+    assert len(switch_runs) == 1
+    assert len(all_runs) == 5
+
+    unsub_switch()
+    unsub_all()
+    assert len(router) == 0
+    assert hass.bus.async_listeners().get(EVENT_STATE_CHANGED, 0) == \
+        listeners
+
+
+async def test_state_change_router_isolates_errors(hass):
+    """Test a failing listener does not stop the others."""
+    runs = []
+
+    @callback
+    def failing_listener(entity_id, from_s, to_s):
+        """Raise on every state change."""
+        raise ValueError
+
+    async_track_state_change(hass, 'light.bowl', failing_listener)
+    async_track_state_change(
+        hass, 'light.bowl', callback(lambda *args: runs.append(args)))
+
+    hass.states.async_set('light.bowl', 'on')
+    await hass.async_block_till_done()
+
+    assert len(runs) == 1
+
+
+async def test_track_template_follows_rendered_states(hass):
+    """Test the template tracker only listens to the states it read."""
+    runs = []
+    renders = []
+    hass.states.async_set('input_boolean.use_lights', 'on')
+    hass.states.async_set('light.bowl', 'off')
+    hass.states.async_set('switch.ac', 'off')
+
+    template = Template(
+        "{% if is_state('input_boolean.use_lights', 'on') %}"
+        "{{ states.light | selectattr('state', 'eq', 'on') | list | count"
+        " > 0 }}"
+        "{% else %}{{ is_state('switch.ac', 'on') }}{% endif %}", hass)
+    async_render_to_info = template.async_render_to_info
+
+    def render_to_info(*args, **kwargs):
+        """Count the renders."""
+        renders.append(1)
+        return async_render_to_info(*args, **kwargs)
+
+    template.async_render_to_info = render_to_info
+
+    unsub = async_track_template(
+        hass, template, callback(lambda *args: runs.append(args[0])))
+    assert len(renders) == 1
+
+    # Not read by the template
+    hass.states.async_set('switch.ac', 'on')
+    hass.states.async_set('sensor.temperature', '20')
+    await hass.async_block_till_done()
+    assert len(renders) == 1
+
+    # New entities of a read domain are tracked
+    hass.states.async_set('light.ceiling', 'on')
+    await hass.async_block_till_done()
+    assert len(renders) == 2
+    assert runs == ['light.ceiling']
+
+    # After switching branches only switch.ac is read
+    hass.states.async_set('input_boolean.use_lights', 'off')
+    await hass.async_block_till_done()
+    assert len(renders) == 3
+
+    hass.states.async_set('light.bowl', 'on')
+    await hass.async_block_till_done()
+    assert len(renders) == 3
+
+    hass.states.async_set('switch.ac', 'off')
+    await hass.async_block_till_done()
+    assert len(renders) == 4
+
+    unsub()
+    assert len(hass.data[DATA_STATE_CHANGE_ROUTER]) == 0
+
+
+async def test_track_template_reading_no_state(hass):
+    """Test templates reading no state render on every state change."""
+    runs = []
+    template = Template("{{ now().year > 2000 }}", hass)
+
+    async_track_template(
+        hass, template, callback(lambda *args: runs.append(args[0])))
+
+    hass.states.async_set('sensor.temperature', '20')
+    await hass.async_block_till_done()
+
+    assert runs == ['sensor.temperature']
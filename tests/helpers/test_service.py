@@ -249,6 +249,42 @@ async def test_extract_entity_ids_from_area(hass):
         await service.async_extract_entity_ids(hass, call)
 
 
+async def test_extract_entity_ids_follows_changes(hass):
+    """Test expanded groups and areas are updated when they change."""
+    group = await hass.components.group.Group.async_create_group(
+        hass, 'test', ['light.Ceiling'])
+
+    call = ha.ServiceCall('light', 'turn_on',
+                          {ATTR_ENTITY_ID: 'group.test'})
+
+    assert {'light.ceiling'} == \
+        await service.async_extract_entity_ids(hass, call)
+
+    await group.async_update_tracked_entity_ids(
+        ['light.Ceiling', 'light.Kitchen'])
+    await hass.async_block_till_done()
+
+    assert {'light.ceiling', 'light.kitchen'} == \
+        await service.async_extract_entity_ids(hass, call)
+
+    device_registry = mock_device_registry(hass)
+    entity_registry = mock_registry(hass)
+    device = device_registry.async_get_or_create(
+        config_entry_id='mock-entry', identifiers={('test', 'device')})
+    entity_registry.async_get_or_create(
+        'light', 'test', 'bowl', device_id=device.id)
+
+    call = ha.ServiceCall('light', 'turn_on', {'area_id': 'test-area'})
+
+    assert set() == await service.async_extract_entity_ids(hass, call)
+
+    device_registry.async_update_device(device.id, area_id='test-area')
+    await hass.async_block_till_done()
+
+    assert {'light.test_bowl'} == \
+        await service.async_extract_entity_ids(hass, call)
+
+
 @asyncio.coroutine
 def test_async_get_all_descriptions(hass):
     """Test async_get_all_descriptions."""
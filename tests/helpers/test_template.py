@@ -1076,3 +1076,39 @@ def test_length_of_states(hass):
 
     tpl = template.Template('{{ states.sensor | length }}', hass)
     assert tpl.async_render() == '2'
+
+
+async def test_render_to_info(hass):
+    """Test the states read during a render are collected."""
+    hass.states.async_set('light.bowl', 'on', {'brightness': 100})
+    hass.states.async_set('sensor.temperature', '20')
+
+    info = template.Template(
+        "{{ is_state('light.Bowl', 'on') }}"
+        "{{ state_attr('light.ceiling', 'brightness') }}"
+        "{{ states.sensor.temperature.state }}"
+        "{{ states('sensor.humidity') }}", hass).async_render_to_info()
+    assert info.result == 'TrueNone20unknown'
+    assert info.exception is None
+    assert info.entities == {'light.bowl', 'light.ceiling',
+                             'sensor.temperature', 'sensor.humidity'}
+    assert info.domains == set()
+    assert not info.all_states
+
+    info = template.Template(
+        "{{ states.light | count }}", hass).async_render_to_info()
+    assert info.result == '1'
+    assert info.domains == {'light'}
+    assert not info.all_states
+
+    info = template.Template(
+        "{% for state in states %}{{ state.entity_id }} {% endfor %}",
+        hass).async_render_to_info()
+    assert info.all_states
+
+    info = template.Template(
+        "{{ states.light.bowl.state }}{{ missing.attribute }}",
+        hass).async_render_to_info()
+    assert info.result is None
+    assert isinstance(info.exception, TemplateError)
+    assert info.entities == {'light.bowl'}
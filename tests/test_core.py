@@ -2,6 +2,7 @@
 # pylint: disable=protected-access
 import asyncio
 import functools
+import json
 import logging
 import os
 import unittest
@@ -14,9 +15,11 @@ import pytz
 import pytest
 
 import homeassistant.core as ha
+from homeassistant.helpers.json import JSONEncoder
 from homeassistant.exceptions import (InvalidEntityFormatError,
                                       InvalidStateError)
-from homeassistant.util.async_ import run_coroutine_threadsafe
+from homeassistant.util.async_ import (
+    run_callback_threadsafe, run_coroutine_threadsafe)
 import homeassistant.util.dt as dt_util
 from homeassistant.util.unit_system import (METRIC_SYSTEM)
 from homeassistant.const import (
@@ -316,6 +319,32 @@ class TestEvent(unittest.TestCase):
         }
         assert expected == event.as_dict()
 
+    def test_as_json(self):
+        """Test the JSON of an event with states is encoded once."""
+        state = ha.State('light.bowl', 'on', {'brightness': 100})
+        event = ha.Event(EVENT_STATE_CHANGED, {
+            'entity_id': 'light.bowl',
+            'old_state': None,
+            'new_state': state,
+        })
+
+        assert json.loads(event.as_json()) == json.loads(
+            json.dumps(event.as_dict(), cls=JSONEncoder))
+        assert event.as_json() is event.as_json()
+        assert json.loads(event.data_as_json())['new_state'] == \
+            json.loads(state.as_json())
+
+        with patch.object(ha, 'JSON_DUMP') as mock_dump:
+            assert state.as_json() is state.as_json()
+        assert not mock_dump.called
+
+    def test_as_json_rejects_nan(self):
+        """Test the memoized JSON is strict JSON."""
+        event = ha.Event('some_type', {'value': float('nan')})
+
+        with pytest.raises(ValueError):
+            event.as_json()
+
 
 class TestEventBus(unittest.TestCase):
     """Test EventBus methods."""
@@ -571,6 +600,37 @@ class TestStateMachine(unittest.TestCase):
         states = sorted(state.entity_id for state in self.states.all())
         assert ['light.bowl', 'switch.ac'] == states
 
+    def test_all_domain_filter(self):
+        """Test listing the states of a single domain."""
+        self.states.set('light.ceiling', 'off')
+
+        states = [state.entity_id for state in self.states.all('Light')]
+        assert ['light.bowl', 'light.ceiling'] == states
+        assert [] == self.states.all('sensor')
+
+    def test_domain_index_follows_add_and_remove(self):
+        """Test the domain index and sorted ids after adding and removing."""
+        states = self.states
+        states.set('light.alpha', 'on')
+        sorted_ids = run_callback_threadsafe(
+            self.hass.loop, states.async_sorted_entity_ids, 'light').result()
+        assert ['light.alpha', 'light.bowl'] == sorted_ids
+
+        # Updates of existing entities keep the sorted list
+        states.set('light.alpha', 'off')
+        assert sorted_ids is run_callback_threadsafe(
+            self.hass.loop, states.async_sorted_entity_ids, 'light').result()
+
+        states.remove('light.bowl')
+        assert ['light.alpha'] == states.entity_ids('light')
+        assert ['light.alpha', 'switch.ac'] == run_callback_threadsafe(
+            self.hass.loop, states.async_sorted_entity_ids).result()
+
+        states.remove('light.alpha')
+        assert [] == states.entity_ids('light')
+        assert [] == run_callback_threadsafe(
+            self.hass.loop, states.async_sorted_entity_ids, 'light').result()
+
     def test_remove(self):
         """Test remove method."""
         events = []
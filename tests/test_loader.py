@@ -1,4 +1,8 @@
 """Test to verify that we can load components."""
+import asyncio
+import threading
+from unittest.mock import patch
+
 import pytest
 
 import homeassistant.loader as loader
@@ -162,3 +166,105 @@ async def test_integrations_only_once(hass):
         loader.async_get_integration(hass, 'hue'))
 
     assert await int_1 is await int_2
+
+
+async def test_async_get_component_imports_once(hass):
+    """Test concurrent imports share a single executor job."""
+    integration = await loader.async_get_integration(hass, 'hue')
+    hass.data.get(loader.DATA_COMPONENTS, {}).pop('hue', None)
+    hass.data.get(loader.DATA_COMPONENTS, {}).pop('hue.light', None)
+
+    with patch.object(hass, 'async_add_executor_job',
+                      wraps=hass.async_add_executor_job) as mock_executor:
+        comp_1, comp_2, platform = await asyncio.gather(
+            integration.async_get_component(),
+            integration.async_get_component(),
+            integration.async_get_platform('light'))
+
+    assert comp_1 is comp_2 is hue
+    assert platform is hue_light
+    assert len(mock_executor.mock_calls) == 2
+    assert not hass.data[loader.DATA_PENDING_IMPORTS]
+
+    # Cached modules are returned without the executor
+    with patch.object(hass, 'async_add_executor_job') as mock_executor:
+        assert await integration.async_get_component() is hue
+    assert not mock_executor.called
+
+
+async def test_integration_index(hass, hass_storage):
+    """Test a restart resolves integrations from the index."""
+    await loader.async_load_index(hass)
+    integration = await loader.async_get_integration(hass, 'hue')
+    dependencies = await loader.async_component_dependencies(hass, 'hue')
+
+    index = hass.data[loader.DATA_INDEX]
+    assert index.manifests['hue']['manifest'] == integration.manifest
+    assert index.dependencies['hue'] == sorted(dependencies)
+
+    # Restart with the saved index
+    hass_storage[loader.INDEX_STORAGE_KEY] = {
+        'version': loader.INDEX_STORAGE_VERSION,
+        'key': loader.INDEX_STORAGE_KEY,
+        'data': index._data_to_save(),
+    }
+    hass.data.pop(loader.DATA_INTEGRATIONS)
+    await loader.async_load_index(hass)
+
+    with patch.object(loader.Integration, 'resolve_from_root') as mock_resolve:
+        integration = await loader.async_get_integration(hass, 'hue')
+        assert await loader.async_component_dependencies(
+            hass, 'hue') == dependencies
+
+    assert not mock_resolve.called
+    assert integration.domain == 'hue'
+    assert integration.get_component() is hue
+
+
+async def test_integration_index_invalidated_by_upgrade(hass, hass_storage):
+    """Test the index is dropped when Home Assistant changed."""
+    hass_storage[loader.INDEX_STORAGE_KEY] = {
+        'version': loader.INDEX_STORAGE_VERSION,
+        'key': loader.INDEX_STORAGE_KEY,
+        'data': {
+            'version': '0.1',
+            'manifests': {'hue': {}},
+            'dependencies': {'hue': ['hue']},
+            'requirements': [],
+        },
+    }
+    await loader.async_load_index(hass)
+
+    index = hass.data[loader.DATA_INDEX]
+    assert index.manifests == {}
+    assert index.dependencies == {}
+
+
+async def test_async_get_component_needing_loop(hass):
+    """Test a module failing to import in the executor is imported again."""
+    integration = await loader.async_get_integration(hass, 'hue')
+    hass.data.get(loader.DATA_COMPONENTS, {}).pop('hue', None)
+    main_thread = threading.current_thread()
+
+    def import_module(name):
+        """Create an asyncio object like a module level Lock would."""
+        if threading.current_thread() is not main_thread:
+            raise RuntimeError('There is no current event loop in thread')
+        return hue
+
+    with patch('importlib.import_module', side_effect=import_module):
+        assert await integration.async_get_component() is hue
+    assert not hass.data[loader.DATA_PENDING_IMPORTS]
+
+
+async def test_async_get_component_error_not_retried(hass):
+    """Test other errors importing in the executor are raised."""
+    integration = await loader.async_get_integration(hass, 'hue')
+    hass.data.get(loader.DATA_COMPONENTS, {}).pop('hue', None)
+
+    with patch('importlib.import_module',
+               side_effect=ValueError('broken')) as mock_import, \
+            pytest.raises(ValueError):
+        await integration.async_get_component()
+    assert len(mock_import.mock_calls) == 1
+    assert not hass.data[loader.DATA_PENDING_IMPORTS]
@@ -21,7 +21,7 @@ from homeassistant.helpers import discovery
 from tests.common import \
     get_test_home_assistant, MockModule, MockPlatform, \
     assert_setup_component, get_test_config_dir, mock_integration, \
-    mock_entity_platform
+    mock_entity_platform, mock_coro
 
 ORIG_TIMEZONE = dt_util.DEFAULT_TIME_ZONE
 VERSION_PATH = os.path.join(get_test_config_dir(), config_util.VERSION_FILE)
@@ -627,3 +627,39 @@ async def test_when_setup_already_loaded(hass):
     setup.async_when_setup(hass, 'test', mock_callback)
     await hass.async_block_till_done()
     assert calls == ['test', 'test']
+
+
+async def test_setup_times_recorded(hass):
+    """Test the time spent in each phase of a setup is recorded."""
+    mock_integration(hass, MockModule('comp'))
+
+    assert await setup.async_setup_component(hass, 'comp', {})
+
+    timings = hass.data[setup.DATA_SETUP_TIME]['comp']
+    assert list(timings) == [
+        'resolve', 'requirements', 'import', 'config_validation', 'setup']
+    assert all(seconds >= 0 for seconds in timings.values())
+
+
+async def test_component_import_error_reported(hass):
+    """Test errors other than ImportError importing a component."""
+    mock_integration(hass, MockModule('comp'))
+
+    with mock.patch('homeassistant.loader.Integration.async_get_component',
+                    side_effect=RuntimeError('no event loop')):
+        assert not await setup.async_setup_component(hass, 'comp', {})
+    assert 'comp' not in hass.config.components
+
+
+async def test_import_integrations_missing_requirements(hass):
+    """Test integrations with missing requirements are not imported."""
+    mock_integration(hass, MockModule('comp'))
+    mock_integration(hass, MockModule('comp2', requirements=['not-there']))
+
+    with mock.patch('homeassistant.loader.Integration.async_get_component',
+                    return_value=mock_coro()) as mock_import, \
+            mock.patch('homeassistant.requirements.PackageLoadable.loadable',
+                       return_value=mock_coro(False)):
+        await setup.async_import_integrations(hass, {}, {'comp', 'comp2'})
+
+    assert len(mock_import.mock_calls) == 1